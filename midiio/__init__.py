@@ -1,4 +1,63 @@
-from .fileio import read_midifile, write_midifile
-from .constants import *
-from .containers import *
-from .events import *
+"""
+Reading and writing of standard MIDI files.
+
+The names of the package are loaded on first access: importing midiio does not
+import any of its submodules, so short-lived programs only pay for the parts they
+use. The constants, containers and events are available at the package level as
+well as the functions below, and every submodule can be accessed as an attribute.
+"""
+import importlib
+import types
+
+_FUNCTIONS = {
+    'read_midifile': 'fileio',
+    'write_midifile': 'fileio',
+    'EventFilter': 'fileio',
+    'EventPool': 'fileio',
+    'scan_midifile': 'metadata',
+}
+
+# modules whose public names are exported by the package, in order of precedence
+_EXPORTED_MODULES = ('events', 'containers', 'constants')
+
+_SUBMODULES = frozenset(['archive', 'constants', 'containers', 'dataset', 'dedup',
+    'diff', 'dump', 'editing', 'eventio', 'events', 'fileio', 'fingerprint', 'metadata',
+    'pianoroll', 'serialization', 'stats', 'stream', 'sysex', 'thinning', 'timing',
+    'tokens', 'transform', 'util', 'validate'])
+
+
+def _import(module_name):
+    return importlib.import_module('.' + module_name, __name__)
+
+
+def _public_names(module):
+    return [ name for name, value in vars(module).items()
+        if not name.startswith('_') and not isinstance(value, types.ModuleType) ]
+
+
+def __getattr__(name):
+    if name == '__all__':
+        names = list(_FUNCTIONS)
+        for module_name in _EXPORTED_MODULES:
+            names.extend(_public_names(_import(module_name)))
+        value = sorted(set(names))
+    elif name in _FUNCTIONS:
+        value = getattr(_import(_FUNCTIONS[name]), name)
+    elif name in _SUBMODULES:
+        return _import(name)
+    else:
+        for module_name in _EXPORTED_MODULES:
+            module = _import(module_name)
+            if not name.startswith('_') and hasattr(module, name):
+                value = getattr(module, name)
+                break
+        else:
+            raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_FUNCTIONS) | _SUBMODULES)
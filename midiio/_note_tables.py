@@ -0,0 +1,707 @@
+# Generated by scripts/gen_note_tables.py, do not edit.
+
+NOTE_NAME_MAP_FLAT = {
+    'C_0': 0,
+    'Db_0': 1,
+    'D_0': 2,
+    'Eb_0': 3,
+    'E_0': 4,
+    'F_0': 5,
+    'Gb_0': 6,
+    'G_0': 7,
+    'Ab_0': 8,
+    'A_0': 9,
+    'Bb_0': 10,
+    'B_0': 11,
+    'C_1': 12,
+    'Db_1': 13,
+    'D_1': 14,
+    'Eb_1': 15,
+    'E_1': 16,
+    'F_1': 17,
+    'Gb_1': 18,
+    'G_1': 19,
+    'Ab_1': 20,
+    'A_1': 21,
+    'Bb_1': 22,
+    'B_1': 23,
+    'C_2': 24,
+    'Db_2': 25,
+    'D_2': 26,
+    'Eb_2': 27,
+    'E_2': 28,
+    'F_2': 29,
+    'Gb_2': 30,
+    'G_2': 31,
+    'Ab_2': 32,
+    'A_2': 33,
+    'Bb_2': 34,
+    'B_2': 35,
+    'C_3': 36,
+    'Db_3': 37,
+    'D_3': 38,
+    'Eb_3': 39,
+    'E_3': 40,
+    'F_3': 41,
+    'Gb_3': 42,
+    'G_3': 43,
+    'Ab_3': 44,
+    'A_3': 45,
+    'Bb_3': 46,
+    'B_3': 47,
+    'C_4': 48,
+    'Db_4': 49,
+    'D_4': 50,
+    'Eb_4': 51,
+    'E_4': 52,
+    'F_4': 53,
+    'Gb_4': 54,
+    'G_4': 55,
+    'Ab_4': 56,
+    'A_4': 57,
+    'Bb_4': 58,
+    'B_4': 59,
+    'C_5': 60,
+    'Db_5': 61,
+    'D_5': 62,
+    'Eb_5': 63,
+    'E_5': 64,
+    'F_5': 65,
+    'Gb_5': 66,
+    'G_5': 67,
+    'Ab_5': 68,
+    'A_5': 69,
+    'Bb_5': 70,
+    'B_5': 71,
+    'C_6': 72,
+    'Db_6': 73,
+    'D_6': 74,
+    'Eb_6': 75,
+    'E_6': 76,
+    'F_6': 77,
+    'Gb_6': 78,
+    'G_6': 79,
+    'Ab_6': 80,
+    'A_6': 81,
+    'Bb_6': 82,
+    'B_6': 83,
+    'C_7': 84,
+    'Db_7': 85,
+    'D_7': 86,
+    'Eb_7': 87,
+    'E_7': 88,
+    'F_7': 89,
+    'Gb_7': 90,
+    'G_7': 91,
+    'Ab_7': 92,
+    'A_7': 93,
+    'Bb_7': 94,
+    'B_7': 95,
+    'C_8': 96,
+    'Db_8': 97,
+    'D_8': 98,
+    'Eb_8': 99,
+    'E_8': 100,
+    'F_8': 101,
+    'Gb_8': 102,
+    'G_8': 103,
+    'Ab_8': 104,
+    'A_8': 105,
+    'Bb_8': 106,
+    'B_8': 107,
+    'C_9': 108,
+    'Db_9': 109,
+    'D_9': 110,
+    'Eb_9': 111,
+    'E_9': 112,
+    'F_9': 113,
+    'Gb_9': 114,
+    'G_9': 115,
+    'Ab_9': 116,
+    'A_9': 117,
+    'Bb_9': 118,
+    'B_9': 119,
+    'C_10': 120,
+    'Db_10': 121,
+    'D_10': 122,
+    'Eb_10': 123,
+    'E_10': 124,
+    'F_10': 125,
+    'Gb_10': 126,
+    'G_10': 127,
+}
+
+NOTE_NAME_MAP_SHARP = {
+    'C_0': 0,
+    'Cs_0': 1,
+    'D_0': 2,
+    'Ds_0': 3,
+    'E_0': 4,
+    'F_0': 5,
+    'Fs_0': 6,
+    'G_0': 7,
+    'Gs_0': 8,
+    'A_0': 9,
+    'As_0': 10,
+    'B_0': 11,
+    'C_1': 12,
+    'Cs_1': 13,
+    'D_1': 14,
+    'Ds_1': 15,
+    'E_1': 16,
+    'F_1': 17,
+    'Fs_1': 18,
+    'G_1': 19,
+    'Gs_1': 20,
+    'A_1': 21,
+    'As_1': 22,
+    'B_1': 23,
+    'C_2': 24,
+    'Cs_2': 25,
+    'D_2': 26,
+    'Ds_2': 27,
+    'E_2': 28,
+    'F_2': 29,
+    'Fs_2': 30,
+    'G_2': 31,
+    'Gs_2': 32,
+    'A_2': 33,
+    'As_2': 34,
+    'B_2': 35,
+    'C_3': 36,
+    'Cs_3': 37,
+    'D_3': 38,
+    'Ds_3': 39,
+    'E_3': 40,
+    'F_3': 41,
+    'Fs_3': 42,
+    'G_3': 43,
+    'Gs_3': 44,
+    'A_3': 45,
+    'As_3': 46,
+    'B_3': 47,
+    'C_4': 48,
+    'Cs_4': 49,
+    'D_4': 50,
+    'Ds_4': 51,
+    'E_4': 52,
+    'F_4': 53,
+    'Fs_4': 54,
+    'G_4': 55,
+    'Gs_4': 56,
+    'A_4': 57,
+    'As_4': 58,
+    'B_4': 59,
+    'C_5': 60,
+    'Cs_5': 61,
+    'D_5': 62,
+    'Ds_5': 63,
+    'E_5': 64,
+    'F_5': 65,
+    'Fs_5': 66,
+    'G_5': 67,
+    'Gs_5': 68,
+    'A_5': 69,
+    'As_5': 70,
+    'B_5': 71,
+    'C_6': 72,
+    'Cs_6': 73,
+    'D_6': 74,
+    'Ds_6': 75,
+    'E_6': 76,
+    'F_6': 77,
+    'Fs_6': 78,
+    'G_6': 79,
+    'Gs_6': 80,
+    'A_6': 81,
+    'As_6': 82,
+    'B_6': 83,
+    'C_7': 84,
+    'Cs_7': 85,
+    'D_7': 86,
+    'Ds_7': 87,
+    'E_7': 88,
+    'F_7': 89,
+    'Fs_7': 90,
+    'G_7': 91,
+    'Gs_7': 92,
+    'A_7': 93,
+    'As_7': 94,
+    'B_7': 95,
+    'C_8': 96,
+    'Cs_8': 97,
+    'D_8': 98,
+    'Ds_8': 99,
+    'E_8': 100,
+    'F_8': 101,
+    'Fs_8': 102,
+    'G_8': 103,
+    'Gs_8': 104,
+    'A_8': 105,
+    'As_8': 106,
+    'B_8': 107,
+    'C_9': 108,
+    'Cs_9': 109,
+    'D_9': 110,
+    'Ds_9': 111,
+    'E_9': 112,
+    'F_9': 113,
+    'Fs_9': 114,
+    'G_9': 115,
+    'Gs_9': 116,
+    'A_9': 117,
+    'As_9': 118,
+    'B_9': 119,
+    'C_10': 120,
+    'Cs_10': 121,
+    'D_10': 122,
+    'Ds_10': 123,
+    'E_10': 124,
+    'F_10': 125,
+    'Fs_10': 126,
+    'G_10': 127,
+}
+
+NOTE_VALUE_MAP_FLAT = [
+    'C_0',
+    'Db_0',
+    'D_0',
+    'Eb_0',
+    'E_0',
+    'F_0',
+    'Gb_0',
+    'G_0',
+    'Ab_0',
+    'A_0',
+    'Bb_0',
+    'B_0',
+    'C_1',
+    'Db_1',
+    'D_1',
+    'Eb_1',
+    'E_1',
+    'F_1',
+    'Gb_1',
+    'G_1',
+    'Ab_1',
+    'A_1',
+    'Bb_1',
+    'B_1',
+    'C_2',
+    'Db_2',
+    'D_2',
+    'Eb_2',
+    'E_2',
+    'F_2',
+    'Gb_2',
+    'G_2',
+    'Ab_2',
+    'A_2',
+    'Bb_2',
+    'B_2',
+    'C_3',
+    'Db_3',
+    'D_3',
+    'Eb_3',
+    'E_3',
+    'F_3',
+    'Gb_3',
+    'G_3',
+    'Ab_3',
+    'A_3',
+    'Bb_3',
+    'B_3',
+    'C_4',
+    'Db_4',
+    'D_4',
+    'Eb_4',
+    'E_4',
+    'F_4',
+    'Gb_4',
+    'G_4',
+    'Ab_4',
+    'A_4',
+    'Bb_4',
+    'B_4',
+    'C_5',
+    'Db_5',
+    'D_5',
+    'Eb_5',
+    'E_5',
+    'F_5',
+    'Gb_5',
+    'G_5',
+    'Ab_5',
+    'A_5',
+    'Bb_5',
+    'B_5',
+    'C_6',
+    'Db_6',
+    'D_6',
+    'Eb_6',
+    'E_6',
+    'F_6',
+    'Gb_6',
+    'G_6',
+    'Ab_6',
+    'A_6',
+    'Bb_6',
+    'B_6',
+    'C_7',
+    'Db_7',
+    'D_7',
+    'Eb_7',
+    'E_7',
+    'F_7',
+    'Gb_7',
+    'G_7',
+    'Ab_7',
+    'A_7',
+    'Bb_7',
+    'B_7',
+    'C_8',
+    'Db_8',
+    'D_8',
+    'Eb_8',
+    'E_8',
+    'F_8',
+    'Gb_8',
+    'G_8',
+    'Ab_8',
+    'A_8',
+    'Bb_8',
+    'B_8',
+    'C_9',
+    'Db_9',
+    'D_9',
+    'Eb_9',
+    'E_9',
+    'F_9',
+    'Gb_9',
+    'G_9',
+    'Ab_9',
+    'A_9',
+    'Bb_9',
+    'B_9',
+    'C_10',
+    'Db_10',
+    'D_10',
+    'Eb_10',
+    'E_10',
+    'F_10',
+    'Gb_10',
+    'G_10',
+]
+
+NOTE_VALUE_MAP_SHARP = [
+    'C_0',
+    'Cs_0',
+    'D_0',
+    'Ds_0',
+    'E_0',
+    'F_0',
+    'Fs_0',
+    'G_0',
+    'Gs_0',
+    'A_0',
+    'As_0',
+    'B_0',
+    'C_1',
+    'Cs_1',
+    'D_1',
+    'Ds_1',
+    'E_1',
+    'F_1',
+    'Fs_1',
+    'G_1',
+    'Gs_1',
+    'A_1',
+    'As_1',
+    'B_1',
+    'C_2',
+    'Cs_2',
+    'D_2',
+    'Ds_2',
+    'E_2',
+    'F_2',
+    'Fs_2',
+    'G_2',
+    'Gs_2',
+    'A_2',
+    'As_2',
+    'B_2',
+    'C_3',
+    'Cs_3',
+    'D_3',
+    'Ds_3',
+    'E_3',
+    'F_3',
+    'Fs_3',
+    'G_3',
+    'Gs_3',
+    'A_3',
+    'As_3',
+    'B_3',
+    'C_4',
+    'Cs_4',
+    'D_4',
+    'Ds_4',
+    'E_4',
+    'F_4',
+    'Fs_4',
+    'G_4',
+    'Gs_4',
+    'A_4',
+    'As_4',
+    'B_4',
+    'C_5',
+    'Cs_5',
+    'D_5',
+    'Ds_5',
+    'E_5',
+    'F_5',
+    'Fs_5',
+    'G_5',
+    'Gs_5',
+    'A_5',
+    'As_5',
+    'B_5',
+    'C_6',
+    'Cs_6',
+    'D_6',
+    'Ds_6',
+    'E_6',
+    'F_6',
+    'Fs_6',
+    'G_6',
+    'Gs_6',
+    'A_6',
+    'As_6',
+    'B_6',
+    'C_7',
+    'Cs_7',
+    'D_7',
+    'Ds_7',
+    'E_7',
+    'F_7',
+    'Fs_7',
+    'G_7',
+    'Gs_7',
+    'A_7',
+    'As_7',
+    'B_7',
+    'C_8',
+    'Cs_8',
+    'D_8',
+    'Ds_8',
+    'E_8',
+    'F_8',
+    'Fs_8',
+    'G_8',
+    'Gs_8',
+    'A_8',
+    'As_8',
+    'B_8',
+    'C_9',
+    'Cs_9',
+    'D_9',
+    'Ds_9',
+    'E_9',
+    'F_9',
+    'Fs_9',
+    'G_9',
+    'Gs_9',
+    'A_9',
+    'As_9',
+    'B_9',
+    'C_10',
+    'Cs_10',
+    'D_10',
+    'Ds_10',
+    'E_10',
+    'F_10',
+    'Fs_10',
+    'G_10',
+]
+
+C_0 = 0
+Cs_0 = 1
+Db_0 = 1
+D_0 = 2
+Ds_0 = 3
+Eb_0 = 3
+E_0 = 4
+F_0 = 5
+Fs_0 = 6
+Gb_0 = 6
+G_0 = 7
+Gs_0 = 8
+Ab_0 = 8
+A_0 = 9
+As_0 = 10
+Bb_0 = 10
+B_0 = 11
+C_1 = 12
+Cs_1 = 13
+Db_1 = 13
+D_1 = 14
+Ds_1 = 15
+Eb_1 = 15
+E_1 = 16
+F_1 = 17
+Fs_1 = 18
+Gb_1 = 18
+G_1 = 19
+Gs_1 = 20
+Ab_1 = 20
+A_1 = 21
+As_1 = 22
+Bb_1 = 22
+B_1 = 23
+C_2 = 24
+Cs_2 = 25
+Db_2 = 25
+D_2 = 26
+Ds_2 = 27
+Eb_2 = 27
+E_2 = 28
+F_2 = 29
+Fs_2 = 30
+Gb_2 = 30
+G_2 = 31
+Gs_2 = 32
+Ab_2 = 32
+A_2 = 33
+As_2 = 34
+Bb_2 = 34
+B_2 = 35
+C_3 = 36
+Cs_3 = 37
+Db_3 = 37
+D_3 = 38
+Ds_3 = 39
+Eb_3 = 39
+E_3 = 40
+F_3 = 41
+Fs_3 = 42
+Gb_3 = 42
+G_3 = 43
+Gs_3 = 44
+Ab_3 = 44
+A_3 = 45
+As_3 = 46
+Bb_3 = 46
+B_3 = 47
+C_4 = 48
+Cs_4 = 49
+Db_4 = 49
+D_4 = 50
+Ds_4 = 51
+Eb_4 = 51
+E_4 = 52
+F_4 = 53
+Fs_4 = 54
+Gb_4 = 54
+G_4 = 55
+Gs_4 = 56
+Ab_4 = 56
+A_4 = 57
+As_4 = 58
+Bb_4 = 58
+B_4 = 59
+C_5 = 60
+Cs_5 = 61
+Db_5 = 61
+D_5 = 62
+Ds_5 = 63
+Eb_5 = 63
+E_5 = 64
+F_5 = 65
+Fs_5 = 66
+Gb_5 = 66
+G_5 = 67
+Gs_5 = 68
+Ab_5 = 68
+A_5 = 69
+As_5 = 70
+Bb_5 = 70
+B_5 = 71
+C_6 = 72
+Cs_6 = 73
+Db_6 = 73
+D_6 = 74
+Ds_6 = 75
+Eb_6 = 75
+E_6 = 76
+F_6 = 77
+Fs_6 = 78
+Gb_6 = 78
+G_6 = 79
+Gs_6 = 80
+Ab_6 = 80
+A_6 = 81
+As_6 = 82
+Bb_6 = 82
+B_6 = 83
+C_7 = 84
+Cs_7 = 85
+Db_7 = 85
+D_7 = 86
+Ds_7 = 87
+Eb_7 = 87
+E_7 = 88
+F_7 = 89
+Fs_7 = 90
+Gb_7 = 90
+G_7 = 91
+Gs_7 = 92
+Ab_7 = 92
+A_7 = 93
+As_7 = 94
+Bb_7 = 94
+B_7 = 95
+C_8 = 96
+Cs_8 = 97
+Db_8 = 97
+D_8 = 98
+Ds_8 = 99
+Eb_8 = 99
+E_8 = 100
+F_8 = 101
+Fs_8 = 102
+Gb_8 = 102
+G_8 = 103
+Gs_8 = 104
+Ab_8 = 104
+A_8 = 105
+As_8 = 106
+Bb_8 = 106
+B_8 = 107
+C_9 = 108
+Cs_9 = 109
+Db_9 = 109
+D_9 = 110
+Ds_9 = 111
+Eb_9 = 111
+E_9 = 112
+F_9 = 113
+Fs_9 = 114
+Gb_9 = 114
+G_9 = 115
+Gs_9 = 116
+Ab_9 = 116
+A_9 = 117
+As_9 = 118
+Bb_9 = 118
+B_9 = 119
+C_10 = 120
+Cs_10 = 121
+Db_10 = 121
+D_10 = 122
+Ds_10 = 123
+Eb_10 = 123
+E_10 = 124
+F_10 = 125
+Fs_10 = 126
+Gb_10 = 126
+G_10 = 127
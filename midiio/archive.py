@@ -0,0 +1,249 @@
+"""
+Archive format packing many MIDI files into a single file.
+
+    archive = <header> + <entry data> [+ <entry data> ...] + <index>
+    header  = "MIOA" + <version u16> + <reserved u16> + <index offset u64>
+              + <index length u64> + <entries u32> + <reserved u32>
+    index   = <entry> [+ <entry> ...]
+    entry   = <name length u16> + <utf-8 name> + <kind u8> + <offset u64> + <length u64>
+
+Entries either hold the bytes of a standard MIDI file or a pattern snapshot in
+the encoding of midiio.serialization. Appending writes the new entries over the
+current index, followed by a new index, and only then updates the header. Existing
+entries are never rewritten and the file only grows by the appended data and the
+index entries, however often it is appended to; an interrupted append leaves an
+archive with a dangling index though.
+"""
+import io
+import os
+import mmap
+import struct
+
+from .fileio import MidiIO
+from .serialization import pattern_to_bytes, pattern_from_bytes
+
+MAGIC = b'MIOA'
+VERSION = 1
+
+SMF = 0
+SNAPSHOT = 1
+
+_HEADER = struct.Struct('<4sHHQQII')
+_ENTRY = struct.Struct('<BQQ')
+
+
+class _BufferReader(object):
+    """
+    Minimal reader over a buffer, returning memoryview slices without copying.
+    """
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        self._position = 0
+
+    def read(self, size=-1):
+        start = self._position
+        end = len(self._view) if size < 0 else min(start + size, len(self._view))
+        self._position = end
+
+        return self._view[start:end]
+
+
+class ArchiveEntry(object):
+    def __init__(self, name, kind, offset, length):
+        self._name = name
+        self._kind = kind
+        self._offset = offset
+        self._length = length
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def kind(self):
+        return self._kind
+
+    @property
+    def offset(self):
+        return self._offset
+
+    @property
+    def length(self):
+        return self._length
+
+    def __repr__(self):
+        return "midiio.ArchiveEntry(name=%r, kind=%r, offset=%r, length=%r)" % \
+            (self.name, self.kind, self.offset, self.length)
+
+
+class MidiArchive(object):
+    """
+    Random and sequential access to the entries of an archive.
+
+    The archive is memory mapped for reading. In mode 'a' entries can be added,
+    creating the archive if it does not exist yet. New entries become visible
+    after flush, which is also called by close. flush remaps the archive, so the
+    views returned by get_bytes have to be released before.
+    """
+    def __init__(self, path, mode='r', midi_io=None):
+        if mode not in ('r', 'a'):
+            raise ValueError("Invalid archive mode: " + str(mode))
+
+        self._path = path
+        self._mode = mode
+        self._midi_io = midi_io if midi_io is not None else MidiIO()
+        self._pending = []
+
+        if mode == 'a' and not os.path.exists(path):
+            with open(path, 'wb') as out:
+                out.write(_HEADER.pack(MAGIC, VERSION, 0, _HEADER.size, 0, 0, 0))
+
+        self._file = open(path, 'rb' if mode == 'r' else 'r+b')
+        self._load()
+
+    def _load(self):
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, index_offset, index_length, entries, _ = \
+            _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError("Invalid archive header: " + repr(magic))
+        if version != VERSION:
+            raise ValueError("Unsupported archive version: " + str(version))
+
+        self._index_offset = index_offset
+        self._entries = {}
+        position = index_offset
+        for _ in range(entries):
+            name_length, = struct.unpack_from('<H', self._map, position)
+            position += 2
+            name = bytes(self._map[position:position + name_length]).decode('utf-8')
+            position += name_length
+            kind, offset, length = _ENTRY.unpack_from(self._map, position)
+            position += _ENTRY.size
+            self._entries[name] = ArchiveEntry(name, kind, offset, length)
+
+    def add(self, name, data, kind=SMF):
+        """
+        Add the bytes of a MIDI file, or of a pattern snapshot with kind SNAPSHOT.
+        """
+        if self._mode != 'a':
+            raise ValueError("Archive is not opened for appending")
+
+        self._pending.append((name, kind, bytes(data)))
+
+    def add_midifile(self, name, midifile):
+        if type(midifile) in (str, bytes):
+            with open(midifile, 'rb') as inp:
+                return self.add(name, inp.read())
+
+        return self.add(name, midifile.read())
+
+    def add_pattern(self, name, pattern, snapshot=False):
+        """
+        Add a pattern, either as a MIDI file or as a snapshot, which is larger but
+        faster to load.
+        """
+        if snapshot:
+            return self.add(name, pattern_to_bytes(pattern), SNAPSHOT)
+
+        buf = io.BytesIO()
+        self._midi_io.write(pattern, buf)
+
+        return self.add(name, buf.getvalue())
+
+    def flush(self):
+        if not self._pending:
+            return
+
+        try:
+            self._map.close()
+        except BufferError:
+            raise ValueError("Release the views returned by get_bytes before "
+                "flushing the archive") from None
+
+        entries = dict(self._entries)
+        self._file.seek(self._index_offset)
+        position = self._index_offset
+        for name, kind, data in self._pending:
+            self._file.write(data)
+            entries[name] = ArchiveEntry(name, kind, position, len(data))
+            position += len(data)
+
+        index = bytearray()
+        for entry in entries.values():
+            encoded_name = entry.name.encode('utf-8')
+            index.extend(struct.pack('<H', len(encoded_name)))
+            index.extend(encoded_name)
+            index.extend(_ENTRY.pack(entry.kind, entry.offset, entry.length))
+        self._file.write(index)
+        self._file.truncate()
+        self._file.flush()
+
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, 0, position, len(index),
+            len(entries), 0))
+        self._file.flush()
+
+        self._pending = []
+        self._load()
+
+    def close(self):
+        if self._mode == 'a':
+            self.flush()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def entries(self):
+        """The entries in the order of their position in the archive."""
+        return sorted(self._entries.values(), key=lambda entry: entry.offset)
+
+    def names(self):
+        return [ entry.name for entry in self.entries() ]
+
+    def get_bytes(self, name):
+        """
+        The data of an entry as a memoryview into the mapped archive, which has to be
+        released before the archive is flushed or closed.
+        """
+        entry = self._entries[name]
+
+        return memoryview(self._map)[entry.offset:entry.offset + entry.length]
+
+    def get_pattern(self, name):
+        return self._parse(self._entries[name])
+
+    def _parse(self, entry):
+        data = memoryview(self._map)[entry.offset:entry.offset + entry.length]
+        try:
+            if entry.kind == SNAPSHOT:
+                return pattern_from_bytes(data)
+
+            return self._midi_io.parse(_BufferReader(data))
+        finally:
+            data.release()
+
+    def items(self):
+        """
+        Iterate over (name, pattern) in the order of the archive, for bulk scans.
+        """
+        for entry in self.entries():
+            yield entry.name, self._parse(entry)
+
+    def __getitem__(self, name):
+        return self.get_pattern(name)
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,4 +1,3 @@
-from pprint import pformat
 
 class Pattern(object):
     def __init__(self, tracks=[], resolution=220, format=1):
@@ -16,11 +15,41 @@ class Pattern(object):
     def tracks(self):
         return self._tracks
 
-    def append(track):
-        return Pattern(self._format, self.resolution, self._tracks + (track, ))
+    def append(self, track):
+        return Pattern(self._tracks + (track, ), self._resolution, self._format)
 
-    def extend(tracks):
-        return Pattern(self._format, self.resolution, self._tracks + tuple(tracks))
+    def extend(self, tracks):
+        return Pattern(self._tracks + tuple(tracks), self._resolution, self._format)
+
+    def to_bytes(self):
+        """
+        Encode the pattern in the compact format of midiio.serialization.
+        """
+        from .serialization import pattern_to_bytes
+        return pattern_to_bytes(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        from .serialization import pattern_from_bytes
+        return pattern_from_bytes(data)
+
+    def __reduce__(self):
+        from .serialization import pattern_from_bytes
+        try:
+            return (pattern_from_bytes, (self.to_bytes(), ))
+        except (KeyError, ValueError):
+            # events unknown to the registry are pickled as they are
+            return (Pattern, (self._tracks, self._resolution, self._format))
+
+    def __eq__(self, other):
+        if not isinstance(other, Pattern):
+            return NotImplemented
+
+        return self._format == other._format and \
+            self._resolution == other._resolution and self._tracks == other._tracks
+
+    def __hash__(self):
+        return hash((self._format, self._resolution, self._tracks))
 
     def __getitem__(self, key):
         return self._tracks[key]
@@ -32,24 +61,73 @@ class Pattern(object):
         return len(self._tracks)
 
     def __repr__(self):
+        from pprint import pformat
+
         return "midiio.Pattern(format=%r, resolution=%r, tracks=\\\n%s)" % \
             (self.format, self.resolution, pformat(list(self._tracks)))
 
 
 class Track(object):
-    def __init__(self, events=[]):
+    def __init__(self, events=[], chunk=None):
         self._events = tuple(events)
+        self._chunk = chunk
 
     @property
     def events(self):
         return self._events
 
-    def append(event):
+    @property
+    def chunk(self):
+        """
+        The data of the MTrk chunk the events were read from, if it was kept. It is
+        written instead of the encoded events; every change of a track creates a new
+        track without a chunk.
+        """
+        return self._chunk
+
+    def append(self, event):
         return Track(self._events + (event, ))
 
-    def extend(events):
+    def extend(self, events):
         return Track(self._events + tuple(events))
 
+    def to_bytes(self):
+        """
+        Encode the track in the compact format of midiio.serialization.
+        """
+        from .serialization import track_to_bytes
+        return track_to_bytes(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        from .serialization import track_from_bytes
+        return track_from_bytes(data)
+
+    def __reduce__(self):
+        from .serialization import track_from_bytes
+        try:
+            return (track_from_bytes, (self.to_bytes(), ))
+        except (KeyError, ValueError):
+            # events unknown to the registry are pickled as they are
+            return (Track, (self._events, ))
+
+    def __eq__(self, other):
+        if not isinstance(other, Track):
+            return NotImplemented
+
+        # the cached hashes tell most different tracks apart without comparing
+        # their events
+        return self is other or (hash(self) == hash(other) and
+            self._events == other._events)
+
+    def __hash__(self):
+        # tracks are immutable, so the hash of the events is computed only once
+        track_hash = self.__dict__.get('_hash')
+        if track_hash is None:
+            track_hash = self._hash = hash(self._events)
+
+        return track_hash
+
     def __getitem__(self, key):
         return self._events[key]
 
@@ -60,4 +138,6 @@ class Track(object):
         return len(self._events)
 
     def __repr__(self):
+        from pprint import pformat
+
         return "midiio.Track(\\\n  %s)" % (pformat(list(self._events)).replace('\n', '\n  '), )
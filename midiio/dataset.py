@@ -0,0 +1,253 @@
+import heapq
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .events import *
+from .containers import *
+from .fileio import read_midifile
+from .timing import TempoMap
+
+EVENTS = 'events'
+TICKS = 'ticks'
+SECONDS = 'seconds'
+
+
+def _load(path, event_filter):
+    return read_midifile(path, event_filter)
+
+
+class Window(object):
+    """
+    A window of events of a single file.
+
+    start and end are given in the unit of the dataset, as event index, tick or
+    seconds. The first event of the track has a delta-time relative to the start of
+    the window, or to the first event for windows counted in events.
+    """
+    def __init__(self, source, start, end, track):
+        self._source = source
+        self._start = start
+        self._end = end
+        self._track = track
+
+    @property
+    def source(self):
+        return self._source
+
+    @property
+    def start(self):
+        return self._start
+
+    @property
+    def end(self):
+        return self._end
+
+    @property
+    def track(self):
+        return self._track
+
+    def __len__(self):
+        return len(self._track)
+
+    def __repr__(self):
+        return "midiio.Window(source=%r, start=%r, end=%r, events=%r)" % \
+            (self.source, self.start, self.end, len(self))
+
+
+class DatasetStats(object):
+    def __init__(self):
+        self.files = 0
+        self.failures = 0
+        self.events = 0
+        self.windows = 0
+        self.elapsed = 0.0
+        self.waiting = 0.0
+
+    @property
+    def files_per_second(self):
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def events_per_second(self):
+        return self.events / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def windows_per_second(self):
+        return self.windows / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return "midiio.DatasetStats(files=%r, failures=%r, events=%r, windows=%r, " \
+            "elapsed=%.3f, waiting=%.3f)" % (self.files, self.failures, self.events,
+                self.windows, self.elapsed, self.waiting)
+
+
+class WindowDataset(object):
+    """
+    Iterator over fixed-size windows of the events of many MIDI files.
+
+    * size, stride: the length of a window and the distance between the starts of
+      consecutive windows, measured in unit: EVENTS, TICKS or SECONDS. The stride
+      defaults to the size. Windows shorter than size at the end of a file are
+      dropped.
+    * tracks, channels: the indices of the tracks and the channels to use; the
+      events of the selected tracks are merged by time. Meta and sysex events pass
+      the channel selection.
+    * shuffle, seed: shuffle the order of the files deterministically, with a new
+      order for every iteration over the dataset.
+    * workers, prefetch: files are read by read_midifile in a pool of worker
+      processes (or threads, with processes=False), with at most prefetch files
+      loaded ahead, so memory stays bounded. With no workers, files are read in
+      the iterating thread.
+
+    Throughput counters of the last iteration are available as stats.
+    """
+    def __init__(self, paths, size, stride=None, unit=EVENTS, tracks=None,
+            channels=None, shuffle=False, seed=None, workers=2, prefetch=4,
+            processes=True, event_filter=None):
+        if unit not in (EVENTS, TICKS, SECONDS):
+            raise ValueError("Invalid unit: " + str(unit))
+
+        self._paths = list(paths)
+        self._size = size
+        self._stride = stride if stride is not None else size
+        self._unit = unit
+        self._tracks = set(tracks) if tracks is not None else None
+        self._channels = frozenset(channels) if channels is not None else None
+        self._shuffle = shuffle
+        self._random = random.Random(seed)
+        self._workers = workers
+        self._prefetch = max(prefetch, 1)
+        self._processes = processes
+        self._event_filter = event_filter
+        self._stats = DatasetStats()
+
+    @property
+    def stats(self):
+        return self._stats
+
+    def __iter__(self):
+        paths = list(self._paths)
+        if self._shuffle:
+            self._random.shuffle(paths)
+
+        self._stats = stats = DatasetStats()
+        started = time.perf_counter()
+        for path, pattern in self._load_all(paths, stats):
+            for window in self.windows(path, pattern):
+                stats.windows += 1
+                stats.elapsed = time.perf_counter() - started
+                yield window
+        stats.elapsed = time.perf_counter() - started
+
+    def _load_all(self, paths, stats):
+        if not self._workers:
+            for path in paths:
+                waiting = time.perf_counter()
+                try:
+                    pattern = _load(path, self._event_filter)
+                except Exception:
+                    stats.failures += 1
+                    continue
+                finally:
+                    stats.waiting += time.perf_counter() - waiting
+                stats.files += 1
+                yield path, pattern
+            return
+
+        pool_type = ProcessPoolExecutor if self._processes else ThreadPoolExecutor
+        with pool_type(self._workers) as executor:
+            remaining = iter(paths)
+            pending = deque()
+            for path in remaining:
+                pending.append((path, executor.submit(_load, path, self._event_filter)))
+                if len(pending) >= self._prefetch:
+                    break
+
+            while pending:
+                path, future = pending.popleft()
+                for next_path in remaining:
+                    pending.append((next_path,
+                        executor.submit(_load, next_path, self._event_filter)))
+                    break
+
+                waiting = time.perf_counter()
+                try:
+                    pattern = future.result()
+                except Exception:
+                    stats.failures += 1
+                    continue
+                finally:
+                    stats.waiting += time.perf_counter() - waiting
+                stats.files += 1
+                yield path, pattern
+
+    def _select(self, pattern):
+        """
+        Merge the selected events of all selected tracks into absolute time order.
+        """
+        def timed(index, track):
+            tick = 0
+            for position, event in enumerate(track):
+                tick += event.tick
+                if self._channels is not None and isinstance(event, MidiEvent) and \
+                        event.channel not in self._channels:
+                    continue
+                yield tick, index, position, event
+
+        return [ (tick, event) for tick, _, _, event in heapq.merge(*[
+            timed(index, track) for index, track in enumerate(pattern)
+                if self._tracks is None or index in self._tracks ]) ]
+
+    def windows(self, source, pattern):
+        """
+        Iterate over the windows of a single pattern.
+        """
+        events = self._select(pattern)
+        self._stats.events += len(events)
+
+        if self._unit == EVENTS:
+            for first in range(0, len(events) - self._size + 1, self._stride):
+                selected = events[first:first + self._size]
+                yield Window(source, first, first + self._size,
+                    self._track(selected, selected[0][0]))
+            return
+
+        if self._unit == TICKS:
+            times = [ tick for tick, _ in events ]
+        else:
+            tempo_map = TempoMap.from_pattern(pattern)
+            times = [ tempo_map.tick_to_seconds(tick) for tick, _ in events ]
+        if not times:
+            return
+
+        first = 0
+        start = 0
+        end_of_file = times[-1]
+        while start + self._size <= end_of_file:
+            end = start + self._size
+            while first < len(times) and times[first] < start:
+                first += 1
+            last = first
+            while last < len(times) and times[last] < end:
+                last += 1
+            if self._unit == TICKS:
+                origin = start
+            else:
+                origin = tempo_map.seconds_to_tick(start)
+                if first < last:
+                    origin = min(origin, events[first][0])
+            yield Window(source, start, end, self._track(events[first:last], origin))
+            start += self._stride
+
+    def _track(self, events, origin):
+        result = []
+        previous = origin
+        for tick, event in events:
+            if event.tick != tick - previous:
+                event = event.replace(tick=tick - previous)
+            result.append(event)
+            previous = tick
+
+        return Track(result)
@@ -0,0 +1,165 @@
+import hashlib
+
+from .events import *
+from .containers import *
+from .eventio import EVENTIO_REGISTRY, BinaryNoteOffEvent
+from .fileio import _ChunkParserMixin, EventIO, MidiIO
+
+DIGEST_SIZE = 16
+
+
+class TrackHasher(object):
+    """
+    Canonical content hash of tracks.
+
+    The hash is computed over the events encoded with explicit status bytes, so it
+    does not depend on the running status used in the source file. Note on events
+    with a velocity of zero are hashed as note off events and the release velocity
+    of note off events is ignored. Events of the ignored types are left out; their
+    delta-time is added to the following event.
+    """
+    def __init__(self, ignore_types=(TrackNameMetaEvent, ),
+            event_registry=EVENTIO_REGISTRY):
+        self._ignore_types = tuple(ignore_types)
+        self._event_registry = event_registry
+        self._event_io = EventIO(event_registry)
+
+    def hash_track(self, track):
+        digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+        registry = self._event_registry.freeze()
+
+        carry = 0
+        for event in track:
+            if isinstance(event, self._ignore_types):
+                carry += event.tick
+                continue
+
+            tick = event.tick + carry
+            carry = 0
+            if isinstance(event, NoteOffEvent) or \
+                    isinstance(event, NoteOnEvent) and event.velocity == 0:
+                binary_event = BinaryNoteOffEvent(tick, event.pitch, 0, event.channel)
+            else:
+                binary_event = registry.get_binary_type(type(event)).copy_from(event)
+                if binary_event.tick != tick:
+                    binary_event = binary_event.replace(tick=tick)
+            digest.update(self._event_io.encode_event(binary_event))
+
+        return digest.digest()
+
+
+def chunk_digest(chunk_data):
+    """
+    Hash of the raw bytes of a chunk, for exact matches without parsing.
+    """
+    return hashlib.blake2b(chunk_data, digest_size=DIGEST_SIZE).digest()
+
+
+class DedupIndex(_ChunkParserMixin):
+    """
+    Index of unique tracks across a corpus.
+
+    Tracks are identified by their canonical hash (see TrackHasher), so the same
+    track saved with a different name or encoding is found as a duplicate. Patterns
+    added to the index share a single Track instance for equal tracks, which is the
+    first one seen; a track that only has the same canonical hash, like one with
+    another name, is kept as it is. Raw track chunks can be indexed separately by
+    their exact bytes, without parsing the file.
+    """
+    def __init__(self, ignore_types=(TrackNameMetaEvent, ),
+            event_registry=EVENTIO_REGISTRY):
+        self._hasher = TrackHasher(ignore_types, event_registry)
+        self._event_registry = event_registry
+        self._tracks = {}
+        self._sources = {}
+        self._chunk_sources = {}
+
+    def add_track(self, track, source=None):
+        """
+        Add a track and return its digest and the shared instance of an equal track,
+        or the track itself.
+        """
+        digest = self._hasher.hash_track(track)
+        shared = self._tracks.setdefault(digest, track)
+        self._sources.setdefault(digest, []).append(source)
+
+        # the canonical hash ignores differences that reading must not lose
+        return digest, shared if shared == track else track
+
+    def add_pattern(self, pattern, source=None):
+        """
+        Add all tracks of a pattern, returning a pattern using the shared tracks.
+        """
+        tracks = [ self.add_track(track, (source, index))[1]
+            for index, track in enumerate(pattern) ]
+
+        if all(new is old for new, old in zip(tracks, pattern)):
+            return pattern
+
+        return Pattern(tracks, pattern.resolution, pattern.format)
+
+    def read_midifile(self, midifile):
+        """
+        Read a MIDI file, sharing the tracks already present in the index.
+        """
+        if type(midifile) in (str, bytes):
+            with open(midifile, 'rb') as inp:
+                return self._read(inp, midifile)
+
+        return self._read(midifile, None)
+
+    def _read(self, midi_reader, source):
+        pattern = MidiIO(self._event_registry).parse(midi_reader)
+
+        return self.add_pattern(pattern, source)
+
+    def add_raw_midifile(self, midifile):
+        """
+        Index the track chunks of a MIDI file by their exact bytes, without parsing
+        the events. Returns the digests of the track chunks.
+        """
+        if type(midifile) in (str, bytes):
+            with open(midifile, 'rb') as inp:
+                return self._add_raw(inp, midifile)
+
+        return self._add_raw(midifile, None)
+
+    def _add_raw(self, midi_reader, source):
+        digests = []
+        for chunk_id, chunk_data in self.iter_chunks(midi_reader):
+            if chunk_id != b'MTrk':
+                continue
+            digest = chunk_digest(chunk_data)
+            self._chunk_sources.setdefault(digest, []).append((source, len(digests)))
+            digests.append(digest)
+
+        return digests
+
+    def get_track(self, digest):
+        return self._tracks[digest]
+
+    def get_sources(self, digest):
+        """
+        The (source, track index) pairs of a track or raw chunk digest.
+        """
+        return list(self._sources.get(digest, ())) + \
+            list(self._chunk_sources.get(digest, ()))
+
+    def duplicates(self):
+        """
+        The sources of all track contents seen more than once, keyed by digest.
+        """
+        return { digest: list(sources)
+            for index in (self._sources, self._chunk_sources)
+                for digest, sources in index.items() if len(sources) > 1 }
+
+    def __contains__(self, digest):
+        return digest in self._tracks or digest in self._chunk_sources
+
+    def __len__(self):
+        """The number of distinct parsed tracks."""
+        return len(self._tracks)
+
+
+def hash_track(track):
+    return TrackHasher().hash_track(track)
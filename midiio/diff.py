@@ -0,0 +1,382 @@
+"""
+Structural diff and patch of patterns.
+
+A PatternPatch turns one pattern into another. Every track of the new pattern is
+a copy of a track of the old pattern, the result of editing one with a list of
+hunks, or a new track. Unchanged tracks are found by their cached content hash,
+see Track.__hash__, and changed tracks are diffed event by event with the
+linear-space variant of the Myers algorithm. The events are compared as they are
+stored, with their delta-times, so moving an event also modifies the event after
+it.
+
+A patch is encoded in a compact binary format, with the inserted events in the
+encoding of midiio.serialization. All numbers are little endian.
+
+    patch = "MIOD" + <version u16> + <format u16> + <resolution i16>
+            + <tracks u32> + <base digest 16 bytes> + <track> [+ <track> ...]
+    track = <source i32> + <hunks u32> + <hunk> [+ <hunk> ...]
+    hunk  = <start u32> + <deleted u32> + <size u32> + <encoded events>
+
+The source of a new track is -1. The base digest identifies the pattern the patch
+applies to.
+"""
+import hashlib
+import struct
+
+from .containers import *
+from .eventio import EVENTIO_REGISTRY
+from .serialization import PatternSerializer
+
+MAGIC = b'MIOD'
+VERSION = 1
+DIGEST_SIZE = 16
+
+_HEADER = struct.Struct('<4sHHhI%ds' % DIGEST_SIZE)
+_TRACK_HEADER = struct.Struct('<iI')
+_HUNK_HEADER = struct.Struct('<III')
+
+
+class Hunk(object):
+    """
+    Replacement of the deleted events starting at start by the given events.
+    """
+    def __init__(self, start, deleted, events=()):
+        self._start = start
+        self._deleted = deleted
+        self._events = tuple(events)
+
+    @property
+    def start(self):
+        """The index of the first deleted event in the old events."""
+        return self._start
+
+    @property
+    def deleted(self):
+        """The number of deleted events."""
+        return self._deleted
+
+    @property
+    def events(self):
+        """The inserted events."""
+        return self._events
+
+    @property
+    def kind(self):
+        """'insert', 'delete' or 'modify'."""
+        if not self._deleted:
+            return 'insert'
+        if not self._events:
+            return 'delete'
+
+        return 'modify'
+
+    def __eq__(self, other):
+        if not isinstance(other, Hunk):
+            return NotImplemented
+
+        return (self._start, self._deleted, self._events) == \
+            (other._start, other._deleted, other._events)
+
+    def __hash__(self):
+        return hash((self._start, self._deleted, self._events))
+
+    def __repr__(self):
+        return "midiio.Hunk(start=%r, deleted=%r, events=%r)" % \
+            (self._start, self._deleted, list(self._events))
+
+
+def _middle_snake(a, a_start, n, b, b_start, m):
+    """
+    Find the middle snake of the shortest edit script of a[a_start:a_start + n]
+    and b[b_start:b_start + m].
+
+    Returns the start and end of the snake relative to the sequence starts and the
+    length of the edit script.
+    """
+    delta = n - m
+    odd = delta & 1
+    offset = n + m + 1
+    forward = [0] * (2 * offset + 1)
+    backward = [0] * (2 * offset + 1)
+
+    for d in range((n + m + 1) // 2 + 1):
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and
+                    forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            x_start = x
+            while x < n and y < m and a[a_start + x] == b[b_start + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and delta - (d - 1) <= k <= delta + (d - 1) and \
+                    x + backward[offset + delta - k] >= n:
+                return x_start, x_start - k, x, y, 2 * d - 1
+
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and
+                    backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            x_start = x
+            while x < n and y < m and \
+                    a[a_start + n - x - 1] == b[b_start + m - y - 1]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if not odd and -d <= delta - k <= d and \
+                    x + forward[offset + delta - k] >= n:
+                return n - x, m - y, n - x_start, m - x_start + k, 2 * d
+
+    raise AssertionError("No middle snake found")
+
+
+def _matches(a, a_start, a_end, b, b_start, b_end, matches):
+    # common prefix and suffix are matched directly
+    while a_start < a_end and b_start < b_end and a[a_start] == b[b_start]:
+        matches.append((a_start, b_start))
+        a_start += 1
+        b_start += 1
+    suffix = []
+    while a_start < a_end and b_start < b_end and a[a_end - 1] == b[b_end - 1]:
+        a_end -= 1
+        b_end -= 1
+        suffix.append((a_end, b_end))
+
+    if a_start < a_end and b_start < b_end:
+        x, y, u, v, d = _middle_snake(a, a_start, a_end - a_start, b, b_start,
+            b_end - b_start)
+        if d > 1:
+            _matches(a, a_start, a_start + x, b, b_start, b_start + y, matches)
+            matches.extend((a_start + i, b_start + y + i - x) for i in range(x, u))
+            _matches(a, a_start + u, a_end, b, b_start + v, b_end, matches)
+
+    matches.extend(reversed(suffix))
+
+
+def diff_sequences(a, b):
+    """
+    Return the hunks of the shortest edit script turning the sequence a into b.
+
+    The items are compared by equality and must be hashable.
+    """
+    # compare small integers instead of the items themselves
+    ids = {}
+    a_ids = [ ids.setdefault(item, len(ids)) for item in a ]
+    b_ids = [ ids.setdefault(item, len(ids)) for item in b ]
+
+    matches = []
+    _matches(a_ids, 0, len(a_ids), b_ids, 0, len(b_ids), matches)
+    matches.append((len(a_ids), len(b_ids)))
+
+    hunks = []
+    i = j = 0
+    for a_index, b_index in matches:
+        if a_index > i or b_index > j:
+            hunks.append(Hunk(i, a_index - i, b[j:b_index]))
+        i = a_index + 1
+        j = b_index + 1
+
+    return hunks
+
+
+def apply_hunks(events, hunks):
+    """
+    Return the events edited by the hunks, which are ordered by their start.
+    """
+    result = []
+    position = 0
+    for hunk in hunks:
+        if hunk.start < position or hunk.start + hunk.deleted > len(events):
+            raise ValueError("Hunk does not apply: " + repr(hunk))
+        result.extend(events[position:hunk.start])
+        result.extend(hunk.events)
+        position = hunk.start + hunk.deleted
+    result.extend(events[position:])
+
+    return result
+
+
+class PatternPatch(object):
+    """
+    The changes turning a base pattern into a new pattern.
+
+    tracks holds a (source, hunks) pair per track of the new pattern: the index of
+    the track of the base pattern the hunks are applied to, or None for a new
+    track built from the events of the hunks. A track without hunks is a copy of
+    its source; a changed track is sent as a new track if its hunks would insert
+    as many events as it has.
+    """
+    def __init__(self, format, resolution, tracks, base_digest=None):
+        self._format = format
+        self._resolution = resolution
+        self._tracks = tuple((source, tuple(hunks)) for source, hunks in tracks)
+        self._base_digest = base_digest
+
+    @property
+    def format(self):
+        return self._format
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    @property
+    def tracks(self):
+        return self._tracks
+
+    @property
+    def base_digest(self):
+        return self._base_digest
+
+    @property
+    def changed_tracks(self):
+        """The indices of the new tracks that are not copies of a base track."""
+        return [ index for index, (source, hunks) in enumerate(self._tracks)
+            if source is None or hunks ]
+
+    def __eq__(self, other):
+        if not isinstance(other, PatternPatch):
+            return NotImplemented
+
+        return (self._format, self._resolution, self._tracks, self._base_digest) == \
+            (other._format, other._resolution, other._tracks, other._base_digest)
+
+    def __hash__(self):
+        return hash((self._format, self._resolution, self._tracks))
+
+    def __repr__(self):
+        return "midiio.PatternPatch(format=%r, resolution=%r, tracks=%r)" % \
+            (self._format, self._resolution, list(self._tracks))
+
+
+class PatternDiffer(object):
+    def __init__(self, event_registry=EVENTIO_REGISTRY):
+        self._serializer = PatternSerializer(event_registry)
+
+    def digest(self, pattern):
+        """
+        Hash of the serialized pattern, which is stable across processes.
+        """
+        return hashlib.blake2b(self._serializer.pattern_to_bytes(pattern),
+            digest_size=DIGEST_SIZE).digest()
+
+    def diff(self, base, pattern, digest=True):
+        """
+        Return the PatternPatch turning base into pattern. With digest, the patch
+        records the digest of base, which is then checked when it is applied.
+        """
+        sources = {}
+        for index, track in enumerate(base):
+            sources.setdefault(track, index)
+        copies = [ sources.get(track) for track in pattern ]
+
+        # changed tracks are diffed against the base track at the same index, or
+        # else the first base track that is not copied
+        unused = [ index for index in range(len(base)) if index not in copies ]
+
+        tracks = []
+        for index, track in enumerate(pattern):
+            if copies[index] is not None:
+                tracks.append((copies[index], ()))
+                continue
+
+            source = index if index in unused else (unused[0] if unused else None)
+            hunks = None
+            if source is not None:
+                hunks = diff_sequences(base[source].events, track.events)
+                if sum(len(hunk.events) for hunk in hunks) >= len(track):
+                    hunks = None
+            if hunks is None:
+                tracks.append((None, (Hunk(0, 0, track.events), )))
+            else:
+                unused.remove(source)
+                tracks.append((source, hunks))
+
+        return PatternPatch(pattern.format, pattern.resolution, tracks,
+            self.digest(base) if digest else None)
+
+    def apply(self, base, patch, verify=True):
+        """
+        Return the pattern the patch was created for. The patch may be given
+        encoded; with verify, a digest recorded in the patch must match base.
+        """
+        if not isinstance(patch, PatternPatch):
+            patch = self.patch_from_bytes(patch)
+
+        if verify and patch.base_digest is not None and \
+                patch.base_digest != self.digest(base):
+            raise ValueError("Patch does not apply to this pattern")
+
+        tracks = []
+        for source, hunks in patch.tracks:
+            if source is None:
+                tracks.append(Track(apply_hunks((), hunks)))
+            elif not hunks:
+                tracks.append(base[source])
+            else:
+                tracks.append(Track(apply_hunks(base[source].events, hunks)))
+
+        return Pattern(tracks, patch.resolution, patch.format)
+
+    def patch_to_bytes(self, patch):
+        buf = bytearray(_HEADER.pack(MAGIC, VERSION, patch.format, patch.resolution,
+            len(patch.tracks), patch.base_digest or bytes(DIGEST_SIZE)))
+        for source, hunks in patch.tracks:
+            buf.extend(_TRACK_HEADER.pack(-1 if source is None else source,
+                len(hunks)))
+            for hunk in hunks:
+                events = self._serializer.track_to_bytes(Track(hunk.events))
+                buf.extend(_HUNK_HEADER.pack(hunk.start, hunk.deleted, len(events)))
+                buf.extend(events)
+
+        return bytes(buf)
+
+    def patch_from_bytes(self, data):
+        view = memoryview(data).cast('B')
+        magic, version, format_version, resolution, track_count, base_digest = \
+            _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Invalid patch encoding: " + repr(magic))
+        if version != VERSION:
+            raise ValueError("Unsupported patch encoding version: " + str(version))
+
+        position = _HEADER.size
+        tracks = []
+        for _ in range(track_count):
+            source, hunk_count = _TRACK_HEADER.unpack_from(view, position)
+            position += _TRACK_HEADER.size
+            hunks = []
+            for _ in range(hunk_count):
+                start, deleted, size = _HUNK_HEADER.unpack_from(view, position)
+                position += _HUNK_HEADER.size
+                end = position + size
+                events = self._serializer.track_from_bytes(view[position:end])
+                position = end
+                hunks.append(Hunk(start, deleted, events))
+            tracks.append((None if source < 0 else source, hunks))
+
+        if base_digest == bytes(DIGEST_SIZE):
+            base_digest = None
+
+        return PatternPatch(format_version, resolution, tracks, base_digest)
+
+
+_DIFFER = PatternDiffer()
+
+def diff_patterns(base, pattern, digest=True):
+    return _DIFFER.diff(base, pattern, digest)
+
+def apply_patch(base, patch, verify=True):
+    return _DIFFER.apply(base, patch, verify)
+
+def patch_to_bytes(patch):
+    return _DIFFER.patch_to_bytes(patch)
+
+def patch_from_bytes(data):
+    return _DIFFER.patch_from_bytes(data)
@@ -0,0 +1,343 @@
+"""
+Dumping of many MIDI files, the implementation of scripts/mididump.py.
+
+Events are written one per line while the tracks are walked, either as JSON Lines
+or in a compact text format, without building the repr of the pattern. Files are
+processed in a pool of worker processes if workers is given; the output of every
+file is written as a whole and in the order of the paths.
+
+Every file ends with a status: a record with an "exit" key in JSON Lines, and a
+message on the error stream in the text format if the file could not be read.
+The exit code of main is 0 if all files were read, 1 if any file failed and 2
+for usage errors.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+from . import events as _events
+from .fileio import EventFilter, HeaderIO, MidiIO, _ChunkParserMixin
+from .metadata import MetadataScanner
+
+OK = 0
+FAILED = 1
+USAGE = 2
+
+MIDI_EXTENSIONS = ('.mid', '.midi', '.smf', '.kar')
+
+def event_type_name(event_type):
+    """
+    The name of the class of midiio.events an event type is based on, like
+    NoteOnEvent for the BinaryNoteOnEvent of the registry.
+    """
+    return event_type.event_type().__name__
+
+
+def event_fields(event):
+    """
+    The properties of an event besides the tick, as (name, value) pairs with values
+    that can be written as JSON: byte strings are given in hex.
+    """
+    fields = []
+    for name in event._arg_names():
+        if name == 'tick':
+            continue
+        value = getattr(event, name)
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            value = bytes(value).hex()
+        elif isinstance(value, (tuple, list)):
+            value = list(value)
+        elif not isinstance(value, (int, float, str, bool, type(None))):
+            value = str(value)
+        fields.append((name, value))
+
+    return fields
+
+
+def format_event_text(path, track, tick, event):
+    """
+    Format an event as a single line: the file, the track index, the absolute tick,
+    the event type and its properties.
+    """
+    parts = ['%s:%d' % (path, track), str(tick), event_type_name(type(event))]
+    parts.extend('%s=%s' % (name, json.dumps(value, separators=(',', ':')))
+        for name, value in event_fields(event))
+
+    return ' '.join(parts)
+
+
+def format_event_json(path, track, tick, event):
+    record = {'file': path, 'track': track, 'tick': tick, 'delta': event.tick,
+        'type': event_type_name(type(event))}
+    record.update(event_fields(event))
+
+    return json.dumps(record)
+
+
+def event_filter_from_options(options):
+    """
+    Create the EventFilter for the parsed command line options, None if no filter
+    option was given.
+    """
+    def event_types(names):
+        types = []
+        for name in names:
+            event_type = getattr(_events, name, None)
+            if not isinstance(event_type, type) or \
+                    not issubclass(event_type, _events._AbstractEvent):
+                raise ValueError("Unknown event type: " + name)
+            types.append(event_type)
+        return types
+
+    if not (options.types or options.exclude_types or options.channels is not None or
+            options.meta_commands is not None or options.exclude_controls or
+            options.start_tick or options.end_tick is not None):
+        return None
+
+    return EventFilter(event_types(options.types) if options.types else None,
+        event_types(options.exclude_types), options.channels, options.meta_commands,
+        options.exclude_controls, options.start_tick, options.end_tick)
+
+
+class Dumper(_ChunkParserMixin):
+    """
+    Write the events, the metadata summary or the header of files.
+
+    mode is 'events', 'summary' or 'header' and output_format 'text' or 'json'.
+    Lines are passed to write without a line end.
+    """
+    def __init__(self, mode='events', output_format='text', event_filter=None):
+        self._mode = mode
+        self._json = output_format == 'json'
+        self._event_filter = event_filter
+        self._midi_io = None
+        self._scanner = None
+
+    def dump(self, path, write):
+        """
+        Write the lines of a file and return its exit code.
+        """
+        try:
+            with open(path, 'rb') as midi_reader:
+                if self._mode == 'header':
+                    count = self._dump_header(path, midi_reader, write)
+                elif self._mode == 'summary':
+                    count = self._dump_summary(path, midi_reader, write)
+                else:
+                    count = self._dump_events(path, midi_reader, write)
+        except Exception as error:
+            message = '%s: %s' % (type(error).__name__, error)
+            if self._json:
+                write(json.dumps({'file': path, 'exit': FAILED, 'error': message}))
+            else:
+                sys.stderr.write('%s: %s\n' % (path, message))
+            return FAILED
+
+        if self._json:
+            write(json.dumps({'file': path, 'exit': OK, 'records': count}))
+
+        return OK
+
+    def _write_record(self, write, record):
+        if self._json:
+            write(json.dumps(record))
+        else:
+            write(' '.join([record.pop('file')] + [ '%s=%s' % (key,
+                json.dumps(value, separators=(',', ':')))
+                    for key, value in record.items() ]))
+
+    def _dump_header(self, path, midi_reader, write):
+        chunk_id, chunk_data = self.parse_chunk(midi_reader)
+        if chunk_id != b'MThd':
+            raise ValueError("Invalid file header: " + repr(chunk_id))
+        tracks, resolution, format_version = HeaderIO().parse(chunk_data)
+
+        self._write_record(write, {'file': path, 'format': format_version,
+            'resolution': resolution, 'tracks': tracks})
+
+        return 1
+
+    def _dump_summary(self, path, midi_reader, write):
+        if self._scanner is None:
+            self._scanner = MetadataScanner()
+        info = self._scanner.scan(midi_reader)
+
+        self._write_record(write, {'file': path, 'format': info.format,
+            'resolution': info.resolution, 'tracks': len(info.tracks),
+            'track_names': info.track_names, 'duration': info.duration,
+            'seconds': round(info.seconds, 3), 'notes': info.note_count,
+            'tempos': [ [event.tick, event.micros_per_quarter]
+                for event in info.tempos ],
+            'time_signatures': [ [event.tick, event.nominator, event.denominator]
+                for event in info.time_signatures ]})
+
+        return 1
+
+    def _dump_events(self, path, midi_reader, write):
+        if self._midi_io is None:
+            self._midi_io = MidiIO(event_filter=self._event_filter)
+        pattern = self._midi_io.parse(midi_reader)
+
+        format_event = format_event_json if self._json else format_event_text
+        if self._json:
+            write(json.dumps({'file': path, 'format': pattern.format,
+                'resolution': pattern.resolution, 'tracks': len(pattern)}))
+
+        # the filter keeps the end of track events, which are only listed if selected
+        skip_end_of_track = self._event_filter is not None and \
+            not self._event_filter.selects_end_of_track
+
+        count = 0
+        for index, track in enumerate(pattern):
+            tick = 0
+            for event in track:
+                tick += event.tick
+                if skip_end_of_track and isinstance(event,
+                        _events.EndOfTrackMetaEvent):
+                    continue
+                write(format_event(path, index, tick, event))
+                count += 1
+
+        return count
+
+
+def _dump_to_string(dumper, path):
+    lines = []
+    exit_code = dumper.dump(path, lines.append)
+    lines.append('')
+
+    return exit_code, '\n'.join(lines)
+
+
+def dump_files(paths, output, mode='events', output_format='text', event_filter=None,
+        workers=None, chunksize=4):
+    """
+    Dump the files to the text stream output and return the exit codes of the files
+    in the order of the paths.
+    """
+    dumper = Dumper(mode, output_format, event_filter)
+    exit_codes = []
+    if workers:
+        from concurrent.futures import ProcessPoolExecutor
+        from functools import partial
+
+        with ProcessPoolExecutor(workers) as executor:
+            for exit_code, text in executor.map(partial(_dump_to_string, dumper),
+                    paths, chunksize=chunksize):
+                output.write(text)
+                exit_codes.append(exit_code)
+    else:
+        def write(line):
+            output.write(line)
+            output.write('\n')
+
+        for path in paths:
+            exit_codes.append(dumper.dump(path, write))
+
+    return exit_codes
+
+
+def expand_paths(patterns):
+    """
+    Expand glob patterns and directories, which stand for the MIDI files below them,
+    into a list of paths. Patterns matching no file are kept as they are, so they
+    are reported as failures.
+    """
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            matches = [pattern]
+
+        for match in matches or [pattern]:
+            if os.path.isdir(match):
+                for directory, dirnames, filenames in os.walk(match):
+                    dirnames.sort()
+                    paths.extend(os.path.join(directory, filename)
+                        for filename in sorted(filenames)
+                            if filename.lower().endswith(MIDI_EXTENSIONS))
+            else:
+                paths.append(match)
+
+    return paths
+
+
+def _int_list(value):
+    return [ int(item, 0) for item in value.split(',') if item ]
+
+
+def argument_parser():
+    parser = argparse.ArgumentParser(prog='mididump.py',
+        description="Print the events or a summary of MIDI files.")
+    parser.add_argument('paths', nargs='*', metavar='path',
+        help="MIDI file, glob pattern or directory")
+    parser.add_argument('--files-from', metavar='FILE',
+        help="read further paths from a file, one per line, - for stdin")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+        help="number of worker processes")
+
+    output = parser.add_argument_group("output")
+    output.add_argument('--format', dest='output_format', choices=('text', 'json'),
+        default='text', help="compact text or JSON Lines")
+    output.add_argument('--json', dest='output_format', action='store_const',
+        const='json', help="short for --format json")
+    mode = output.add_mutually_exclusive_group()
+    mode.add_argument('--summary', dest='mode', action='store_const', const='summary',
+        default='events', help="only the metadata of every file")
+    mode.add_argument('--header', dest='mode', action='store_const', const='header',
+        help="only the header chunk of every file")
+
+    filters = parser.add_argument_group("event filter")
+    filters.add_argument('--type', dest='types', action='append', default=[],
+        metavar='TYPE', help="event class to keep, like NoteOnEvent or MetaEvent")
+    filters.add_argument('--exclude-type', dest='exclude_types', action='append',
+        default=[], metavar='TYPE', help="event class to drop")
+    filters.add_argument('--channels', type=_int_list, metavar='LIST',
+        help="comma separated channels to keep")
+    filters.add_argument('--meta-commands', type=_int_list, metavar='LIST',
+        help="comma separated meta commands to keep, like 0x51,0x58")
+    filters.add_argument('--exclude-controls', type=_int_list, default=[],
+        metavar='LIST', help="comma separated controllers to drop")
+    filters.add_argument('--start-tick', type=int, default=0)
+    filters.add_argument('--end-tick', type=int, default=None)
+
+    return parser
+
+
+def main(argv=None, output=None):
+    parser = argument_parser()
+    options = parser.parse_args(argv)
+    output = output if output is not None else sys.stdout
+
+    patterns = list(options.paths)
+    if options.files_from is not None:
+        if options.files_from == '-':
+            patterns.extend(line.strip() for line in sys.stdin if line.strip())
+        else:
+            with open(options.files_from) as files:
+                patterns.extend(line.strip() for line in files if line.strip())
+
+    paths = expand_paths(patterns)
+    if not paths:
+        parser.print_usage(sys.stderr)
+        return USAGE
+
+    try:
+        event_filter = event_filter_from_options(options)
+    except ValueError as error:
+        parser.print_usage(sys.stderr)
+        sys.stderr.write('%s: error: %s\n' % (parser.prog, error))
+        return USAGE
+
+    try:
+        exit_codes = dump_files(paths, output, options.mode, options.output_format,
+            event_filter, options.workers)
+    except BrokenPipeError:
+        # the output was closed early, like by head
+        sys.stderr.close()
+        return OK
+
+    return FAILED if any(exit_codes) else OK
@@ -0,0 +1,273 @@
+"""
+Mutable editing of tracks in absolute time.
+
+A Track is an immutable tuple of events with delta-times, so every edit copies the
+whole track and has to fix the delta-time of the following event. An EditableTrack
+keeps the events sorted by their absolute tick in a list of blocks of at most
+2 * LOAD events. An edit finds its block by a binary search over the last key of
+every block and only changes that block, which keeps the cost of inserting and
+removing events logarithmic in the length of the track, up to the copy of a single
+block.
+
+Events at the same tick keep the order in which they were added; an event added
+at the tick of existing events is placed after them. An end of track event stays
+the last event: it is moved to the tick of an event added or moved after it.
+"""
+from bisect import bisect_left, insort
+
+from .containers import *
+from .events import *
+
+LOAD = 512
+
+
+class EditableTrack(object):
+    """
+    Sorted container of (tick, event) pairs with absolute ticks.
+
+    The tick attribute of the stored events is not used; to_track sets it to the
+    delta-time, reusing the events that already have the right one.
+    """
+    def __init__(self, events=()):
+        self._blocks = []
+        self._maxes = []
+        self._length = 0
+        self._serial = 0
+        for tick, event in events:
+            self.add(event, tick)
+
+    @classmethod
+    def from_track(cls, track):
+        """
+        Create an editable track from the delta-time events of a track in a single
+        pass.
+        """
+        editable = cls()
+        items = []
+        tick = 0
+        for serial, event in enumerate(track):
+            tick += event.tick
+            items.append((tick, serial, event))
+
+        editable._blocks = [ items[start:start + LOAD]
+            for start in range(0, len(items), LOAD) ]
+        editable._maxes = [ block[-1][:2] for block in editable._blocks ]
+        editable._length = len(items)
+        editable._serial = len(items)
+
+        return editable
+
+    def to_track(self):
+        events = []
+        previous = 0
+        for block in self._blocks:
+            for tick, _, event in block:
+                delta = tick - previous
+                events.append(event if event.tick == delta else
+                    event.replace(tick=delta))
+                previous = tick
+
+        return Track(events)
+
+    def _next_serial(self):
+        serial = self._serial
+        self._serial += 1
+
+        return serial
+
+    def add(self, event, tick=None):
+        """
+        Insert an event at an absolute tick, by default the tick of the event. An
+        end of track event at or before the tick is moved after the event.
+        """
+        if tick is None:
+            tick = event.tick
+        if tick < 0:
+            raise ValueError("Negative tick: " + str(tick))
+
+        end_of_track = self._end_of_track()
+        if end_of_track is not None and tick >= end_of_track[0] and \
+                not isinstance(event, EndOfTrackMetaEvent):
+            self._pop()
+            self._insert((tick, self._next_serial(), event))
+            self._insert((tick, self._next_serial(), end_of_track[2]))
+        else:
+            self._insert((tick, self._next_serial(), event))
+
+    def _end_of_track(self):
+        # the last item if it is an end of track event
+        if self._blocks and isinstance(self._blocks[-1][-1][2], EndOfTrackMetaEvent):
+            return self._blocks[-1][-1]
+
+        return None
+
+    def _pop(self):
+        del self._blocks[-1][-1]
+        self._length -= 1
+        self._update(len(self._blocks) - 1)
+
+    def _insert(self, item):
+        self._length += 1
+        if not self._blocks:
+            self._blocks.append([item])
+            self._maxes.append(item[:2])
+            return
+
+        index = bisect_left(self._maxes, item[:2])
+        if index == len(self._blocks):
+            index -= 1
+            self._blocks[index].append(item)
+            self._maxes[index] = item[:2]
+        else:
+            insort(self._blocks[index], item)
+
+        if len(self._blocks[index]) > 2 * LOAD:
+            block = self._blocks[index]
+            self._blocks[index:index + 1] = [block[:LOAD], block[LOAD:]]
+            self._maxes[index:index + 1] = [block[LOAD - 1][:2], block[-1][:2]]
+
+    def remove(self, event, tick=None):
+        """
+        Remove an event at an absolute tick, by default the tick of the event. The
+        event is looked up by identity first and by equality, apart from its tick,
+        otherwise.
+        """
+        if tick is None:
+            tick = event.tick
+
+        found = None
+        for index in range(bisect_left(self._maxes, (tick, -1)), len(self._blocks)):
+            block = self._blocks[index]
+            for position in range(bisect_left(block, (tick, -1)), len(block)):
+                item = block[position]
+                if item[0] != tick:
+                    break
+                if item[2] is event:
+                    found = (index, position)
+                    break
+                if found is None and item[2] == event.replace(tick=item[2].tick):
+                    found = (index, position)
+            else:
+                continue
+            break
+
+        if found is None:
+            raise ValueError("Event not found at tick %r: %r" % (tick, event))
+
+        index, position = found
+        del self._blocks[index][position]
+        self._length -= 1
+        self._update(index)
+
+    def _update(self, index):
+        # drop an empty block or merge a small one with its successor
+        block = self._blocks[index]
+        if not block:
+            del self._blocks[index]
+            del self._maxes[index]
+            return
+
+        self._maxes[index] = block[-1][:2]
+        if len(block) < LOAD // 4 and index + 1 < len(self._blocks) and \
+                len(self._blocks[index + 1]) <= LOAD:
+            block.extend(self._blocks.pop(index + 1))
+            del self._maxes[index + 1]
+            self._maxes[index] = block[-1][:2]
+
+    def _range_blocks(self, start, end):
+        # the blocks with events from start up to end and the slice of each
+        index = bisect_left(self._maxes, (start, -1))
+        while index < len(self._blocks):
+            block = self._blocks[index]
+            low = bisect_left(block, (start, -1))
+            high = bisect_left(block, (end, -1)) if end is not None else len(block)
+            if low == high and low < len(block):
+                return
+            yield index, low, high
+            if high < len(block):
+                return
+            index += 1
+
+    def range(self, start=0, end=None):
+        """
+        Iterate over the (tick, event) pairs from start up to, but not including,
+        end.
+        """
+        for index, low, high in list(self._range_blocks(start, end)):
+            for tick, _, event in self._blocks[index][low:high]:
+                yield tick, event
+
+    def remove_range(self, start=0, end=None):
+        """
+        Remove the events from start up to, but not including, end and return them
+        as (tick, event) pairs.
+        """
+        return [ (tick, event) for tick, _, event in self._remove_range(start, end) ]
+
+    def _remove_range(self, start, end):
+        removed = []
+        for index, low, high in reversed(list(self._range_blocks(start, end))):
+            block = self._blocks[index]
+            removed.append(block[low:high])
+            del block[low:high]
+            self._length -= high - low
+            self._update(index)
+
+        return [ item for items in reversed(removed) for item in items ]
+
+    def move(self, start, end, offset):
+        """
+        Move the events from start up to, but not including, end by offset ticks.
+        They are placed after the events already at their new ticks.
+        """
+        moved = self._remove_range(start, end)
+        if moved and moved[0][0] + offset < 0:
+            # restore the events in their original order
+            for item in moved:
+                self._insert(item)
+            raise ValueError("Events moved before tick zero")
+
+        ends = []
+        for tick, _, event in moved:
+            if isinstance(event, EndOfTrackMetaEvent):
+                ends.append((tick, event))
+            else:
+                self.add(event, tick + offset)
+        for tick, event in ends:
+            self.add(event, max(tick + offset, self.end_tick))
+
+    def extend(self, events):
+        """
+        Insert (tick, event) pairs.
+        """
+        for tick, event in events:
+            self.add(event, tick)
+
+    @property
+    def end_tick(self):
+        """The tick of the last event."""
+        return self._maxes[-1][0] if self._maxes else 0
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("EditableTrack index out of range")
+
+        for block in self._blocks:
+            if index < len(block):
+                tick, _, event = block[index]
+                return tick, event
+            index -= len(block)
+
+    def __iter__(self):
+        for block in self._blocks:
+            for tick, _, event in block:
+                yield tick, event
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return "midiio.EditableTrack(events=%r, end_tick=%r)" % \
+            (self._length, self.end_tick)
@@ -1,31 +1,39 @@
-import inspect
+import threading
+import weakref
 from .events import *
 
-class EventRegistry:
-    def __init__(self):
-        self._midi_events = dict()
-        self._sysex_events = dict()
-        self._meta_events = dict()
-        self._binary_types = dict()
-        self._binary_type_values = set()
+class FrozenEventRegistry:
+    """
+    Immutable snapshot of the events of an EventRegistry and its parents.
+
+    The dispatch tables are compiled once on creation and never change afterwards,
+    so a snapshot can be shared between threads without any locking.
+    """
+    def __init__(self, midi_events, sysex_events, meta_events, binary_types):
+        self._midi_events = dict(midi_events)
+        self._sysex_events = dict(sysex_events)
+        self._meta_events = dict(meta_events)
+        self._binary_types = dict(binary_types)
+        self._binary_type_values = frozenset(self._binary_types.values())
+
+        # status byte -> event type, including the channel nibble
+        midi_table = [None] * 256
+        for statusmsg, event_type in self._midi_events.items():
+            for channel in range(16):
+                midi_table[statusmsg | channel] = event_type
+        self._midi_table = tuple(midi_table)
 
     def _register(self, binary_type, base_type):
-        # TODO register by type instead of status message
-        if binary_type.statusmsg is 0xFF:
-            self._meta_events[binary_type.meta_command] = binary_type
-        elif binary_type.statusmsg in (0xF0, 0xF7):
-            self._sysex_events[binary_type.statusmsg] = binary_type
-        else:
-            self._midi_events[binary_type.statusmsg] = binary_type
+        raise TypeError("Frozen event registry can not be modified")
 
-        self._binary_types[base_type] = binary_type
-        self._binary_type_values.add(binary_type)
+    def freeze(self):
+        return self
 
-    def is_midi_event(self, status_byte):
-        # status byte consists of [statusmsg channel] with 4 bit each
-        statusmsg = status_byte & 0xF0
+    def overlay(self):
+        return EventRegistry(self)
 
-        return statusmsg in self._midi_events
+    def is_midi_event(self, status_byte):
+        return self._midi_table[status_byte] is not None
 
     def is_sysex_event(self, status_byte):
         return status_byte in self._sysex_events
@@ -47,10 +55,11 @@ class EventRegistry:
         raise ValueError("No event with status byte " + str(status_byte))
 
     def get_midi_event(self, status_byte):
-        # status byte consists of [statusmsg channel] with 4 bit each
-        statusmsg = status_byte & 0xF0
+        event_type = self._midi_table[status_byte]
+        if event_type is None:
+            raise KeyError(status_byte)
 
-        return self._midi_events[statusmsg]
+        return event_type
 
     def get_sysex_event(self, status_byte):
         return self._sysex_events[status_byte]
@@ -81,12 +90,131 @@ class EventRegistry:
     # def get_meta_commands(self):
     #     return { cmd for cmd in self._meta_events }
 
+
+class EventRegistry:
+    """
+    Registry of the binary event types used for reading and writing.
+
+    A registry can be layered over a parent registry with overlay(). Events
+    registered in the overlay take precedence over those of the parent, without
+    modifying it. Lookups are served from a FrozenEventRegistry snapshot of all
+    layers, which is compiled on first use after a modification. Parsers use
+    freeze() to work on such a snapshot without any locking.
+    """
+    def __init__(self, parent=None):
+        self._parent = parent
+        self._children = weakref.WeakSet()
+        self._lock = threading.RLock()
+        self._snapshot = None
+
+        self._midi_events = dict()
+        self._sysex_events = dict()
+        self._meta_events = dict()
+        self._binary_types = dict()
+
+        if isinstance(parent, EventRegistry):
+            parent._children.add(self)
+
+    def register(self, binary_type, base_type):
+        self._register(binary_type, base_type)
+
+    def _register(self, binary_type, base_type):
+        with self._lock:
+            # TODO register by type instead of status message
+            if binary_type.statusmsg == 0xFF:
+                self._meta_events[binary_type.meta_command] = binary_type
+            elif binary_type.statusmsg in (0xF0, 0xF7):
+                self._sysex_events[binary_type.statusmsg] = binary_type
+            else:
+                self._midi_events[binary_type.statusmsg] = binary_type
+
+            self._binary_types[base_type] = binary_type
+            self._invalidate()
+
+    def _invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            children = list(self._children)
+        for child in children:
+            child._invalidate()
+
+    def overlay(self):
+        """
+        Create a registry inheriting all events of this one.
+        """
+        return EventRegistry(self)
+
+    def freeze(self):
+        """
+        Return an immutable snapshot of the registry including all its parents.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None:
+                if self._parent is not None:
+                    base = self._parent.freeze()
+                    midi_events = dict(base._midi_events)
+                    sysex_events = dict(base._sysex_events)
+                    meta_events = dict(base._meta_events)
+                    binary_types = dict(base._binary_types)
+                else:
+                    midi_events, sysex_events, meta_events, binary_types = \
+                        {}, {}, {}, {}
+
+                midi_events.update(self._midi_events)
+                sysex_events.update(self._sysex_events)
+                meta_events.update(self._meta_events)
+                binary_types.update(self._binary_types)
+
+                self._snapshot = FrozenEventRegistry(midi_events, sysex_events,
+                        meta_events, binary_types)
+
+            return self._snapshot
+
+    def is_midi_event(self, status_byte):
+        return self.freeze().is_midi_event(status_byte)
+
+    def is_sysex_event(self, status_byte):
+        return self.freeze().is_sysex_event(status_byte)
+
+    def is_meta_event(self, status_byte):
+        return self.freeze().is_meta_event(status_byte)
+
+    def get_event(self, status_byte):
+        return self.freeze().get_event(status_byte)
+
+    def get_midi_event(self, status_byte):
+        return self.freeze().get_midi_event(status_byte)
+
+    def get_sysex_event(self, status_byte):
+        return self.freeze().get_sysex_event(status_byte)
+
+    def get_meta_event(self, meta_command):
+        return self.freeze().get_meta_event(meta_command)
+
+    def get_midi_events(self):
+        return self.freeze().get_midi_events()
+
+    def get_sysex_events(self):
+        return self.freeze().get_sysex_events()
+
+    def get_meta_events(self):
+        return self.freeze().get_meta_events()
+
+    def get_binary_type(self, base_type):
+        return self.freeze().get_binary_type(base_type)
+
 EVENTIO_REGISTRY = EventRegistry()
 
-def copy_from(base):
+def copy_from(base, registry=None):
     """
     Add an adapter function from the base class to the class and register the class.
 
+    The class is registered with the given registry, by default EVENTIO_REGISTRY.
+
     The added adapter function can be called with any subclass of the provided base
     class and will invoke the constructor of the decorated class. For the constructor
     call the values will be read from the base class properties with the same names.
@@ -96,15 +224,13 @@ def copy_from(base):
             if isinstance(base_instance, clazz):
                 return base_instance
 
-            arg_names = [ name for name in inspect.getfullargspec(clazz.__init__).args
-                    if name is not "self" ]
-            args = { arg: getattr(base_instance, arg) for arg in arg_names }
+            args = { arg: getattr(base_instance, arg) for arg in clazz._arg_names() }
 
             return cls(**args)
 
         setattr(clazz, "copy_from", classmethod(copy_method))
 
-        EVENTIO_REGISTRY._register(clazz, base)
+        (registry if registry is not None else EVENTIO_REGISTRY).register(clazz, base)
 
         return clazz
 
@@ -208,6 +334,14 @@ class BinaryPitchWheelEvent(PitchWheelEvent):
 class BinarySysexEvent(SysexEvent):
     statusmsg = 0xF0
 
+    @classmethod
+    def from_data(cls, tick, data, terminated=True):
+        return cls(tick, data, terminated)
+
+@copy_from(SysexEscapeEvent)
+class BinarySysexEscapeEvent(SysexEscapeEvent):
+    statusmsg = 0xF7
+
     @classmethod
     def from_data(cls, tick, data):
         return cls(tick, data)
@@ -293,7 +427,7 @@ class BinarySetTempoMetaEvent(SetTempoMetaEvent, BinaryMetaEventMixin):
 
     @property
     def data(self):
-        return [ (self.get_micros_per_quarter >> (16 - (8 * x)) & 0xFF)
+        return [ (self.micros_per_quarter >> (16 - (8 * x)) & 0xFF)
             for x in range(self.length) ]
 
 
@@ -1,4 +1,5 @@
 import math
+from operator import attrgetter
 
 class _AbstractEvent:
     name = "Generic MIDI Event"
@@ -10,8 +11,64 @@ class _AbstractEvent:
     def tick(self):
         return self._tick
 
-    def __cmp__(self, other):
-        return self._tick - other._tick
+    @classmethod
+    def _arg_names(cls):
+        # the constructor arguments, which are also the names of the properties
+        arg_names = cls.__dict__.get('_init_arg_names')
+        if arg_names is None:
+            code = cls.__init__.__code__
+            arg_names = code.co_varnames[1:code.co_argcount]
+            cls._init_arg_names = arg_names
+
+        return arg_names
+
+    def replace(self, **changes):
+        """
+        Return a copy of the event with the given properties replaced.
+        """
+        args = { name: getattr(self, name) for name in self._arg_names() }
+        args.update(changes)
+
+        return type(self)(**args)
+
+    @classmethod
+    def event_type(cls):
+        """
+        The event class a binary event class is based on, like NoteOnEvent for the
+        BinaryNoteOnEvent of the event registry: the first class without from_data.
+        """
+        event_type = cls.__dict__.get('_event_type')
+        if event_type is None:
+            event_type = next((clazz for clazz in cls.__mro__
+                if not hasattr(clazz, 'from_data')), cls)
+            cls._event_type = event_type
+
+        return event_type
+
+    def _key(self):
+        # the values of the properties, read by an attrgetter cached per class
+        cls = type(self)
+        key_getter = cls.__dict__.get('_key_getter')
+        if key_getter is None:
+            key_getter = cls._key_getter = attrgetter(*cls._arg_names())
+        key = key_getter(self)
+
+        return key if type(key) is tuple else (key, )
+
+    # Events are equal if they are based on the same event type and have equal
+    # properties, so parsed binary events equal the events they were written
+    # from. They are not ordered, as their tick is a delta-time within a track,
+    # see midiio.timing.absolute_tick_key.
+
+    def __eq__(self, other):
+        if not isinstance(other, _AbstractEvent):
+            return NotImplemented
+
+        return self.event_type() is other.event_type() and \
+            self._key() == other._key()
+
+    def __hash__(self):
+        return hash((self.event_type(), self._key()))
 
     def __baserepr__(self, keys=[]):
         keys = ['tick'] + keys
@@ -131,16 +188,87 @@ class PitchWheelEvent(MidiEvent):
 
 
 class SysexEvent(_AbstractEvent):
+    """
+    System exclusive message. data holds the bytes following the 0xF0 status
+    byte, without the terminating 0xF7.
+
+    terminated is False for the first packet of a message divided over several
+    events, which is continued by SysexEscapeEvents and has no terminating 0xF7.
+    """
     name = 'SysEx'
 
-    def __init__(self, tick, data):
+    def __init__(self, tick, data, terminated=True):
         super().__init__(tick)
         self._data = data
+        self._terminated = terminated
 
     @property
     def data(self):
         return self._data
 
+    @property
+    def terminated(self):
+        return self._terminated
+
+    def _key(self):
+        # data given as a list of integers or a memoryview equals the same bytes
+        return (self._tick, bytes(self._data), self._terminated)
+
+
+class SysexEscapeEvent(SysexEvent):
+    """
+    Escaped bytes sent as they are, like the continuation packets of a sysex
+    message split over several events or realtime messages embedded in a file.
+    A terminating 0xF7 is part of data.
+    """
+    name = 'SysEx Escape'
+
+    def __init__(self, tick, data):
+        super().__init__(tick, data, False)
+
+
+class SystemCommonEvent(_AbstractEvent):
+    """
+    System common message of a live MIDI stream, which has no representation in
+    MIDI files. message is the status byte 0xF1 to 0xF6.
+    """
+    name = 'System Common'
+
+    def __init__(self, tick, message, data=()):
+        super().__init__(tick)
+        self._message = message
+        self._data = tuple(data)
+
+    @property
+    def message(self):
+        return self._message
+
+    @property
+    def data(self):
+        return self._data
+
+    def __repr__(self):
+        return self.__baserepr__(['message', 'data'])
+
+
+class SystemRealtimeEvent(_AbstractEvent):
+    """
+    System realtime message of a live MIDI stream, like timing clock or start.
+    message is the status byte 0xF8 to 0xFF.
+    """
+    name = 'System Realtime'
+
+    def __init__(self, tick, message):
+        super().__init__(tick)
+        self._message = message
+
+    @property
+    def message(self):
+        return self._message
+
+    def __repr__(self):
+        return self.__baserepr__(['message'])
+
 
 class MetaEvent(_AbstractEvent):
     name = 'Meta Event'
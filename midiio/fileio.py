@@ -1,3 +1,7 @@
+import sys
+import threading
+import weakref
+
 from .constants import *
 from .containers import *
 from .events import *
@@ -23,11 +27,55 @@ class _ChunkParserMixin(object):
 
         return chunk_id, chunk_data
 
+    def iter_chunks(self, midi_reader):
+        """
+        Iterate over the remaining chunks of a reader until it is exhausted.
+
+        Yields the same (chunk_id, chunk_data) tuples as parse_chunk, including
+        chunks with unknown IDs, which callers are expected to skip.
+        """
+        while True:
+            chunk_id = midi_reader.read(4)
+            if len(chunk_id) < 4:
+                return
+
+            chunk_size = read_long(midi_reader.read(4))
+            yield chunk_id, bytes(midi_reader.read(chunk_size))
+
+
+def _gil_enabled():
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+
+    return is_gil_enabled() if is_gil_enabled is not None else True
+
 
 class MidiIO(_ChunkParserMixin):
-    def __init__(self, event_registry = EVENTIO_REGISTRY):
+    """
+    Reader and writer of standard MIDI files.
+
+    With workers or an executor, parse first reads all track chunks and then decodes
+    them concurrently. Without an executor, a pool of the given number of workers is
+    created for each parse: threads on interpreters running without the GIL and
+    processes otherwise. Pass an executor to reuse a pool across files.
+
+    Large sysex payloads are passed to the sysex_sink, see midiio.sysex. A sink is
+    called from the parsing thread, so tracks are not decoded concurrently then.
+
+    With an event_pool, identical events share a single instance, see EventPool.
+
+    With keep_chunks, the parsed tracks keep the data of their chunk, so unchanged
+    tracks are written by copying it, see TrackIO.write. This holds the file twice
+    in memory, so the chunks are not kept with an event filter or a sysex sink.
+    """
+    def __init__(self, event_registry = EVENTIO_REGISTRY, event_filter=None,
+            workers=None, executor=None, sysex_sink=None, event_pool=None,
+            keep_chunks=False):
         self._header_io = HeaderIO()
-        self._track_io = TrackIO(event_registry)
+        self._track_io = TrackIO(event_registry, event_filter, sysex_sink, event_pool,
+            keep_chunks)
+        self._workers = workers
+        self._executor = executor
+        self._concurrent = sysex_sink is None
 
     def parse(self, midi_reader):
         """
@@ -40,13 +88,37 @@ class MidiIO(_ChunkParserMixin):
         chunk_id, chunk_data = self.parse_chunk(midi_reader)
 
         if chunk_id != b'MThd':
-            raise "Invalid file header: " + chunk_id.decode("ascii")
+            raise ValueError("Invalid file header: " + repr(chunk_id))
 
         tracks, resolution, format_version = self._header_io.parse(chunk_data)
-        track_list = [ self._track_io.parse(midi_reader) for _ in range(tracks) ]
+        if tracks > 1 and self._concurrent and \
+                (self._executor is not None or self._workers):
+            track_list = self._parse_concurrent(midi_reader, tracks)
+        else:
+            track_list = [ self._track_io.parse(midi_reader) for _ in range(tracks) ]
 
         return Pattern(track_list, resolution, format_version)
 
+    def _parse_concurrent(self, midi_reader, tracks):
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        chunks = [ self._track_io.parse_track_chunk(midi_reader) for _ in range(tracks) ]
+
+        if self._executor is not None:
+            tracks = self._executor.map(self._track_io.decode, chunks)
+        else:
+            if _gil_enabled():
+                executor = ProcessPoolExecutor(self._workers)
+            else:
+                executor = ThreadPoolExecutor(self._workers)
+            with executor:
+                tracks = list(executor.map(self._track_io.decode, chunks))
+
+        # tracks from worker processes are pickled without their chunk
+        return [ track if track.chunk is not None else
+            self._track_io.track(track.events, chunk_data)
+                for track, chunk_data in zip(tracks, chunks) ]
+
     def write(self, pattern, midi_writer):
         self._header_io.write_pattern_header(pattern, midi_writer)
         for track in pattern:
@@ -81,11 +153,14 @@ class HeaderIO(object):
         unit of time for delta timing. If the value is positive, then it represents
         the units per beat. For example, +96 would mean 96 ticks per beat. If the
         value is negative, delta times are in SMPTE compatible units.
+
+        A negative division is returned as the negative resolution, see
+        midiio.timing.smpte_division.
         """
 
         format_version = read_short(header_data[0:2])
         tracks = read_short(header_data[2:4])
-        resolution = read_short(header_data[4:6])
+        resolution = read_signed_short(header_data[4:6])
 
         return tracks, resolution, format_version
 
@@ -100,13 +175,59 @@ class HeaderIO(object):
         midi_writer.write(header_length)
         midi_writer.write(short_to_bytes(format_version))
         midi_writer.write(short_to_bytes(tracks))
-        midi_writer.write(short_to_bytes(resolution))
+        midi_writer.write(signed_short_to_bytes(resolution))
+
+
+class _ParsedTracks(object):
+    """
+    Weak index of the parsed tracks that kept their chunk, by their number of
+    events, to find the chunk of an equal track.
+    """
+    def __init__(self):
+        self._tracks = {}
+        # tracks are added from the threads decoding a file concurrently
+        self._lock = threading.Lock()
+
+    def add(self, track):
+        with self._lock:
+            references = [ reference for reference in
+                self._tracks.get(len(track), ()) if reference() is not None ]
+            references.append(weakref.ref(track))
+            self._tracks[len(track)] = references
+
+    def find_chunk(self, track):
+        if not len(track):
+            return None
+
+        events = track.events if isinstance(track, Track) else tuple(track)
+        with self._lock:
+            references = list(self._tracks.get(len(events), ()))
+        for reference in references:
+            parsed = reference()
+            # the first and last events rule out most tracks, and the comparison of
+            # the events is quick for tracks sharing their event instances
+            if parsed is not None and parsed[0] == events[0] and \
+                    parsed[-1] == events[-1] and parsed.events == events:
+                return parsed.chunk
+
+        with self._lock:
+            current = self._tracks.get(len(events), ())
+            if current and all(reference() is None for reference in current):
+                del self._tracks[len(events)]
+
+        return None
+
+_PARSED_TRACKS = _ParsedTracks()
 
 
 class TrackIO(_ChunkParserMixin):
-    def __init__(self, event_registry):
-        self._event_io = EventIO(event_registry)
-        self._event_registry = event_registry
+    def __init__(self, event_registry, event_filter=None, sysex_sink=None,
+            event_pool=None, keep_chunks=False):
+        self._event_io = EventIO(event_registry, event_filter, sysex_sink, event_pool)
+        self._event_registry = event_registry.freeze()
+        # the chunk of a filtered track does not match its events, and keeping the
+        # chunks would hold the sysex payloads passed to a sink
+        self._keep_chunks = keep_chunks and event_filter is None and sysex_sink is None
 
     def parse(self, midi_reader):
         """
@@ -122,21 +243,50 @@ class TrackIO(_ChunkParserMixin):
         <track_event>
         a sequenced track event.
         """
+        return self.decode(self.parse_track_chunk(midi_reader))
+
+    def parse_track_chunk(self, midi_reader):
+        """
+        Read the data of the next track chunk without decoding its events.
+        """
         chunk_id, chunk_data = self.parse_chunk(midi_reader)
 
         if chunk_id != b'MTrk':
-            raise "Invalid track header: " + chunk_id.decode("ascii")
+            raise ValueError("Invalid track header: " + repr(chunk_id))
+
+        return chunk_data
+
+    def decode(self, chunk_data):
+        return self.track(self._event_io.parse_events(chunk_data), chunk_data)
 
-        events = self._event_io.parse_events(chunk_data)
+    def track(self, events, chunk_data):
+        """
+        Create the track of events decoded from chunk_data, keeping the chunk if
+        enabled.
+        """
+        if not self._keep_chunks:
+            return Track(events)
 
-        return Track(events)
+        track = Track(events, chunk_data)
+        _PARSED_TRACKS.add(track)
+
+        return track
 
     def write(self, track, midi_writer):
-        buf = bytearray()
-        for event in track:
-            binary_event = self._event_registry.get_binary_type(type(event))\
-                    .copy_from(event)
-            buf.extend(self._event_io.encode_event(binary_event))
+        """
+        Write a track chunk. The chunk a track was read from is copied instead of
+        encoding the events, and so is the chunk of an equal track that was read
+        and is still alive. Only changed tracks are encoded.
+        """
+        buf = getattr(track, 'chunk', None)
+        if buf is None:
+            buf = _PARSED_TRACKS.find_chunk(track)
+        if buf is None:
+            buf = bytearray()
+            for event in track:
+                binary_event = self._event_registry.get_binary_type(type(event))\
+                        .copy_from(event)
+                buf.extend(self._event_io.encode_event(binary_event))
 
         header = self.encode_track_header(len(buf))
 
@@ -147,9 +297,183 @@ class TrackIO(_ChunkParserMixin):
         return b'MTrk' + long_to_bytes(track_length)
 
 
+class EventFilter(object):
+    """
+    Selection of the events to keep while parsing a track.
+
+    Events that are not accepted are skipped at the byte level, before any event
+    object is created. Their delta-time is added to the next accepted event, so the
+    absolute timing of the remaining events is preserved.
+
+    * event_types: event classes to keep, including their subclasses, e.g. MidiEvent
+      or NoteOnEvent. All events are kept if None.
+    * exclude_types: event classes to drop, even when selected by event_types.
+    * channels: the channels of the MIDI events to keep.
+    * meta_commands: the meta commands of the meta events to keep. When given, this
+      decides about meta events instead of event_types.
+    * exclude_controls: the controller numbers of control change events to drop.
+    * start_tick, end_tick: the range of absolute ticks to keep, with the end being
+      exclusive. Parsing of a track stops at the end tick.
+
+    The end of track event is always kept, so a filtered pattern can be written as
+    a valid file. A track cut at the end tick ends there.
+    """
+    def __init__(self, event_types=None, exclude_types=(), channels=None,
+            meta_commands=None, exclude_controls=(), start_tick=0, end_tick=None):
+        self._event_types = tuple(event_types) if event_types is not None else None
+        self._exclude_types = tuple(exclude_types)
+        self._channels = frozenset(channels) if channels is not None else None
+        self._meta_commands = frozenset(meta_commands) \
+                if meta_commands is not None else None
+        self._exclude_controls = frozenset(exclude_controls)
+        self._start_tick = start_tick
+        self._end_tick = end_tick
+
+    @property
+    def start_tick(self):
+        return self._start_tick
+
+    @property
+    def end_tick(self):
+        return self._end_tick
+
+    @property
+    def selects_end_of_track(self):
+        """
+        Whether the end of track event is selected by the filter options, rather
+        than only kept to end the track.
+        """
+        if self._meta_commands is not None:
+            return 0x2F in self._meta_commands
+
+        return self._selects(EndOfTrackMetaEvent)
+
+    def _selects(self, event_type):
+        if self._event_types is not None and not issubclass(event_type,
+                self._event_types):
+            return False
+
+        return not issubclass(event_type, self._exclude_types)
+
+    def compile(self, event_registry):
+        """
+        Resolve the filter against the event types of a registry.
+        """
+        statuses = { event_type.statusmsg
+            for event_type in event_registry.get_midi_events()
+                if self._selects(event_type) }
+        statuses.update(event_type.statusmsg
+            for event_type in event_registry.get_sysex_events()
+                if self._selects(event_type))
+
+        if self._meta_commands is not None:
+            meta_commands = self._meta_commands
+        else:
+            meta_commands = frozenset(event_type.meta_command
+                for event_type in event_registry.get_meta_events()
+                    if self._selects(event_type))
+
+        control_status = event_registry.get_binary_type(ControlChangeEvent).statusmsg
+
+        return _CompiledEventFilter(frozenset(statuses), meta_commands, self._channels,
+                self._exclude_controls, control_status, self._start_tick,
+                self._end_tick)
+
+
+class _CompiledEventFilter(object):
+    def __init__(self, statuses, meta_commands, channels, exclude_controls,
+            control_status, start_tick, end_tick):
+        self._statuses = statuses
+        self._meta_commands = meta_commands
+        self._channels = channels
+        self._exclude_controls = exclude_controls
+        self._control_status = control_status
+        self._start_tick = start_tick
+        self.end_tick = end_tick if end_tick is not None else float('inf')
+
+    def accepts(self, tick, statusmsg, meta_command, channel, data):
+        if meta_command == 0x2F:
+            return True
+
+        if tick < self._start_tick:
+            return False
+
+        if meta_command is not None:
+            return meta_command in self._meta_commands
+
+        if statusmsg not in self._statuses:
+            return False
+
+        if channel is None:
+            return True
+
+        if self._channels is not None and channel not in self._channels:
+            return False
+
+        return not (statusmsg == self._control_status and
+                data[0] in self._exclude_controls)
+
+
+class EventPool(object):
+    """
+    Pool of the events parsed by an EventIO, sharing one instance between identical
+    events.
+
+    Parsed tracks hold many equal events, like the repeated notes of a drum track or
+    the same controller values. With a pool, an event is looked up by its type,
+    delta-time, channel and data bytes before it is decoded, and an equal event
+    parsed before is reused. The texts of meta events are interned as well.
+
+    Events are immutable, so sharing them is safe. A pool can be shared by the
+    parsers of many files; at most max_size events are kept.
+    """
+    def __init__(self, max_size=65536):
+        self._max_size = max_size
+        self._events = {}
+        self._texts = {}
+        self._hits = 0
+
+    @property
+    def hits(self):
+        """The number of parsed events that were taken from the pool."""
+        return self._hits
+
+    def get(self, key):
+        event = self._events.get(key)
+        if event is not None:
+            self._hits += 1
+
+        return event
+
+    def add(self, key, event):
+        """
+        Add a newly parsed event and return the instance to use for it.
+        """
+        if isinstance(event, MetaEventWithText):
+            text = self._texts.setdefault(event.text, event.text)
+            if text is not event.text:
+                event = event.replace(text=text)
+        if len(self._events) < self._max_size:
+            self._events[key] = event
+
+        return event
+
+    def clear(self):
+        self._events.clear()
+        self._texts.clear()
+
+    def __len__(self):
+        return len(self._events)
+
+
 class EventIO(object):
-    def __init__(self, event_registry):
-        self._event_registry = event_registry
+    def __init__(self, event_registry, event_filter=None, sysex_sink=None,
+            event_pool=None):
+        self._event_registry = event_registry.freeze()
+        self._event_filter = event_filter.compile(event_registry) \
+                if event_filter is not None else None
+        self._sysex_sink = sysex_sink
+        self._event_pool = event_pool
 
     def parse_events(self, track_data):
         """
@@ -186,79 +510,216 @@ class EventIO(object):
         * System Exclusive Event
         A system exclusive event can take one of two forms:
 
-        sysex_event = 0xF0 + <data_bytes> 0xF7 or sysex_event = 0xF7 + <data_bytes> 0xF7
+        sysex_event = 0xF0 + <v_length> + <data_bytes> 0xF7
+        sysex_event = 0xF7 + <v_length> + <data_bytes>
 
-        In the first case, the resultant MIDI data stream would include the 0xF0. In the
-        second case the 0xF0 is omitted.
+        In the first case, the resultant MIDI data stream would include the 0xF0,
+        the length counts the data bytes and the terminating 0xF7. The first packet
+        of a message split over several events has no terminating 0xF7 and is
+        continued by events of the second form, which escapes arbitrary bytes.
         """
-        track_data = iter(track_data)
+        registry = self._event_registry
+        event_filter = self._event_filter
+        event_pool = self._event_pool
 
-        runningStatus = None
+        running_status = None
         events = []
+        position = 0
+        # absolute tick of the current event and the delta-time carried over from
+        # events skipped by the filter
+        tick = 0
+        skipped = 0
 
         while True:
+            terminated = True
+            sunk = False
             try:
                 # first datum is varlen representing delta-time
-                tick = read_varlen(track_data)
+                delta, position = read_varlen_at(track_data, position)
                 # next byte is status message
-                status_byte = next(track_data)
-                if self._event_registry.is_midi_event(status_byte):
+                status_byte = track_data[position]
+                position += 1
+                if registry.is_midi_event(status_byte):
                     # status byte consists of [statusmsg channel] with 4 bit each
                     channel = status_byte & 0x0F
-                    event_type = self._event_registry.get_midi_event(status_byte)
-                    data = self._parse_midi_event(event_type, track_data)
-                    event = event_type.from_data(tick, data, channel)
-                    runningStatus = (channel, event_type)
-                elif self._event_registry.is_sysex_event(status_byte):
-                    if runningStatus is not None:
-                        runningStatus = None
-                        continue
-
-                    event_type = self._event_registry.get_sysex_event(status_byte)
-                    data = self._parse_sysex_event(event_type, track_data)
-                    event = event_type.from_data(tick, data)
-                elif self._event_registry.is_meta_event(status_byte):
-                    cmd = next(track_data)
-                    event_type = self._event_registry.get_meta_event(cmd)
-
-                    data = self._parse_meta_event(event_type, track_data)
-                    event = event_type.from_data(tick, data)
-                    runningStatus = None
+                    event_type = registry.get_midi_event(status_byte)
+                    data, position = self._parse_midi_event(event_type, track_data,
+                            position)
+                    running_status = (channel, event_type)
+                    statusmsg = event_type.statusmsg
+                    meta_command = None
+                elif registry.is_sysex_event(status_byte):
+                    event_type = registry.get_sysex_event(status_byte)
+                    data, position, terminated = self._parse_sysex_event(event_type,
+                            track_data, position)
+                    sunk = type(data) is memoryview
+                    running_status = None
+                    statusmsg = status_byte
+                    meta_command = channel = None
+                elif registry.is_meta_event(status_byte):
+                    meta_command = track_data[position]
+                    event_type = registry.get_meta_event(meta_command)
+                    data, position = self._parse_meta_event(event_type, track_data,
+                            position + 1)
+                    running_status = None
+                    statusmsg = status_byte
+                    channel = None
                 else:
-                    assert runningStatus, ("Bad byte value", tick,
-                            status_byte, bytes(track_data))
-
-                    channel, event_type = runningStatus
-                    data = self._parse_midi_event(event_type, track_data)
-                    event = event_type.from_data(tick, data, channel)
-
-                    if isinstance(event, NoteOnEvent) and event.velocity is 0:
-                        event = BinaryNoteOffEvent(tick, event.pitch, 0x40, channel)
-
-                events.append(event)
-            except StopIteration:
+                    assert running_status, ("Bad byte value", delta,
+                            status_byte, bytes(track_data[position:]))
+
+                    channel, event_type = running_status
+                    data, position = self._parse_midi_event(event_type, track_data,
+                            position - 1)
+                    statusmsg = event_type.statusmsg
+                    meta_command = None
+                    if statusmsg == BinaryNoteOnEvent.statusmsg and data[1] == 0:
+                        statusmsg = BinaryNoteOffEvent.statusmsg
+            except IndexError:
                 break
 
+            if event_filter is not None:
+                tick += delta
+                if tick >= event_filter.end_tick:
+                    # end the track at the end tick
+                    delta += event_filter.end_tick - tick + skipped
+                    events.append(registry.get_meta_event(0x2F).from_data(delta,
+                        b''))
+                    break
+                if not event_filter.accepts(tick, statusmsg, meta_command, channel,
+                        data):
+                    # the delta-time of a skipped event moves on to the next one
+                    skipped += delta
+                    continue
+                delta += skipped
+                skipped = 0
+
+            if sunk:
+                # only the payloads of accepted events are passed to the sink
+                data = self._sysex_sink.store(data)
+
+            if not terminated:
+                # the first packet of a divided sysex message
+                event = event_type.from_data(delta, data, False)
+            elif event_pool is not None and type(data) is bytes:
+                key = (event_type, statusmsg, channel, delta, data)
+                event = event_pool.get(key)
+                if event is None:
+                    event = event_pool.add(key, self._decode_event(event_type,
+                        statusmsg, channel, delta, data))
+            else:
+                event = self._decode_event(event_type, statusmsg, channel, delta, data)
+
+            events.append(event)
+
         return tuple(events)
 
-    def _parse_meta_event(self, event_type, track_data):
-        datalen = read_varlen(track_data)
+    def _decode_event(self, event_type, statusmsg, channel, delta, data):
+        if channel is None:
+            return event_type.from_data(delta, data)
+        elif statusmsg != event_type.statusmsg:
+            # note on with zero velocity in running status
+            return BinaryNoteOffEvent(delta, data[0], 0x40, channel)
 
-        return [ next(track_data) for _ in range(datalen) ]
+        return event_type.from_data(delta, data, channel)
 
-    def _parse_sysex_event(self, event_type, track_data):
-        data = []
+    def scan_events(self, track_data):
+        """
+        Walk the events of a track chunk without decoding them.
 
-        # TODO move to BinarySysexEvent
-        current_byte = None
-        while current_byte != 0xF7:
-            current_byte = next(trackdata)
-            data.append(current_byte)
+        Yields a tuple (tick, status_byte, meta_command, start, end) per event, where
+        track_data[start:end] holds the event data. Running status is resolved, so
+        status_byte is always the effective status byte of the event. meta_command
+        is None for anything but meta events. Channel messages are skipped by the
+        length of their registered event type.
+        """
+        lengths = { event_type.statusmsg: event_type.length
+                for event_type in self._event_registry.get_midi_events() }
 
-        return data
+        running_status = None
+        position = 0
+        end = len(track_data)
 
-    def _parse_midi_event(self, event_type, track_data):
-        return [ next(track_data) for _ in range(event_type.length) ]
+        # a truncated last event ends the track, as in parse_events
+        while position < end:
+            try:
+                tick, position = read_varlen_at(track_data, position)
+                status_byte = track_data[position]
+
+                if status_byte == 0xFF:
+                    meta_command = track_data[position + 1]
+                    start, position = self._scan_data(track_data, position + 2)
+                    running_status = None
+                elif status_byte in (0xF0, 0xF7):
+                    meta_command = None
+                    start, position = self._scan_data(track_data, position + 1)
+                    running_status = None
+                else:
+                    if status_byte & 0x80:
+                        running_status = status_byte
+                        position += 1
+                    elif running_status is None:
+                        raise ValueError("Bad byte value %r at offset %d" %
+                                (status_byte, position))
+
+                    length = lengths.get(running_status & 0xF0)
+                    if length is None:
+                        raise ValueError("No event with status byte " +
+                            str(running_status))
+
+                    meta_command = None
+                    status_byte = running_status
+                    start = position
+                    position += length
+            except IndexError:
+                return
+            if position > end:
+                return
+
+            yield tick, status_byte, meta_command, start, position
+
+    def _scan_data(self, track_data, position):
+        datalen, start = read_varlen_at(track_data, position)
+
+        return start, start + datalen
+
+    def _parse_meta_event(self, event_type, track_data, position):
+        datalen, position = read_varlen_at(track_data, position)
+        end = position + datalen
+        if end > len(track_data):
+            raise IndexError("Meta event exceeds track data")
+
+        return track_data[position:end], end
+
+    def _parse_sysex_event(self, event_type, track_data, position):
+        datalen, position = read_varlen_at(track_data, position)
+        end = position + datalen
+        if end > len(track_data):
+            raise IndexError("Sysex event exceeds track data")
+
+        # the terminating 0xF7 of a sysex message is not part of its data, escaped
+        # bytes are kept as they are
+        data_end = end
+        terminated = True
+        if event_type.statusmsg == 0xF0:
+            terminated = bool(datalen) and track_data[end - 1] == 0xF7
+            if terminated:
+                data_end -= 1
+
+        # a payload for the sink is returned as a memoryview, which parse_events
+        # stores once the event filter accepted the event
+        sysex_sink = self._sysex_sink
+        if sysex_sink is not None and data_end - position >= sysex_sink.threshold:
+            return memoryview(track_data)[position:data_end], end, terminated
+
+        return bytes(track_data[position:data_end]), end, terminated
+
+    def _parse_midi_event(self, event_type, track_data, position):
+        end = position + event_type.length
+        if end > len(track_data):
+            raise IndexError("Midi event exceeds track data")
+
+        return track_data[position:end], end
 
     def encode_event(self, event):
         assert isinstance(event.tick, int), event.tick
@@ -271,10 +732,15 @@ class EventIO(object):
             result.extend(write_varlen(len(event.data)))
             result.extend(event.data)
         elif isinstance(event, SysexEvent):
-            result.append(SysexEvent.statusmsg)
-            result.extend(event.data)
-            # TODO
-            result.append(0xF7)
+            data = bytes(event.data)
+            result.append(event.statusmsg)
+            if event.terminated:
+                result.extend(write_varlen(len(data) + 1))
+                result.extend(data)
+                result.append(0xF7)
+            else:
+                result.extend(write_varlen(len(data)))
+                result.extend(data)
         elif isinstance(event, MidiEvent):
             # For files let's not use a running Status and always set the status message
             result.append(event.statusmsg | event.channel)
@@ -292,9 +758,13 @@ def write_midifile(midifile, pattern):
 
     return MidiIO().write(pattern, midifile)
 
-def read_midifile(midifile):
+def read_midifile(midifile, event_filter=None, workers=None, sysex_sink=None,
+        event_pool=None, keep_chunks=False):
     if type(midifile) in (str, bytes):
         with open(midifile, 'rb') as inp:
-            return read_midifile(inp)
+            return read_midifile(inp, event_filter, workers, sysex_sink, event_pool,
+                keep_chunks)
 
-    return MidiIO().parse(midifile)
+    return MidiIO(event_filter=event_filter, workers=workers,
+        sysex_sink=sysex_sink, event_pool=event_pool,
+        keep_chunks=keep_chunks).parse(midifile)
@@ -0,0 +1,233 @@
+"""
+Melody fingerprints and an inverted index for corpus search.
+
+A melody is the sequence of the highest pitches starting at each onset time. It is
+fingerprinted by hashing every run of n consecutive pitch intervals, which makes
+the fingerprint independent of transposition. The index maps each hash to the
+documents containing it and is stored in an SQLite database, so it persists on
+disk and can be updated one document at a time.
+"""
+import hashlib
+import sqlite3
+import struct
+
+from .events import *
+from .containers import *
+from .fileio import read_midifile
+
+DEFAULT_NGRAM = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    grams INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    gram INTEGER NOT NULL,
+    document INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (gram, document)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_document ON postings (document);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def melody(source, channels=None):
+    """
+    Return the pitches of the melody of a Pattern or Track, keeping the highest
+    pitch of all notes starting at the same tick. Channel 9 is left out unless it
+    is selected explicitly.
+    """
+    tracks = [source] if isinstance(source, Track) else list(source)
+    onsets = {}
+    for track in tracks:
+        tick = 0
+        for event in track:
+            tick += event.tick
+            if not isinstance(event, NoteOnEvent) or not event.velocity:
+                continue
+            if channels is None and event.channel == 9 or \
+                    channels is not None and event.channel not in channels:
+                continue
+            if event.pitch > onsets.get(tick, -1):
+                onsets[tick] = event.pitch
+
+    return [ onsets[tick] for tick in sorted(onsets) ]
+
+
+def interval_ngrams(pitches, n=DEFAULT_NGRAM):
+    """
+    Return the hashes of all runs of n consecutive intervals of a pitch sequence,
+    as signed 64 bit integers.
+    """
+    intervals = bytes(max(-127, min(127, second - first)) & 0xFF
+        for first, second in zip(pitches, pitches[1:]))
+
+    return [ struct.unpack('<q', hashlib.blake2b(intervals[index:index + n],
+        digest_size=8).digest())[0] for index in range(len(intervals) - n + 1) ]
+
+
+def fingerprint(source, n=DEFAULT_NGRAM, channels=None):
+    """
+    Return a dict of the n-gram hashes of the melody of a Pattern or Track, or of a
+    sequence of pitches, and their number of occurrences.
+    """
+    if isinstance(source, (Pattern, Track)):
+        source = melody(source, channels)
+
+    counts = {}
+    for gram in interval_ngrams(list(source), n):
+        counts[gram] = counts.get(gram, 0) + 1
+
+    return counts
+
+
+class Match(object):
+    """
+    A document matching a query.
+
+    * matched: the number of n-grams of the query found in the document, counting
+      repeated n-grams at most as often as they occur in both.
+    * containment: the share of the query found in the document, 1.0 if the
+      document contains the whole melody.
+    * similarity: the share of n-grams common to query and document, 1.0 for
+      near-duplicates.
+    """
+    def __init__(self, name, matched, query_grams, document_grams):
+        self._name = name
+        self._matched = matched
+        self._query_grams = query_grams
+        self._document_grams = document_grams
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def matched(self):
+        return self._matched
+
+    @property
+    def containment(self):
+        return self._matched / self._query_grams if self._query_grams else 0.0
+
+    @property
+    def similarity(self):
+        total = self._query_grams + self._document_grams
+        return 2.0 * self._matched / total if total else 0.0
+
+    def __repr__(self):
+        return "midiio.Match(name=%r, containment=%.3f, similarity=%.3f)" % \
+            (self.name, self.containment, self.similarity)
+
+
+class FingerprintIndex(object):
+    """
+    Inverted index from melody n-grams to documents.
+
+    The index is kept in the SQLite database at path, or in memory for the default
+    path. The n-gram length is fixed when the database is created. Changes are
+    committed by commit, close or on leaving a with block.
+    """
+    def __init__(self, path=':memory:', n=DEFAULT_NGRAM, channels=None):
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._connection.execute(
+            "INSERT OR IGNORE INTO settings (key, value) VALUES ('ngram', ?)", (n, ))
+        self._n = self._connection.execute(
+            "SELECT value FROM settings WHERE key = 'ngram'").fetchone()[0]
+        self._channels = channels
+
+    @property
+    def n(self):
+        return self._n
+
+    def add(self, name, source):
+        """
+        Index a Pattern, Track or pitch sequence under name, replacing a previous
+        document of the same name.
+        """
+        counts = fingerprint(source, self._n, self._channels)
+
+        self.remove(name)
+        cursor = self._connection.execute(
+            "INSERT INTO documents (name, grams) VALUES (?, ?)",
+            (name, sum(counts.values())))
+        document = cursor.lastrowid
+        self._connection.executemany(
+            "INSERT INTO postings (gram, document, count) VALUES (?, ?, ?)",
+            [ (gram, document, count) for gram, count in counts.items() ])
+
+    def add_midifile(self, midifile, name=None):
+        if name is None:
+            name = midifile
+        self.add(name, read_midifile(midifile))
+
+    def remove(self, name):
+        row = self._connection.execute("SELECT id FROM documents WHERE name = ?",
+            (name, )).fetchone()
+        if row is None:
+            return False
+
+        self._connection.execute("DELETE FROM postings WHERE document = ?", row)
+        self._connection.execute("DELETE FROM documents WHERE id = ?", row)
+
+        return True
+
+    def query(self, source, limit=10, min_containment=0.0):
+        """
+        Return the documents sharing n-grams with the melody of a Pattern, Track or
+        pitch sequence, best matches first. Matches are ranked by containment, then
+        by similarity.
+        """
+        counts = fingerprint(source, self._n, self._channels)
+        query_grams = sum(counts.values())
+
+        matched = {}
+        for gram, count in counts.items():
+            for document, document_count in self._connection.execute(
+                    "SELECT document, count FROM postings WHERE gram = ?", (gram, )):
+                matched[document] = matched.get(document, 0) + \
+                    min(count, document_count)
+
+        matches = []
+        for document, document_matched in matched.items():
+            name, document_grams = self._connection.execute(
+                "SELECT name, grams FROM documents WHERE id = ?",
+                (document, )).fetchone()
+            match = Match(name, document_matched, query_grams, document_grams)
+            if match.containment >= min_containment:
+                matches.append(match)
+        matches.sort(key=lambda match: (-match.containment, -match.similarity,
+            match.name))
+
+        return matches[:limit]
+
+    def names(self):
+        return [ name for name, in self._connection.execute(
+            "SELECT name FROM documents ORDER BY id") ]
+
+    def commit(self):
+        self._connection.commit()
+
+    def close(self):
+        self._connection.commit()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, name):
+        return self._connection.execute("SELECT 1 FROM documents WHERE name = ?",
+            (name, )).fetchone() is not None
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
@@ -0,0 +1,188 @@
+from .events import *
+from .eventio import EVENTIO_REGISTRY
+from .fileio import _ChunkParserMixin, HeaderIO, EventIO
+from .timing import TempoMap
+
+
+class TrackInfo(object):
+    def __init__(self, name=None, length=0, event_count=0, note_count=0):
+        self._name = name
+        self._length = length
+        self._event_count = event_count
+        self._note_count = note_count
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def length(self):
+        """The absolute tick of the last event in the track."""
+        return self._length
+
+    @property
+    def event_count(self):
+        return self._event_count
+
+    @property
+    def note_count(self):
+        """The number of note on events with a velocity greater than zero."""
+        return self._note_count
+
+    def __repr__(self):
+        return "midiio.TrackInfo(name=%r, length=%r, event_count=%r, note_count=%r)" % \
+            (self.name, self.length, self.event_count, self.note_count)
+
+
+class MidiFileInfo(object):
+    """
+    Summary of a MIDI file as collected by the MetadataScanner.
+
+    The tempo, time signature and key signature events carry absolute ticks
+    instead of delta ticks, as they are collected across all tracks.
+    """
+    def __init__(self, format, resolution, tracks=[], tempos=[], time_signatures=[],
+            key_signatures=[]):
+        self._format = format
+        self._resolution = resolution
+        self._tracks = tuple(tracks)
+        self._tempos = tuple(sorted(tempos, key=lambda event: event.tick))
+        self._time_signatures = tuple(sorted(time_signatures,
+                key=lambda event: event.tick))
+        self._key_signatures = tuple(sorted(key_signatures,
+                key=lambda event: event.tick))
+
+    @property
+    def format(self):
+        return self._format
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    @property
+    def tracks(self):
+        return self._tracks
+
+    @property
+    def track_names(self):
+        return [ track.name for track in self._tracks ]
+
+    @property
+    def tempos(self):
+        return self._tempos
+
+    @property
+    def time_signatures(self):
+        return self._time_signatures
+
+    @property
+    def key_signatures(self):
+        return self._key_signatures
+
+    @property
+    def duration(self):
+        """The length of the longest track in ticks."""
+        return max([ track.length for track in self._tracks ] or [0])
+
+    @property
+    def note_count(self):
+        return sum(track.note_count for track in self._tracks)
+
+    @property
+    def seconds(self):
+        """The duration in seconds, taking all tempo changes into account."""
+        tempo_map = TempoMap([ (tempo.tick, tempo.micros_per_quarter)
+            for tempo in self._tempos ], self._resolution)
+
+        return tempo_map.tick_to_seconds(self.duration)
+
+    def __repr__(self):
+        return "midiio.MidiFileInfo(format=%r, resolution=%r, tracks=%r, " \
+            "duration=%r, note_count=%r)" % (self.format, self.resolution,
+                list(self.tracks), self.duration, self.note_count)
+
+
+class MetadataScanner(_ChunkParserMixin):
+    """
+    Single-pass scanner collecting catalog information of a MIDI file.
+
+    Only track name, tempo, time signature and key signature meta events are
+    decoded, all other events are skipped by their length without being
+    constructed.
+    """
+    META_TYPES = (TrackNameMetaEvent, SetTempoMetaEvent, TimeSignatureMetaEvent,
+            KeySignatureMetaEvent)
+
+    def __init__(self, event_registry=EVENTIO_REGISTRY):
+        self._header_io = HeaderIO()
+        self._event_io = EventIO(event_registry)
+        self._meta_types = { binary_type.meta_command: binary_type for binary_type in
+                (event_registry.get_binary_type(base_type) for base_type in
+                    self.META_TYPES) }
+        self._note_on_status = event_registry.get_binary_type(NoteOnEvent).statusmsg
+
+    def scan(self, midi_reader):
+        chunk_id, chunk_data = self.parse_chunk(midi_reader)
+
+        if chunk_id != b'MThd':
+            raise ValueError("Invalid file header: " + repr(chunk_id))
+
+        _, resolution, format_version = self._header_io.parse(chunk_data)
+
+        tracks = []
+        meta_events = []
+        for chunk_id, chunk_data in self.iter_chunks(midi_reader):
+            if chunk_id != b'MTrk':
+                continue
+            track, track_meta_events = self.scan_track(chunk_data)
+            tracks.append(track)
+            meta_events.extend(track_meta_events)
+
+        return MidiFileInfo(format_version, resolution, tracks,
+            [ event for event in meta_events if isinstance(event, SetTempoMetaEvent) ],
+            [ event for event in meta_events if isinstance(event, TimeSignatureMetaEvent) ],
+            [ event for event in meta_events if isinstance(event, KeySignatureMetaEvent) ])
+
+    def scan_track(self, track_data):
+        """
+        Scan the data of a single track chunk.
+
+        Returns a TrackInfo and the decoded tempo, time signature and key signature
+        events, with absolute ticks.
+        """
+        meta_types = self._meta_types
+        note_on_status = self._note_on_status
+
+        name = None
+        tick = 0
+        event_count = 0
+        note_count = 0
+        meta_events = []
+        for delta, status_byte, meta_command, start, end in \
+                self._event_io.scan_events(track_data):
+            tick += delta
+            event_count += 1
+
+            if meta_command is not None:
+                event_type = meta_types.get(meta_command)
+                if event_type is None:
+                    continue
+                event = event_type.from_data(tick, track_data[start:end])
+                if isinstance(event, TrackNameMetaEvent):
+                    if name is None:
+                        name = event.text
+                else:
+                    meta_events.append(event)
+            elif status_byte & 0xF0 == note_on_status and track_data[start + 1]:
+                note_count += 1
+
+        return TrackInfo(name, tick, event_count, note_count), meta_events
+
+
+def scan_midifile(midifile):
+    if type(midifile) in (str, bytes):
+        with open(midifile, 'rb') as inp:
+            return scan_midifile(inp)
+
+    return MetadataScanner().scan(midifile)
@@ -0,0 +1,258 @@
+"""
+Conversion between patterns and piano-roll matrices.
+
+A piano roll has a row per time step and a column per pitch. Rolls of patterns
+have an additional leading axis for the 16 channels, unless the channels are
+merged. The conversion requires numpy.
+"""
+from .events import *
+from .containers import *
+from .timing import TempoMap
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+CHANNELS = 16
+PITCHES = 128
+
+VELOCITY = 'velocity'
+BINARY = 'binary'
+
+TICKS = 'ticks'
+SECONDS = 'seconds'
+
+NOTE_DTYPE = [('start', 'i8'), ('end', 'i8'), ('pitch', 'u1'), ('channel', 'u1'),
+        ('velocity', 'u1')]
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError("numpy is required for piano rolls")
+
+
+def extract_notes(source):
+    """
+    Return the notes of a Pattern or Track as a numpy record array.
+
+    The records have the fields start, end (in absolute ticks), pitch, channel and
+    velocity. Note on events with a velocity of zero end a note, a note retriggered
+    before it ended ends the previous one. Notes without an end last until the end
+    of their track.
+    """
+    _require_numpy()
+
+    tracks = [source] if isinstance(source, Track) else list(source)
+    notes = []
+    for track in tracks:
+        active = {}
+        tick = 0
+        for event in track:
+            tick += event.tick
+            if not isinstance(event, (NoteOnEvent, NoteOffEvent)):
+                continue
+            key = (event.channel, event.pitch)
+            started = active.pop(key, None)
+            if started is not None:
+                notes.append((started[0], tick, event.pitch, event.channel, started[1]))
+            if isinstance(event, NoteOnEvent) and event.velocity:
+                active[key] = (tick, event.velocity)
+        for (channel, pitch), (start, velocity) in active.items():
+            notes.append((start, tick, pitch, channel, velocity))
+
+    notes = numpy.array(notes, dtype=NOTE_DTYPE)
+    notes.sort(order=['start', 'channel', 'pitch'], kind='stable')
+
+    return notes
+
+
+class PianoRoll(object):
+    """
+    Piano-roll exporter with a grid of step ticks or step seconds.
+
+    * step: the length of one row of the roll, in ticks or seconds depending on
+      unit. Conversion of seconds uses the tempo map of the pattern, or the given
+      tempo_map for tracks.
+    * mode: VELOCITY to store the note velocity, BINARY to store 1 for sounding
+      notes.
+    * merge_channels: drop the channel axis, keeping the loudest note of a pitch.
+
+    A note covers the rows from the one containing its start up to the one
+    containing its end, but always at least one row.
+    """
+    def __init__(self, step, unit=TICKS, mode=VELOCITY, merge_channels=False,
+            tempo_map=None):
+        _require_numpy()
+
+        if unit not in (TICKS, SECONDS):
+            raise ValueError("Invalid unit: " + str(unit))
+        if mode not in (VELOCITY, BINARY):
+            raise ValueError("Invalid mode: " + str(mode))
+
+        self._step = step
+        self._unit = unit
+        self._mode = mode
+        self._merge_channels = merge_channels
+        self._tempo_map = tempo_map
+
+    def _steps(self, source, notes):
+        """
+        Return the start and end row of each note and the total number of rows.
+        """
+        if self._unit == TICKS:
+            starts = notes['start'] // self._step
+            ends = -(-notes['end'] // self._step)
+        else:
+            tempo_map = self._tempo_map
+            if tempo_map is None:
+                if isinstance(source, Track):
+                    raise ValueError("A tempo map is required for seconds of tracks")
+                tempo_map = TempoMap.from_pattern(source)
+            starts = numpy.floor(tempo_map.ticks_to_seconds(notes['start']) /
+                self._step).astype('i8')
+            ends = numpy.ceil(tempo_map.ticks_to_seconds(notes['end']) /
+                self._step).astype('i8')
+
+        ends = numpy.maximum(ends, starts + 1)
+        rows = int(ends.max()) if len(ends) else 0
+
+        return starts, ends, rows
+
+    def _cells(self, notes, starts, ends):
+        """
+        Expand the notes into the (channel, row, pitch, value) of each covered cell.
+        """
+        if self._mode == BINARY:
+            values = numpy.ones(len(notes), dtype='u1')
+        else:
+            values = notes['velocity']
+
+        lengths = ends - starts
+        total = int(lengths.sum())
+        firsts = numpy.repeat(numpy.cumsum(lengths) - lengths, lengths)
+        rows = numpy.repeat(starts, lengths) + numpy.arange(total) - firsts
+
+        return (numpy.repeat(notes['channel'], lengths), rows,
+            numpy.repeat(notes['pitch'], lengths), numpy.repeat(values, lengths))
+
+    def _fill(self, notes, starts, ends, rows, offset=0):
+        # notes of the same pitch may share a row, which keeps the highest value
+        channels, times, pitches, values = self._cells(notes, starts, ends)
+        roll = numpy.zeros((CHANNELS, rows, PITCHES), dtype='u1')
+        numpy.maximum.at(roll, (channels, times - offset, pitches), values)
+
+        if self._merge_channels:
+            return roll.max(axis=0)
+
+        return roll
+
+    def dense(self, source):
+        """
+        Return the roll of a Pattern or Track as a dense uint8 array of shape
+        (16, rows, 128), or (rows, 128) with merged channels.
+        """
+        notes = extract_notes(source)
+        starts, ends, rows = self._steps(source, notes)
+
+        return self._fill(notes, starts, ends, rows)
+
+    def sparse(self, source):
+        """
+        Return the roll in coordinate format as a tuple of arrays (channel, row,
+        pitch, value) for every non-zero cell, together with the number of rows.
+        With merged channels the channel array is omitted.
+        """
+        notes = extract_notes(source)
+        starts, ends, rows = self._steps(source, notes)
+        channels, times, pitches, values = self._cells(notes, starts, ends)
+
+        if self._merge_channels:
+            keys = (times, pitches)
+        else:
+            keys = (channels, times, pitches)
+
+        # keep the highest value of each cell
+        order = numpy.lexsort((-values.astype('i4'), ) + keys[::-1])
+        keys = tuple(key[order] for key in keys)
+        values = values[order]
+        differs = numpy.zeros(len(values), dtype=bool)
+        differs[:1] = True
+        for key in keys:
+            differs[1:] |= key[1:] != key[:-1]
+
+        return tuple(key[differs] for key in keys) + (values[differs], ), rows
+
+    def windows(self, source, window, hop=None):
+        """
+        Iterate over (first row, dense roll) of consecutive windows of rows, so long
+        pieces do not need the whole matrix in memory.
+        """
+        hop = window if hop is None else hop
+        notes = extract_notes(source)
+        starts, ends, rows = self._steps(source, notes)
+
+        for first in range(0, max(rows, 1), hop):
+            last = first + window
+            selected = (starts < last) & (ends > first)
+            yield first, self._fill(notes[selected],
+                numpy.maximum(starts[selected], first),
+                numpy.minimum(ends[selected], last), window, first)
+
+
+def piano_roll(source, step, unit=TICKS, mode=VELOCITY, merge_channels=False,
+        sparse=False, tempo_map=None):
+    roll = PianoRoll(step, unit, mode, merge_channels, tempo_map)
+
+    return roll.sparse(source) if sparse else roll.dense(source)
+
+
+def piano_roll_to_track(roll, step, velocity=100, channel=0, mode=None):
+    """
+    Convert a dense roll of step ticks per row back to a Track.
+
+    roll is either of shape (rows, 128) for a single channel or (16, rows, 128).
+    A change of the value of a cell starts a new note, so binary rolls use the given
+    velocity, while velocity rolls keep theirs. Without a mode, boolean rolls and
+    rolls holding only 0 and 1 are binary.
+    """
+    _require_numpy()
+
+    roll = numpy.asarray(roll)
+    if roll.ndim == 2:
+        roll = roll[numpy.newaxis]
+        channels = [channel]
+    else:
+        channels = list(range(roll.shape[0]))
+    if mode is None:
+        mode = BINARY if roll.dtype == bool or not (roll > 1).any() else VELOCITY
+    elif mode not in (VELOCITY, BINARY):
+        raise ValueError("Invalid mode: " + str(mode))
+    if mode == BINARY:
+        roll = (roll != 0).astype('u1') * velocity
+
+    padded = numpy.zeros((roll.shape[0], roll.shape[1] + 2, roll.shape[2]), dtype='i4')
+    padded[:, 1:-1] = roll
+    changes = numpy.nonzero(padded[:, 1:] != padded[:, :-1])
+
+    # note offs sort before note ons at the same tick
+    timed = []
+    for index, row, pitch in zip(*changes):
+        before = padded[index, row, pitch]
+        after = padded[index, row + 1, pitch]
+        tick = int(row) * step
+        if before:
+            timed.append((tick, 0, NoteOffEvent, int(pitch), 0, channels[index]))
+        if after:
+            timed.append((tick, 1, NoteOnEvent, int(pitch), int(after),
+                channels[index]))
+    timed.sort(key=lambda item: item[:2] + (item[5], item[3]))
+
+    events = []
+    last_tick = 0
+    for tick, _, event_type, pitch, value, event_channel in timed:
+        events.append(event_type(tick - last_tick, pitch, value, event_channel))
+        last_tick = tick
+    events.append(EndOfTrackMetaEvent(0))
+
+    return Track(events)
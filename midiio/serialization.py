@@ -0,0 +1,185 @@
+"""
+Compact binary encoding of patterns and tracks for inter-process transfer.
+
+The encoding is versioned and independent of the Python class paths of the
+events. All numbers are little endian.
+
+    pattern = <header> + <track> [+ <track> ...]
+    header  = "MIOP" + <version u16> + <format u16> + <resolution i16> + <tracks u32>
+    track   = <events u32> + <payloads u32> + <payload size u32> + <ticks u32[events]>
+              + <status u8[events]> + <data1 u8[events]> + <data2 u8[events]>
+              + <payload lengths u32[payloads]> + <payload bytes>
+
+Each column is padded to a multiple of four bytes. Channel events store their
+status byte and data bytes in the fixed-width columns. Meta and sysex events store
+their data in the payload table, with the n-th meta or sysex event of a track owning
+the n-th payload. data1 holds the meta command of a meta event and is 1 for the
+unterminated first packet of a divided sysex message.
+"""
+import sys
+import struct
+from array import array
+
+from .events import *
+from .containers import *
+from .eventio import EVENTIO_REGISTRY
+
+MAGIC = b'MIOP'
+VERSION = 1
+
+_HEADER = struct.Struct('<4sHHhI')
+_TRACK_HEADER = struct.Struct('<III')
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def _padding(length):
+    return -length % 4
+
+
+class PatternSerializer(object):
+    def __init__(self, event_registry=EVENTIO_REGISTRY):
+        self._event_registry = event_registry
+
+    def pattern_to_bytes(self, pattern):
+        buf = bytearray(_HEADER.pack(MAGIC, VERSION, pattern.format,
+            pattern.resolution, len(pattern)))
+        for track in pattern:
+            self._write_track(track, buf)
+
+        return bytes(buf)
+
+    def track_to_bytes(self, track):
+        buf = bytearray()
+        self._write_track(track, buf)
+
+        return bytes(buf)
+
+    def pattern_from_bytes(self, data):
+        view = memoryview(data).cast('B')
+        magic, version, format_version, resolution, tracks = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError("Invalid pattern encoding: " + repr(magic))
+        if version != VERSION:
+            raise ValueError("Unsupported pattern encoding version: " + str(version))
+
+        position = _HEADER.size
+        track_list = []
+        for _ in range(tracks):
+            track, position = self._read_track(view, position)
+            track_list.append(track)
+
+        return Pattern(track_list, resolution, format_version)
+
+    def track_from_bytes(self, data):
+        return self._read_track(memoryview(data).cast('B'), 0)[0]
+
+    def _write_track(self, track, buf):
+        registry = self._event_registry.freeze()
+
+        ticks = array('I')
+        status = bytearray()
+        data1 = bytearray()
+        data2 = bytearray()
+        lengths = array('I')
+        payloads = bytearray()
+        for event in track:
+            binary_event = registry.get_binary_type(type(event)).copy_from(event)
+            ticks.append(binary_event.tick)
+            if isinstance(binary_event, MetaEvent):
+                payload = bytes(binary_event.data)
+                status.append(binary_event.statusmsg)
+                data1.append(binary_event.meta_command)
+                data2.append(0)
+            elif isinstance(binary_event, SysexEvent):
+                payload = bytes(binary_event.data)
+                status.append(binary_event.statusmsg)
+                # 1 for the unterminated first packet of a divided sysex message
+                data1.append(0 if binary_event.terminated or
+                    isinstance(binary_event, SysexEscapeEvent) else 1)
+                data2.append(0)
+            elif isinstance(binary_event, MidiEvent):
+                data = binary_event.data
+                status.append(binary_event.statusmsg | binary_event.channel)
+                data1.append(data[0])
+                data2.append(data[1] if len(data) > 1 else 0)
+                continue
+            else:
+                raise ValueError("Unknown MIDI Event: " + str(event))
+
+            lengths.append(len(payload))
+            payloads.extend(payload)
+
+        if _BIG_ENDIAN:
+            ticks.byteswap()
+            lengths.byteswap()
+
+        buf.extend(_TRACK_HEADER.pack(len(ticks), len(lengths), len(payloads)))
+        for column in (ticks.tobytes(), status, data1, data2, lengths.tobytes(),
+                payloads):
+            buf.extend(column)
+            buf.extend(bytes(_padding(len(column))))
+
+    def _column(self, view, position, length, format):
+        itemsize = struct.calcsize(format)
+        end = position + length * itemsize
+        column = view[position:end]
+        if format != 'B':
+            if _BIG_ENDIAN:
+                column = array(format, column)
+                column.byteswap()
+            else:
+                column = column.cast(format)
+
+        return column, end + _padding(end - position)
+
+    def _read_track(self, view, position):
+        registry = self._event_registry.freeze()
+
+        events, payload_count, payload_size = _TRACK_HEADER.unpack_from(view, position)
+        position += _TRACK_HEADER.size
+        ticks, position = self._column(view, position, events, 'I')
+        status, position = self._column(view, position, events, 'B')
+        data1, position = self._column(view, position, events, 'B')
+        data2, position = self._column(view, position, events, 'B')
+        lengths, position = self._column(view, position, payload_count, 'I')
+        payloads, position = self._column(view, position, payload_size, 'B')
+
+        event_list = []
+        payload_index = 0
+        offset = 0
+        for tick, status_byte, datum1, datum2 in zip(ticks, status, data1, data2):
+            if status_byte == 0xFF or registry.is_sysex_event(status_byte):
+                end = offset + lengths[payload_index]
+                payload = payloads[offset:end]
+                payload_index += 1
+                offset = end
+                if status_byte == 0xFF:
+                    event_type = registry.get_meta_event(datum1)
+                    event = event_type.from_data(tick, payload)
+                else:
+                    event_type = registry.get_sysex_event(status_byte)
+                    if datum1:
+                        event = event_type.from_data(tick, bytes(payload), False)
+                    else:
+                        event = event_type.from_data(tick, bytes(payload))
+            else:
+                event_type = registry.get_midi_event(status_byte)
+                event = event_type.from_data(tick, (datum1, datum2), status_byte & 0x0F)
+            event_list.append(event)
+
+        return Track(event_list), position
+
+
+_SERIALIZER = PatternSerializer()
+
+def pattern_to_bytes(pattern):
+    return _SERIALIZER.pattern_to_bytes(pattern)
+
+def pattern_from_bytes(data):
+    return _SERIALIZER.pattern_from_bytes(data)
+
+def track_to_bytes(track):
+    return _SERIALIZER.track_to_bytes(track)
+
+def track_from_bytes(data):
+    return _SERIALIZER.track_from_bytes(data)
@@ -0,0 +1,249 @@
+"""
+Event histograms of MIDI files and corpora.
+
+The histograms are collected from the raw bytes of the track chunks, which are
+walked once without constructing events. Results of single files are merged into
+corpus totals, so files can be scanned by independent workers.
+"""
+import io
+from concurrent.futures import ProcessPoolExecutor
+
+from .events import *
+from .eventio import EVENTIO_REGISTRY
+from .fileio import _ChunkParserMixin, EventIO
+
+HISTOGRAMS = ('event_types', 'channels', 'pitches', 'velocities', 'controllers',
+        'programs')
+
+
+def _merge_counts(first, second):
+    counts = dict(first)
+    for key, count in second.items():
+        counts[key] = counts.get(key, 0) + count
+
+    return counts
+
+
+class EventStatistics(object):
+    """
+    Mergeable event counts.
+
+    * event_types: events keyed by the name of their event type.
+    * channels: channel events keyed by channel.
+    * pitches, velocities: note on events with a velocity greater than zero.
+    * controllers: control change events keyed by controller number.
+    * programs: program change events keyed by program.
+    """
+    def __init__(self, files=0, failures=0, tracks=0, events=0, event_types=None,
+            channels=None, pitches=None, velocities=None, controllers=None,
+            programs=None):
+        self._files = files
+        self._failures = failures
+        self._tracks = tracks
+        self._events = events
+        self._event_types = dict(event_types or {})
+        self._channels = dict(channels or {})
+        self._pitches = dict(pitches or {})
+        self._velocities = dict(velocities or {})
+        self._controllers = dict(controllers or {})
+        self._programs = dict(programs or {})
+
+    @property
+    def files(self):
+        return self._files
+
+    @property
+    def failures(self):
+        """The number of files that could not be read."""
+        return self._failures
+
+    @property
+    def tracks(self):
+        return self._tracks
+
+    @property
+    def events(self):
+        return self._events
+
+    @property
+    def event_types(self):
+        return dict(self._event_types)
+
+    @property
+    def channels(self):
+        return dict(self._channels)
+
+    @property
+    def pitches(self):
+        return dict(self._pitches)
+
+    @property
+    def velocities(self):
+        return dict(self._velocities)
+
+    @property
+    def controllers(self):
+        return dict(self._controllers)
+
+    @property
+    def programs(self):
+        return dict(self._programs)
+
+    def merge(self, other):
+        return EventStatistics(self._files + other._files,
+            self._failures + other._failures,
+            self._tracks + other._tracks,
+            self._events + other._events,
+            **{ name: _merge_counts(getattr(self, '_' + name),
+                getattr(other, '_' + name)) for name in HISTOGRAMS })
+
+    def __add__(self, other):
+        return self.merge(other)
+
+    def __eq__(self, other):
+        return isinstance(other, EventStatistics) and \
+            self.__dict__ == other.__dict__
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "midiio.EventStatistics(files=%r, tracks=%r, events=%r, " \
+            "event_types=%r)" % (self.files, self.tracks, self.events,
+                self._event_types)
+
+
+class StatisticsScanner(_ChunkParserMixin):
+    """
+    Single-pass collector of EventStatistics over raw MIDI data.
+
+    Event types are named after the binary types of the registry, channel events
+    are dispatched by their status byte and meta events by their meta command.
+    """
+    def __init__(self, event_registry=EVENTIO_REGISTRY):
+        registry = event_registry.freeze()
+        self._event_io = EventIO(registry)
+
+        self._midi_names = {}
+        for event_type in registry.get_midi_events():
+            for channel in range(16):
+                self._midi_names[event_type.statusmsg | channel] = event_type.name
+        self._sysex_names = { event_type.statusmsg: event_type.name
+                for event_type in registry.get_sysex_events() }
+        self._meta_names = { event_type.meta_command: event_type.name
+                for event_type in registry.get_meta_events() }
+
+        self._note_on_status = registry.get_binary_type(NoteOnEvent).statusmsg
+        self._control_change_status = \
+            registry.get_binary_type(ControlChangeEvent).statusmsg
+        self._program_change_status = \
+            registry.get_binary_type(ProgramChangeEvent).statusmsg
+
+    def scan(self, midi_reader):
+        chunk_id, _ = self.parse_chunk(midi_reader)
+        if chunk_id != b'MThd':
+            raise ValueError("Invalid file header: " + repr(chunk_id))
+
+        counts = self._new_counts()
+        tracks = 0
+        events = 0
+        for chunk_id, chunk_data in self.iter_chunks(midi_reader):
+            if chunk_id != b'MTrk':
+                continue
+            tracks += 1
+            events += self._scan_track(chunk_data, counts)
+
+        return EventStatistics(1, 0, tracks, events, **counts)
+
+    def scan_bytes(self, data):
+        return self.scan(io.BytesIO(data))
+
+    def scan_track(self, track_data):
+        """
+        Collect the statistics of the data of a single track chunk.
+        """
+        counts = self._new_counts()
+        events = self._scan_track(track_data, counts)
+
+        return EventStatistics(0, 0, 1, events, **counts)
+
+    def _new_counts(self):
+        return { name: {} for name in HISTOGRAMS }
+
+    def _scan_track(self, track_data, counts):
+        midi_names = self._midi_names
+        sysex_names = self._sysex_names
+        meta_names = self._meta_names
+        note_on_status = self._note_on_status
+        control_change_status = self._control_change_status
+        program_change_status = self._program_change_status
+
+        event_types = counts['event_types']
+        channels = counts['channels']
+        pitches = counts['pitches']
+        velocities = counts['velocities']
+        controllers = counts['controllers']
+        programs = counts['programs']
+
+        events = 0
+        for _, status_byte, meta_command, start, _ in \
+                self._event_io.scan_events(track_data):
+            events += 1
+
+            if meta_command is not None:
+                name = meta_names.get(meta_command, MetaEvent.name)
+            elif status_byte in midi_names:
+                name = midi_names[status_byte]
+                channel = status_byte & 0x0F
+                channels[channel] = channels.get(channel, 0) + 1
+
+                status = status_byte & 0xF0
+                if status == note_on_status:
+                    velocity = track_data[start + 1]
+                    if velocity:
+                        pitch = track_data[start]
+                        pitches[pitch] = pitches.get(pitch, 0) + 1
+                        velocities[velocity] = velocities.get(velocity, 0) + 1
+                elif status == control_change_status:
+                    controller = track_data[start]
+                    controllers[controller] = controllers.get(controller, 0) + 1
+                elif status == program_change_status:
+                    program = track_data[start]
+                    programs[program] = programs.get(program, 0) + 1
+            else:
+                name = sysex_names.get(status_byte, SysexEvent.name)
+            event_types[name] = event_types.get(name, 0) + 1
+
+        return events
+
+
+def scan_statistics(midifile):
+    if type(midifile) in (str, bytes):
+        with open(midifile, 'rb') as inp:
+            return scan_statistics(inp)
+
+    return StatisticsScanner().scan(midifile)
+
+
+def _scan_path(path):
+    try:
+        return scan_statistics(path)
+    except (IOError, ValueError, IndexError):
+        return EventStatistics(failures=1)
+
+
+def collect_statistics(paths, workers=None, chunksize=16):
+    """
+    Merge the statistics of many MIDI files, scanned in a pool of worker processes
+    if workers is given. Files that can not be read are counted as failures.
+    """
+    total = EventStatistics()
+    if workers:
+        with ProcessPoolExecutor(workers) as executor:
+            for statistics in executor.map(_scan_path, paths, chunksize=chunksize):
+                total = total.merge(statistics)
+    else:
+        for path in paths:
+            total = total.merge(_scan_path(path))
+
+    return total
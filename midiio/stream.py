@@ -0,0 +1,172 @@
+"""
+Incremental decoding of live MIDI byte streams.
+
+Unlike track chunks, the bytes of a MIDI connection carry no delta-times and
+arrive in arbitrary fragments. The StreamDecoder keeps the state of a partially
+received message between calls, so every message is decoded as soon as its last
+byte arrives.
+"""
+import time
+
+from .events import *
+from .eventio import EVENTIO_REGISTRY
+
+SYSEX_START = 0xF0
+SYSEX_END = 0xF7
+
+# number of data bytes of the system common messages
+SYSTEM_COMMON_LENGTHS = {
+    0xF1: 1,  # MIDI time code quarter frame
+    0xF2: 2,  # song position pointer
+    0xF3: 1,  # song select
+    0xF4: 0,
+    0xF5: 0,
+    0xF6: 0,  # tune request
+}
+
+
+class StreamDecoder(object):
+    """
+    Push-style decoder of a live MIDI byte stream.
+
+    Bytes are passed to feed in fragments of any size. Every completed message is
+    returned as a (timestamp, event) pair and passed to the callback, if one is
+    given. The timestamp is read from clock, a monotonic clock by default, when the
+    fragment completing the message is fed, or given explicitly to feed. Events
+    have a tick of zero.
+
+    Channel messages are decoded by the binary event types of the registry and
+    keep the running status. Realtime bytes may appear anywhere, even inside another
+    message, and are emitted immediately as SystemRealtimeEvent without disturbing
+    the message in progress. Sysex messages are collected across fragments and end
+    with 0xF7 or with the status byte of the next message; their data does not
+    include the 0xF0 and 0xF7 bytes. A sysex message longer than max_sysex bytes is
+    dropped. Data bytes without a status are discarded and counted.
+    """
+    def __init__(self, event_registry=EVENTIO_REGISTRY, callback=None,
+            clock=time.monotonic, max_sysex=None):
+        registry = event_registry.freeze()
+        self._midi_events = [None] * 256
+        for event_type in registry.get_midi_events():
+            for channel in range(16):
+                self._midi_events[event_type.statusmsg | channel] = event_type
+        self._sysex_type = registry.get_sysex_event(SYSEX_START)
+
+        self._callback = callback
+        self._clock = clock
+        self._max_sysex = max_sysex
+        self._discarded = 0
+        self.reset()
+
+    @property
+    def discarded(self):
+        """The number of data bytes discarded for lack of a status byte."""
+        return self._discarded
+
+    @property
+    def running_status(self):
+        return self._running_status
+
+    def reset(self):
+        """
+        Drop the message in progress and the running status.
+        """
+        self._running_status = None
+        self._status = None
+        self._length = 0
+        self._data = []
+        self._sysex = None
+
+    def feed(self, data, timestamp=None):
+        """
+        Decode a fragment of the stream and return the completed (timestamp, event)
+        pairs.
+        """
+        if timestamp is None:
+            timestamp = self._clock()
+
+        events = []
+        for byte in data:
+            if byte >= 0xF8:
+                events.append((timestamp, SystemRealtimeEvent(0, byte)))
+            elif byte & 0x80:
+                if self._sysex is not None:
+                    self._end_sysex(timestamp, events)
+                    if byte == SYSEX_END:
+                        continue
+                self._start(byte, timestamp, events)
+            elif self._sysex is not None:
+                self._sysex.append(byte)
+                if self._max_sysex is not None and len(self._sysex) > self._max_sysex:
+                    self._sysex = None
+                    self._status = None
+            elif self._status is not None:
+                self._data.append(byte)
+                if len(self._data) == self._length:
+                    self._complete(timestamp, events)
+            else:
+                self._discarded += 1
+
+        if self._callback is not None:
+            for timestamp, event in events:
+                self._callback(timestamp, event)
+
+        return events
+
+    def _start(self, status, timestamp, events):
+        self._data = []
+        if status == SYSEX_START:
+            self._running_status = None
+            self._status = status
+            self._sysex = bytearray()
+        elif status == SYSEX_END:
+            # end of an exclusive message that was not started or was dropped
+            self._running_status = None
+            self._status = None
+        elif status in SYSTEM_COMMON_LENGTHS:
+            self._running_status = None
+            self._status = status
+            self._length = SYSTEM_COMMON_LENGTHS[status]
+            if not self._length:
+                self._complete(timestamp, events)
+        elif self._midi_events[status] is not None:
+            self._running_status = status
+            self._status = status
+            self._length = self._midi_events[status].length
+        else:
+            self._running_status = None
+            self._status = None
+
+    def _end_sysex(self, timestamp, events):
+        events.append((timestamp, self._sysex_type.from_data(0, bytes(self._sysex))))
+        self._sysex = None
+        self._status = None
+
+    def _complete(self, timestamp, events):
+        status = self._status
+        if status in SYSTEM_COMMON_LENGTHS:
+            event = SystemCommonEvent(0, status, self._data)
+            self._status = None
+        else:
+            event = self._midi_events[status].from_data(0, self._data, status & 0x0F)
+            # the running status allows further messages without a status byte
+            self._status = self._running_status
+        self._data = []
+        events.append((timestamp, event))
+
+
+def iter_stream(reader, decoder=None, size=4096):
+    """
+    Decode the bytes of a reader, like a pipe or socket.makefile('rb',
+    buffering=0), yielding (timestamp, event) pairs until the reader is exhausted.
+    """
+    if decoder is None:
+        decoder = StreamDecoder()
+
+    read = getattr(reader, 'read1', reader.read)
+    while True:
+        data = read(size)
+        if not data:
+            return
+        for timed_event in decoder.feed(data):
+            yield timed_event
@@ -0,0 +1,92 @@
+"""
+Handling of large sysex payloads while parsing.
+
+By default the data of a sysex event is copied out of the track chunk as bytes. A
+sink passed to read_midifile, MidiIO, TrackIO or EventIO takes over the payloads
+of at least threshold bytes instead and returns the value stored as the data of
+the event:
+
+* LazySysexSink keeps a memoryview into the track data, without copying.
+* CallbackSysexSink passes a memoryview of the payload to a callback and stores
+  its result.
+* FileSysexSink writes the payload to a file and stores a SysexFileReference.
+
+The memoryview passed to a sink is only valid during the call, unless the sink
+keeps it, as LazySysexSink does; it then keeps the whole track chunk alive.
+"""
+
+
+class SysexSink(object):
+    def __init__(self, threshold=65536):
+        self._threshold = threshold
+
+    @property
+    def threshold(self):
+        return self._threshold
+
+    def store(self, payload):
+        """
+        Return the data of a sysex event for the memoryview of its payload.
+        """
+        raise NotImplementedError()
+
+
+class LazySysexSink(SysexSink):
+    def store(self, payload):
+        return payload
+
+
+class CallbackSysexSink(SysexSink):
+    def __init__(self, callback, threshold=65536):
+        super().__init__(threshold)
+        self._callback = callback
+
+    def store(self, payload):
+        return self._callback(payload)
+
+
+class SysexFileReference(object):
+    """
+    The location of a payload written by a FileSysexSink.
+
+    bytes() of a reference reads the payload back, so events holding one can be
+    written to MIDI files again while the file is open.
+    """
+    def __init__(self, fileobj, offset, length):
+        self._fileobj = fileobj
+        self._offset = offset
+        self._length = length
+
+    @property
+    def offset(self):
+        return self._offset
+
+    def read(self):
+        self._fileobj.seek(self._offset)
+        return self._fileobj.read(self._length)
+
+    def __bytes__(self):
+        return self.read()
+
+    def __len__(self):
+        return self._length
+
+    def __repr__(self):
+        return "midiio.SysexFileReference(offset=%r, length=%r)" % \
+            (self._offset, self._length)
+
+
+class FileSysexSink(SysexSink):
+    """
+    Append large payloads to a file opened for reading and writing in binary
+    mode, like a tempfile.TemporaryFile().
+    """
+    def __init__(self, fileobj, threshold=65536):
+        super().__init__(threshold)
+        self._fileobj = fileobj
+
+    def store(self, payload):
+        offset = self._fileobj.seek(0, 2)
+        self._fileobj.write(payload)
+
+        return SysexFileReference(self._fileobj, offset, len(payload))
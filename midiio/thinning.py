@@ -0,0 +1,209 @@
+from .events import *
+from .containers import *
+
+# Controllers that switch a state or address parameters are never thinned: bank
+# select, the pedals and switches, data increment/decrement, (N)RPN and the
+# channel mode messages.
+NON_CONTINUOUS_CONTROLLERS = frozenset([0, 32] + list(range(64, 70)) +
+        list(range(96, 102)) + list(range(120, 128)))
+CONTINUOUS_CONTROLLERS = frozenset(range(128)) - NON_CONTINUOUS_CONTROLLERS
+
+PITCH_WHEEL = 'pitch'
+
+
+class ThinningReport(object):
+    def __init__(self, total=0, removed=None):
+        self._total = total
+        self._removed = dict(removed or {})
+
+    @property
+    def total(self):
+        """The number of events in the source."""
+        return self._total
+
+    @property
+    def removed(self):
+        """The number of removed events."""
+        return sum(self._removed.values())
+
+    @property
+    def removed_by_stream(self):
+        """
+        The number of removed events keyed by (channel, controller), with the
+        controller being PITCH_WHEEL for pitch wheel events.
+        """
+        return dict(self._removed)
+
+    def merge(self, other):
+        removed = dict(self._removed)
+        for key, count in other._removed.items():
+            removed[key] = removed.get(key, 0) + count
+
+        return ThinningReport(self._total + other._total, removed)
+
+    def __repr__(self):
+        return "midiio.ThinningReport(total=%r, removed=%r)" % (self.total, self.removed)
+
+
+class ControllerThinner(object):
+    """
+    Reduce dense control change and pitch wheel streams.
+
+    Each (channel, controller) pair and the pitch wheel of each channel is treated
+    as a separate stream of (absolute tick, value) points. The first and last
+    point of a stream are always kept. In between:
+
+    * epsilon: if not None, the points are first simplified with the
+      Ramer-Douglas-Peucker algorithm, dropping points whose value deviates less than
+      epsilon from the line between the kept neighbours.
+    * value_delta: points changing the value by less than this compared to the last
+      kept point are dropped, so the default of 1 only drops repeated values.
+    * min_interval: points less than this number of ticks after the last kept point
+      are dropped.
+
+    pitch_delta and pitch_epsilon are the tolerances for the pitch wheel streams,
+    whose values have a 14 bit range. controls is the set of controllers to thin.
+
+    The delta-time of removed events is added to the next remaining event, so the
+    absolute time of all other events is unchanged.
+    """
+    def __init__(self, value_delta=1, min_interval=0, epsilon=None, pitch_delta=1,
+            pitch_epsilon=None, controls=CONTINUOUS_CONTROLLERS):
+        self._value_delta = value_delta
+        self._min_interval = min_interval
+        self._epsilon = epsilon
+        self._pitch_delta = pitch_delta
+        self._pitch_epsilon = pitch_epsilon
+        self._controls = frozenset(controls)
+
+    def thin_track(self, track):
+        """
+        Return the thinned track and a ThinningReport.
+        """
+        streams = self._collect_streams(track)
+
+        dropped = set()
+        removed = {}
+        for key, points in streams.items():
+            if key[1] == PITCH_WHEEL:
+                kept = self._thin_stream(points, self._pitch_delta, self._pitch_epsilon)
+            else:
+                kept = self._thin_stream(points, self._value_delta, self._epsilon)
+            if len(kept) < len(points):
+                removed[key] = len(points) - len(kept)
+                dropped.update(point[0] for point in points)
+                dropped.difference_update(kept)
+
+        report = ThinningReport(len(track), removed)
+        if not dropped:
+            return track, report
+
+        events = []
+        carry = 0
+        for index, event in enumerate(track):
+            if index in dropped:
+                carry += event.tick
+                continue
+            if carry:
+                event = event.replace(tick=event.tick + carry)
+                carry = 0
+            events.append(event)
+
+        return Track(events), report
+
+    def thin_pattern(self, pattern):
+        report = ThinningReport()
+        tracks = []
+        for track in pattern:
+            track, track_report = self.thin_track(track)
+            tracks.append(track)
+            report = report.merge(track_report)
+
+        return Pattern(tracks, pattern.resolution, pattern.format), report
+
+    def _collect_streams(self, track):
+        # (index, absolute tick, value) points by (channel, controller)
+        streams = {}
+        tick = 0
+        for index, event in enumerate(track):
+            tick += event.tick
+            if isinstance(event, ControlChangeEvent):
+                if event.control not in self._controls:
+                    continue
+                key = (event.channel, event.control)
+                value = event.value
+            elif isinstance(event, PitchWheelEvent):
+                key = (event.channel, PITCH_WHEEL)
+                value = event.pitch
+            else:
+                continue
+            streams.setdefault(key, []).append((index, tick, value))
+
+        return streams
+
+    def _thin_stream(self, points, value_delta, epsilon):
+        """
+        Return the indices of the events to keep.
+        """
+        if len(points) <= 2:
+            return { point[0] for point in points }
+
+        if epsilon is not None:
+            points = _simplify(points, epsilon)
+
+        _, last_tick, last_value = points[0]
+        kept = { points[0][0], points[-1][0] }
+        for index, tick, value in points[1:-1]:
+            if abs(value - last_value) < value_delta:
+                continue
+            if tick - last_tick < self._min_interval:
+                continue
+            kept.add(index)
+            last_tick = tick
+            last_value = value
+
+        return kept
+
+
+def _simplify(points, epsilon):
+    """
+    Ramer-Douglas-Peucker simplification of (index, tick, value) points using the
+    vertical distance in value units.
+    """
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+
+    ranges = [(0, len(points) - 1)]
+    while ranges:
+        first, last = ranges.pop()
+        _, first_tick, first_value = points[first]
+        _, last_tick, last_value = points[last]
+        span = last_tick - first_tick
+
+        max_distance = -1
+        max_index = None
+        for index in range(first + 1, last):
+            _, tick, value = points[index]
+            if span:
+                expected = first_value + (last_value - first_value) * \
+                        (tick - first_tick) / span
+            else:
+                expected = first_value
+            distance = abs(value - expected)
+            if distance > max_distance:
+                max_distance = distance
+                max_index = index
+
+        if max_index is not None and max_distance >= epsilon:
+            keep[max_index] = True
+            ranges.append((first, max_index))
+            ranges.append((max_index, last))
+
+    return [ point for point, kept in zip(points, keep) if kept ]
+
+
+def thin_track(track, **kwargs):
+    return ControllerThinner(**kwargs).thin_track(track)
+
+def thin_pattern(pattern, **kwargs):
+    return ControllerThinner(**kwargs).thin_pattern(pattern)
@@ -0,0 +1,353 @@
+from bisect import bisect_left, bisect_right
+from fractions import Fraction
+
+from .containers import *
+from .events import *
+
+DEFAULT_MICROS_PER_QUARTER = 500000
+
+# frames per second of the SMPTE formats, keyed by the negated high byte of the
+# division; 29 stands for 30 drop frame at 29.97 frames per second
+SMPTE_FORMATS = {
+    24: Fraction(24),
+    25: Fraction(25),
+    29: Fraction(30000, 1001),
+    30: Fraction(30),
+}
+
+
+def absolute_ticks(track):
+    """
+    Return the absolute tick of each event of a track.
+    """
+    ticks = []
+    tick = 0
+    for event in track:
+        tick += event.tick
+        ticks.append(tick)
+
+    return ticks
+
+
+def absolute_events(track):
+    """
+    Return the (absolute tick, event) pairs of the events of a track.
+    """
+    return list(zip(absolute_ticks(track), track))
+
+
+def absolute_tick_key(item):
+    """
+    Sort key of (absolute tick, event) pairs. The sort is stable, so events at the
+    same tick keep their order, e.g. when merging the events of several tracks.
+    """
+    return item[0]
+
+
+def is_smpte(resolution):
+    return resolution < 0
+
+
+def smpte_division(resolution):
+    """
+    Return the frames per second, as a Fraction, and the ticks per frame of a
+    negative SMPTE division as read by HeaderIO.
+    """
+    division = resolution & 0xFFFF
+    frames = 0x100 - (division >> 8)
+    if frames not in SMPTE_FORMATS:
+        raise ValueError("Invalid SMPTE format: " + str(frames))
+
+    return SMPTE_FORMATS[frames], division & 0xFF
+
+
+def smpte_resolution(frames, ticks_per_frame):
+    """
+    Return the negative division of an SMPTE format of 24, 25, 29 or 30 frames.
+    """
+    if frames not in SMPTE_FORMATS:
+        raise ValueError("Invalid SMPTE format: " + str(frames))
+
+    return ((-frames & 0xFF) << 8 | ticks_per_frame) - 0x10000
+
+
+def ticks_per_second(resolution, micros_per_quarter=DEFAULT_MICROS_PER_QUARTER):
+    """
+    Return the exact number of ticks per second as a Fraction. SMPTE divisions
+    do not depend on the tempo.
+    """
+    if is_smpte(resolution):
+        frames, ticks_per_frame = smpte_division(resolution)
+        return frames * ticks_per_frame
+
+    return Fraction(resolution * 1000000, micros_per_quarter)
+
+
+class TempoMap(object):
+    """
+    Conversion between ticks and seconds across tempo changes.
+
+    The tempo changes are given as (absolute tick, microseconds per quarter) pairs.
+    Both directions of the conversion use a binary search over the precomputed
+    start of each tempo segment. With a negative SMPTE resolution the ticks have a
+    fixed length and the tempo changes are ignored.
+    """
+    def __init__(self, tempos, resolution):
+        changes = {}
+        for tick, micros_per_quarter in sorted(tempos):
+            changes[tick] = micros_per_quarter
+        if 0 not in changes:
+            changes[0] = DEFAULT_MICROS_PER_QUARTER
+
+        self._resolution = resolution
+        self._ticks = sorted(changes)
+        self._micros = [ changes[tick] for tick in self._ticks ]
+        self._tick_seconds = [ 1 / float(ticks_per_second(resolution, micros))
+            for micros in self._micros ]
+
+        self._seconds = [0.0]
+        for index in range(1, len(self._ticks)):
+            self._seconds.append(self._seconds[-1] +
+                (self._ticks[index] - self._ticks[index - 1]) *
+                    self._tick_seconds[index - 1])
+
+    @classmethod
+    def from_pattern(cls, pattern):
+        tempos = []
+        for track in pattern:
+            tick = 0
+            for event in track:
+                tick += event.tick
+                if isinstance(event, SetTempoMetaEvent):
+                    tempos.append((tick, event.micros_per_quarter))
+
+        return cls(tempos, pattern.resolution)
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    @property
+    def tempos(self):
+        return list(zip(self._ticks, self._micros))
+
+    def tick_to_seconds(self, tick):
+        index = bisect_right(self._ticks, tick) - 1
+
+        return self._seconds[index] + (tick - self._ticks[index]) * \
+            self._tick_seconds[index]
+
+    def seconds_to_tick(self, seconds):
+        """
+        Return the closest tick at the given time.
+        """
+        index = bisect_right(self._seconds, seconds) - 1
+
+        return self._ticks[index] + int(round((seconds - self._seconds[index]) /
+            self._tick_seconds[index]))
+
+    def ticks_to_seconds(self, ticks):
+        """
+        Convert a numpy array of ticks at once.
+        """
+        import numpy
+
+        ticks = numpy.asarray(ticks)
+        index = numpy.searchsorted(numpy.asarray(self._ticks), ticks, side='right') - 1
+
+        return numpy.asarray(self._seconds)[index] + \
+            (ticks - numpy.asarray(self._ticks)[index]) * \
+                numpy.asarray(self._tick_seconds)[index]
+
+
+class MeterMap(object):
+    """
+    Conversion between ticks and bars and beats across time signature changes.
+
+    The time signatures are given as (absolute tick, nominator, denominator)
+    triples, a missing signature at tick zero is 4/4. A bar has nominator beats of
+    a 1/denominator note. A time signature starts a new bar; when it changes in the
+    middle of a bar, that bar ends early. Both directions use a binary search over
+    the precomputed start tick and bar of each signature. Bars, beats and ticks in
+    a beat are counted from zero.
+    """
+    def __init__(self, time_signatures, resolution):
+        if is_smpte(resolution):
+            raise ValueError("SMPTE divisions have no bars: " + str(resolution))
+
+        changes = {}
+        for tick, nominator, denominator in sorted(time_signatures,
+                key=lambda signature: signature[0]):
+            changes[tick] = (nominator, denominator)
+        if 0 not in changes:
+            changes[0] = (4, 4)
+
+        self._resolution = resolution
+        self._ticks = sorted(changes)
+        self._nominators = [ changes[tick][0] for tick in self._ticks ]
+        self._denominators = [ changes[tick][1] for tick in self._ticks ]
+        self._bar_ticks = [ 4 * resolution * nominator // denominator
+            for nominator, denominator in zip(self._nominators, self._denominators) ]
+
+        self._bars = [0]
+        for index in range(1, len(self._ticks)):
+            length = self._ticks[index] - self._ticks[index - 1]
+            # a bar cut short by the change still counts
+            self._bars.append(self._bars[-1] - (-length // self._bar_ticks[index - 1]))
+
+    @classmethod
+    def from_pattern(cls, pattern):
+        time_signatures = []
+        for track in pattern:
+            tick = 0
+            for event in track:
+                tick += event.tick
+                if isinstance(event, TimeSignatureMetaEvent):
+                    time_signatures.append((tick, event.nominator, event.denominator))
+
+        return cls(time_signatures, pattern.resolution)
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    @property
+    def time_signatures(self):
+        return list(zip(self._ticks, self._nominators, self._denominators))
+
+    def time_signature(self, tick):
+        """
+        Return the (nominator, denominator) of the time signature at a tick.
+        """
+        index = bisect_right(self._ticks, tick) - 1
+
+        return self._nominators[index], self._denominators[index]
+
+    def tick_to_bar(self, tick):
+        index = bisect_right(self._ticks, tick) - 1
+
+        return self._bars[index] + (tick - self._ticks[index]) // self._bar_ticks[index]
+
+    def bar_to_tick(self, bar):
+        """
+        Return the tick at which a bar starts.
+        """
+        index = bisect_right(self._bars, bar) - 1
+
+        return self._ticks[index] + (bar - self._bars[index]) * self._bar_ticks[index]
+
+    def tick_to_bbt(self, tick):
+        """
+        Return the (bar, beat, tick in beat) position of a tick.
+        """
+        index = bisect_right(self._ticks, tick) - 1
+        bar_ticks = self._bar_ticks[index]
+        bars, offset = divmod(tick - self._ticks[index], bar_ticks)
+        whole_ticks = 4 * self._resolution
+        denominator = self._denominators[index]
+        beat = offset * denominator // whole_ticks
+
+        return (self._bars[index] + bars, beat,
+            offset - beat * whole_ticks // denominator)
+
+    def bbt_to_tick(self, bar, beat=0, tick=0):
+        return self.bar_to_tick(bar) + beat * 4 * self._resolution // \
+            self._denominators[bisect_right(self._bars, bar) - 1] + tick
+
+
+def _slice_track(events, ticks, start_index, end_index, start, end):
+    # the events are timed relative to the start of the slice, which ends with an
+    # end of track event at its end instead of one of the source track
+    sliced = []
+    previous = start
+    for index in range(start_index, end_index):
+        event = events[index]
+        if isinstance(event, EndOfTrackMetaEvent):
+            continue
+        delta = ticks[index] - previous
+        sliced.append(event if event.tick == delta else event.replace(tick=delta))
+        previous = ticks[index]
+    sliced.append(EndOfTrackMetaEvent(end - previous))
+
+    return sliced
+
+
+class BarSlicer(object):
+    """
+    Cut a pattern into sub-patterns of whole bars.
+
+    The absolute ticks of all tracks are computed once, every slice is then found
+    by a binary search per track. A slice holds the events from the start of its
+    first bar up to the start of its end bar, timed relative to its start, and
+    every track of a slice ends with an end of track event at the end bar. The
+    tempo and time signature in effect at the start are repeated at tick zero of
+    the tracks they come from, unless they are part of the slice already.
+    """
+    CONTEXT_TYPES = (SetTempoMetaEvent, TimeSignatureMetaEvent)
+
+    def __init__(self, pattern, meter_map=None):
+        self._pattern = pattern
+        self._meter_map = meter_map if meter_map is not None else \
+            MeterMap.from_pattern(pattern)
+        self._ticks = [ absolute_ticks(track) for track in pattern ]
+        # the indices of the tempo and time signature events of every track
+        self._context = [ [ index for index, event in enumerate(track)
+            if isinstance(event, self.CONTEXT_TYPES) ] for track in pattern ]
+
+    @property
+    def meter_map(self):
+        return self._meter_map
+
+    @property
+    def bar_count(self):
+        """The number of bars with events, including the bar of the last event."""
+        last_tick = max([ ticks[-1] for ticks in self._ticks if ticks ] or [0])
+
+        return self._meter_map.tick_to_bar(last_tick) + 1
+
+    def slice(self, start_bar, end_bar):
+        """
+        Return the sub-pattern of the bars from start_bar up to, but not including,
+        end_bar.
+        """
+        start = self._meter_map.bar_to_tick(start_bar)
+        end = self._meter_map.bar_to_tick(end_bar)
+
+        tracks = []
+        for track, ticks, context in zip(self._pattern, self._ticks, self._context):
+            start_index = bisect_left(ticks, start)
+            end_index = bisect_left(ticks, end)
+            events = _slice_track(track, ticks, start_index, end_index, start, end)
+            if start_index:
+                events[:0] = self._context_events(track, ticks, context, start,
+                    start_index)
+            tracks.append(Track(events))
+
+        return Pattern(tracks, self._pattern.resolution, self._pattern.format)
+
+    def _context_events(self, track, ticks, context, start, start_index):
+        # the last event of each context type before the slice, unless the slice
+        # starts with an event of the same type
+        latest = {}
+        for index in context[:bisect_left(context, start_index)]:
+            latest[type(track[index]).event_type()] = track[index]
+        for index in range(start_index, len(ticks)):
+            if ticks[index] != start:
+                break
+            latest.pop(type(track[index]).event_type(), None)
+
+        return [ event.replace(tick=0) for event in latest.values() ]
+
+    def split(self, bars=1):
+        """
+        Return the sub-patterns of every bars bars.
+        """
+        return [ self.slice(start_bar, start_bar + bars)
+            for start_bar in range(0, self.bar_count, bars) ]
+
+
+def slice_bars(pattern, start_bar, end_bar):
+    return BarSlicer(pattern).slice(start_bar, end_bar)
+
+def split_bars(pattern, bars=1):
+    return BarSlicer(pattern).split(bars)
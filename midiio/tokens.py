@@ -0,0 +1,282 @@
+"""
+Encoding of patterns as sequences of integer tokens.
+
+The notes of all tracks are merged by time into a stream of note on, note off,
+time shift and velocity tokens. All other events only advance the time. A velocity
+token precedes a note on whenever the velocity bin changes.
+"""
+import io
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from .events import *
+from .containers import *
+from .eventio import EVENTIO_REGISTRY
+from .fileio import _ChunkParserMixin, HeaderIO, EventIO
+
+NOTE_ON = 'note_on'
+NOTE_OFF = 'note_off'
+TIME_SHIFT = 'time_shift'
+VELOCITY = 'velocity'
+
+PITCHES = 128
+
+
+class Vocabulary(object):
+    """
+    Layout of the token values.
+
+    * shift_step: the ticks of one time shift unit; event ticks are rounded to the
+      closest multiple.
+    * max_shift: the largest number of units of a single time shift token, longer
+      shifts are written as several tokens.
+    * velocity_bins: the number of distinct velocities, 128 keeps them exact.
+
+    The tokens are laid out as 128 note on pitches, 128 note off pitches, max_shift
+    time shifts of 1 to max_shift units and velocity_bins velocities.
+    """
+    def __init__(self, shift_step=1, max_shift=100, velocity_bins=32):
+        if shift_step < 1 or max_shift < 1:
+            raise ValueError("Time shifts must be positive")
+        if not 1 <= velocity_bins <= 128:
+            raise ValueError("Invalid number of velocity bins: " + str(velocity_bins))
+
+        self._shift_step = shift_step
+        self._max_shift = max_shift
+        self._velocity_bins = velocity_bins
+
+        self.note_on_offset = 0
+        self.note_off_offset = PITCHES
+        self.time_shift_offset = 2 * PITCHES
+        self.velocity_offset = self.time_shift_offset + max_shift
+        self.size = self.velocity_offset + velocity_bins
+
+    @property
+    def shift_step(self):
+        return self._shift_step
+
+    @property
+    def max_shift(self):
+        return self._max_shift
+
+    @property
+    def velocity_bins(self):
+        return self._velocity_bins
+
+    def velocity_bin(self, velocity):
+        return velocity * self._velocity_bins // 128
+
+    def bin_velocity(self, velocity_bin):
+        """Return the velocity in the middle of a bin."""
+        return max((velocity_bin * 128 + 64) // self._velocity_bins, 1)
+
+    def describe(self, token):
+        """
+        Return the (kind, value) of a token, where the value is a pitch, a number of
+        time shift units or a velocity.
+        """
+        if not 0 <= token < self.size:
+            raise ValueError("Invalid token: " + str(token))
+        if token < self.note_off_offset:
+            return NOTE_ON, token - self.note_on_offset
+        if token < self.time_shift_offset:
+            return NOTE_OFF, token - self.note_off_offset
+        if token < self.velocity_offset:
+            return TIME_SHIFT, token - self.time_shift_offset + 1
+
+        return VELOCITY, self.bin_velocity(token - self.velocity_offset)
+
+    def __eq__(self, other):
+        return isinstance(other, Vocabulary) and \
+            (self.shift_step, self.max_shift, self.velocity_bins) == \
+                (other.shift_step, other.max_shift, other.velocity_bins)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "midiio.Vocabulary(shift_step=%r, max_shift=%r, velocity_bins=%r)" % \
+            (self.shift_step, self.max_shift, self.velocity_bins)
+
+
+class Tokenizer(_ChunkParserMixin):
+    """
+    Encoder and decoder between patterns and token sequences of a Vocabulary.
+
+    Encoding accepts a Pattern, a Track or the raw bytes of a MIDI file, which are
+    walked without constructing events. The tokens are written to a given
+    preallocated sequence, like an array.array or a numpy array, or to a new
+    array('i').
+
+    decode is the exact inverse of encode on token sequences written by encode:
+    encoding the decoded track gives back the same tokens.
+    """
+    def __init__(self, vocabulary=None, event_registry=EVENTIO_REGISTRY):
+        self._vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self._header_io = HeaderIO()
+        self._event_io = EventIO(event_registry)
+        self._note_on_status = event_registry.get_binary_type(NoteOnEvent).statusmsg
+        self._note_off_status = event_registry.get_binary_type(NoteOffEvent).statusmsg
+
+    @property
+    def vocabulary(self):
+        return self._vocabulary
+
+    def encode(self, source, out=None):
+        """
+        Encode a Pattern or Track.
+
+        Returns the tokens as array('i'), or the number of tokens written if out is
+        given. A ValueError is raised if out is too short.
+        """
+        tracks = [source] if isinstance(source, Track) else list(source)
+        notes = []
+        for index, track in enumerate(tracks):
+            tick = 0
+            for event in track:
+                tick += event.tick
+                if isinstance(event, NoteOnEvent):
+                    notes.append((tick, index, len(notes), event.pitch, event.velocity))
+                elif isinstance(event, NoteOffEvent):
+                    notes.append((tick, index, len(notes), event.pitch, 0))
+
+        return self._write(notes, out)
+
+    def encode_bytes(self, data, out=None):
+        """
+        Encode the raw bytes of a MIDI file, like encode.
+        """
+        midi_reader = io.BytesIO(data)
+        chunk_id, chunk_data = self.parse_chunk(midi_reader)
+        if chunk_id != b'MThd':
+            raise ValueError("Invalid file header: " + repr(chunk_id))
+
+        note_on_status = self._note_on_status
+        note_off_status = self._note_off_status
+
+        notes = []
+        index = 0
+        for chunk_id, chunk_data in self.iter_chunks(midi_reader):
+            if chunk_id != b'MTrk':
+                continue
+            tick = 0
+            for delta, status_byte, meta_command, start, _ in \
+                    self._event_io.scan_events(chunk_data):
+                tick += delta
+                if meta_command is not None:
+                    continue
+                status = status_byte & 0xF0
+                if status == note_on_status:
+                    notes.append((tick, index, len(notes), chunk_data[start],
+                        chunk_data[start + 1]))
+                elif status == note_off_status:
+                    notes.append((tick, index, len(notes), chunk_data[start], 0))
+            index += 1
+
+        return self._write(notes, out)
+
+    def encode_file(self, path, out=None):
+        with open(path, 'rb') as inp:
+            return self.encode_bytes(inp.read(), out)
+
+    def _write(self, notes, out):
+        vocabulary = self._vocabulary
+        step = vocabulary.shift_step
+        max_shift = vocabulary.max_shift
+        max_shift_token = vocabulary.time_shift_offset + max_shift - 1
+
+        notes.sort()
+        if out is None:
+            tokens = array('i')
+            append = tokens.append
+        else:
+            # the tokens are written straight into out
+            size = len(out)
+            count = 0
+
+            def append(token):
+                nonlocal count
+                if count == size:
+                    raise ValueError("Output of length %d is too short" % size)
+                out[count] = token
+                count += 1
+
+        position = 0
+        velocity_bin = None
+        for tick, _, _, pitch, velocity in notes:
+            units = (tick + step // 2) // step - position
+            if units > 0:
+                position += units
+                while units > max_shift:
+                    append(max_shift_token)
+                    units -= max_shift
+                append(vocabulary.time_shift_offset + units - 1)
+            if velocity:
+                current = vocabulary.velocity_bin(velocity)
+                if current != velocity_bin:
+                    velocity_bin = current
+                    append(vocabulary.velocity_offset + current)
+                append(vocabulary.note_on_offset + pitch)
+            else:
+                append(vocabulary.note_off_offset + pitch)
+
+        return tokens if out is None else count
+
+    def encode_many(self, paths, workers=None):
+        """
+        Encode many MIDI files, in a pool of worker processes if workers is given.
+
+        Returns the tokens of all files concatenated into one array('i'), and an
+        array('q') of offsets, where the tokens of the n-th file are
+        tokens[offsets[n]:offsets[n + 1]].
+        """
+        if workers:
+            with ProcessPoolExecutor(workers) as executor:
+                encoded = list(executor.map(self.encode_file, paths))
+        else:
+            encoded = [ self.encode_file(path) for path in paths ]
+
+        tokens = array('i')
+        offsets = array('q', [0])
+        for file_tokens in encoded:
+            tokens.extend(file_tokens)
+            offsets.append(len(tokens))
+
+        return tokens, offsets
+
+    def decode(self, tokens, channel=0):
+        """
+        Decode a token sequence to a Track of note on and note off events of the
+        given channel. Note ons before the first velocity token use the middle
+        velocity bin.
+        """
+        vocabulary = self._vocabulary
+        step = vocabulary.shift_step
+
+        events = []
+        delta = 0
+        velocity = vocabulary.bin_velocity(vocabulary.velocity_bins // 2)
+        for token in tokens:
+            kind, value = vocabulary.describe(int(token))
+            if kind == TIME_SHIFT:
+                delta += value * step
+            elif kind == VELOCITY:
+                velocity = value
+            elif kind == NOTE_ON:
+                events.append(NoteOnEvent(delta, value, velocity, channel))
+                delta = 0
+            else:
+                events.append(NoteOffEvent(delta, value, 0, channel))
+                delta = 0
+        events.append(EndOfTrackMetaEvent(delta))
+
+        return Track(events)
+
+
+_TOKENIZER = Tokenizer()
+
+def encode(source, out=None):
+    return _TOKENIZER.encode(source, out)
+
+def decode(tokens, channel=0):
+    return _TOKENIZER.decode(tokens, channel)
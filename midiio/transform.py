@@ -0,0 +1,273 @@
+from bisect import bisect_right
+from fractions import Fraction
+from itertools import accumulate
+
+from .events import *
+from .events import _AbstractEvent
+from .containers import *
+from .timing import TempoMap, ticks_per_second
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# minimum number of events for which ticks are transformed as a numpy column
+COLUMNAR_THRESHOLD = 64
+
+
+class TickTransform(object):
+    """
+    Base class of transformations operating on the absolute tick of events.
+
+    map_tick is only allowed to use integer arithmetic, so it can be applied to a
+    single tick as well as to a whole numpy column of ticks at once. The mapping has
+    to be monotonic, so the order of the events of a track is preserved.
+    """
+    def map_tick(self, tick):
+        raise NotImplementedError()
+
+
+class EventTransform(object):
+    """
+    Base class of transformations operating on the properties of events.
+    """
+    event_types = (_AbstractEvent, )
+
+    def __init__(self, channels=None):
+        self._channels = frozenset(channels) if channels is not None else None
+
+    def accepts(self, event):
+        if not isinstance(event, self.event_types):
+            return False
+
+        return self._channels is None or \
+                getattr(event, 'channel', None) in self._channels
+
+    def apply(self, values):
+        """
+        Update the dict of constructor arguments of an accepted event in place.
+        """
+        raise NotImplementedError()
+
+
+class Transpose(EventTransform):
+    event_types = (NoteOnEvent, NoteOffEvent, AfterTouchEvent)
+
+    def __init__(self, semitones, channels=None):
+        super().__init__(channels)
+        self._semitones = semitones
+
+    def apply(self, values):
+        values['pitch'] = min(max(values['pitch'] + self._semitones, 0), 127)
+
+
+class ScaleVelocity(EventTransform):
+    """
+    Scale the velocity of note on events, leaving a velocity of zero untouched.
+    """
+    event_types = (NoteOnEvent, )
+
+    def __init__(self, factor, channels=None):
+        super().__init__(channels)
+        self._factor = factor
+
+    def apply(self, values):
+        velocity = values['velocity']
+        if velocity:
+            values['velocity'] = min(max(int(round(velocity * self._factor)), 1), 127)
+
+
+class Quantize(TickTransform):
+    """
+    Move events towards the closest multiple of grid ticks.
+
+    A strength below 1 only moves the events the given fraction of the way.
+    """
+    def __init__(self, grid, strength=1):
+        self._grid = grid
+        # a float strength would give a numerator overflowing a numpy column
+        self._strength = Fraction(strength).limit_denominator()
+
+    def map_tick(self, tick):
+        grid = self._grid
+        quantized = (tick + grid // 2) // grid * grid
+        if self._strength == 1:
+            return quantized
+
+        numerator = self._strength.numerator
+        denominator = self._strength.denominator
+
+        return tick + ((quantized - tick) * 2 * numerator + denominator) \
+                // (2 * denominator)
+
+
+class TimeStretch(TickTransform):
+    def __init__(self, factor):
+        # a float factor would give a numerator overflowing a numpy column
+        self._factor = Fraction(factor).limit_denominator()
+
+    def map_tick(self, tick):
+        numerator = self._factor.numerator
+        denominator = self._factor.denominator
+
+        return (tick * 2 * numerator + denominator) // (2 * denominator)
+
+
+class Resample(TickTransform):
+    """
+    Convert ticks from a source resolution to another resolution.
+
+    Either resolution may be a negative SMPTE division, in which case the
+    conversion follows the tempo changes, given as (absolute source tick,
+    microseconds per quarter) pairs. The ticks are mapped by a piecewise linear
+    function with exact rational coefficients and only the result is rounded, to
+    the closest tick, so the rounding error never accumulates.
+    """
+    def __init__(self, source_resolution, resolution, tempos=()):
+        self._starts = []
+        self._offsets = []
+        self._factors = []
+        self._denominators = []
+
+        target = Fraction(0)
+        slope = None
+        previous = 0
+        for start, micros_per_quarter in TempoMap(tempos, source_resolution).tempos:
+            if slope is not None:
+                target += (start - previous) * slope
+            previous = start
+            next_slope = ticks_per_second(resolution, micros_per_quarter) / \
+                ticks_per_second(source_resolution, micros_per_quarter)
+            if next_slope == slope:
+                continue
+            slope = next_slope
+
+            # round(target + (tick - start) * slope) with integers only
+            denominator = 2 * target.denominator * slope.denominator
+            self._starts.append(start)
+            self._offsets.append(target.numerator * 2 * slope.denominator +
+                denominator // 2)
+            self._factors.append(2 * slope.numerator * target.denominator)
+            self._denominators.append(denominator)
+
+    def map_tick(self, tick):
+        if numpy is not None and isinstance(tick, numpy.ndarray):
+            return self._map_column(tick)
+
+        index = bisect_right(self._starts, tick) - 1
+
+        return (self._offsets[index] + (tick - self._starts[index]) *
+            self._factors[index]) // self._denominators[index]
+
+    def _map_column(self, ticks):
+        index = numpy.searchsorted(self._starts, ticks, side='right') - 1
+        largest = max(int(ticks.max()) if len(ticks) else 0, 1) * \
+            max(self._factors) + max(self._offsets)
+        if largest >= 2 ** 62:
+            # exceeds int64, continue with Python integers
+            ticks = ticks.astype(object)
+            columns = [ numpy.array(values, dtype=object) for values in
+                (self._starts, self._offsets, self._factors, self._denominators) ]
+        else:
+            columns = [ numpy.array(values, dtype=numpy.int64) for values in
+                (self._starts, self._offsets, self._factors, self._denominators) ]
+        starts, offsets, factors, denominators = columns
+
+        return ((offsets[index] + (ticks - starts[index]) * factors[index]) //
+            denominators[index]).astype(numpy.int64)
+
+
+class TransformPipeline(object):
+    """
+    A composition of transformations applied in a single pass per track.
+
+    Tick transformations are applied in order to the absolute ticks of the events,
+    event transformations in order to the properties of the accepted events. Events
+    that are not changed by any transformation are shared with the source track, and
+    tracks without any changes are returned as they are.
+    """
+    def __init__(self, transforms):
+        self._tick_transforms = [ transform for transform in transforms
+                if isinstance(transform, TickTransform) ]
+        self._event_transforms = [ transform for transform in transforms
+                if isinstance(transform, EventTransform) ]
+
+    def transform_ticks(self, deltas):
+        """
+        Return the new delta ticks of a column of delta ticks.
+        """
+        if not self._tick_transforms:
+            return deltas
+
+        if numpy is not None and len(deltas) >= COLUMNAR_THRESHOLD:
+            ticks = numpy.cumsum(numpy.asarray(deltas, dtype=numpy.int64))
+            for transform in self._tick_transforms:
+                ticks = transform.map_tick(ticks)
+
+            return numpy.diff(ticks, prepend=0).tolist()
+
+        ticks = list(accumulate(deltas))
+        for transform in self._tick_transforms:
+            ticks = [ transform.map_tick(tick) for tick in ticks ]
+
+        return [ tick - previous for tick, previous in zip(ticks, [0] + ticks) ]
+
+    def transform_track(self, track):
+        events = track.events
+        deltas = self.transform_ticks([ event.tick for event in events ])
+        event_transforms = self._event_transforms
+
+        result = []
+        changed = False
+        for event, delta in zip(events, deltas):
+            values = None
+            for transform in event_transforms:
+                if transform.accepts(event):
+                    if values is None:
+                        values = { name: getattr(event, name)
+                            for name in event._arg_names() }
+                    transform.apply(values)
+
+            if values is None:
+                if delta != event.tick:
+                    event = event.replace(tick=delta)
+                    changed = True
+            else:
+                values['tick'] = delta
+                if any(values[name] != getattr(event, name) for name in values):
+                    event = type(event)(**values)
+                    changed = True
+
+            result.append(event)
+
+        return Track(result) if changed else track
+
+    def transform_pattern(self, pattern):
+        tracks = [ self.transform_track(track) for track in pattern ]
+        if all(new is old for new, old in zip(tracks, pattern)):
+            return pattern
+
+        return Pattern(tracks, pattern.resolution, pattern.format)
+
+
+def transform_track(track, *transforms):
+    return TransformPipeline(transforms).transform_track(track)
+
+def transform_pattern(pattern, *transforms):
+    return TransformPipeline(transforms).transform_pattern(pattern)
+
+def resample_track(track, source_resolution, resolution, tempos=()):
+    return TransformPipeline([Resample(source_resolution, resolution, tempos)])\
+        .transform_track(track)
+
+def resample_pattern(pattern, resolution):
+    """
+    Return the pattern converted to resolution, following the tempo changes of
+    the pattern for conversions between SMPTE and metrical divisions.
+    """
+    tempos = TempoMap.from_pattern(pattern).tempos
+    pipeline = TransformPipeline([Resample(pattern.resolution, resolution, tempos)])
+
+    return Pattern([ pipeline.transform_track(track) for track in pattern ],
+        resolution, pattern.format)
@@ -17,6 +17,20 @@ def read_varlen(data):
         value += chr
     return value
 
+def read_varlen_at(data, offset):
+    """
+    Read a variable length value from an indexable byte buffer.
+
+    Returns the value together with the offset of the first byte after it.
+    """
+    value = 0
+    while True:
+        datum = data[offset]
+        offset += 1
+        value = (value << 7) | (datum & 0x7F)
+        if not (datum & 0x80):
+            return value, offset
+
 def write_varlen(value):
     b1 = value & 0x7F
     value >>= 7
@@ -43,8 +57,14 @@ def read_long(byte_like):
 def read_short(byte_like):
     return unpack(">H", byte_like)[0]
 
+def read_signed_short(byte_like):
+    return unpack(">h", byte_like)[0]
+
 def long_to_bytes(long_value):
     return pack(">L", long_value)
 
 def short_to_bytes(short_value):
     return pack(">H", short_value)
+
+def signed_short_to_bytes(short_value):
+    return pack(">h", short_value)
@@ -0,0 +1,484 @@
+"""
+Validation and repair of standard MIDI files.
+
+The Validator checks the structure of a file in one linear scan over its bytes and
+reports every violation as a Finding, without constructing events. The normalizer
+writes a corrected file from the result of the scan: valid chunks are copied
+unchanged and only the tracks with findings are rewritten.
+"""
+from .eventio import EVENTIO_REGISTRY
+from .util import read_long, read_short, read_signed_short, long_to_bytes, \
+        short_to_bytes, signed_short_to_bytes, write_varlen
+
+ERROR = 'error'
+WARNING = 'warning'
+
+INVALID_HEADER = 'invalid-header'
+HEADER_LENGTH = 'header-length'
+INVALID_FORMAT = 'invalid-format'
+TRACK_COUNT = 'track-count'
+INVALID_CHUNK = 'invalid-chunk'
+UNKNOWN_CHUNK = 'unknown-chunk'
+CHUNK_LENGTH = 'chunk-length'
+TRAILING_DATA = 'trailing-data'
+VARLEN_OVERFLOW = 'varlen-overflow'
+TRUNCATED_EVENT = 'truncated-event'
+MISSING_STATUS = 'missing-status'
+INVALID_STATUS = 'invalid-status'
+INVALID_DATA = 'invalid-data'
+UNTERMINATED_SYSEX = 'unterminated-sysex'
+MISSING_END_OF_TRACK = 'missing-end-of-track'
+DATA_AFTER_END_OF_TRACK = 'data-after-end-of-track'
+
+MAX_VARLEN = 0x0FFFFFFF
+
+_END_OF_TRACK = b'\xFF\x2F\x00'
+
+
+class Finding(object):
+    """
+    A violation found in a file.
+
+    offset is the position of the offending bytes in the file, track the index of
+    the track chunk it belongs to, or None for the header and the chunk structure.
+    """
+    def __init__(self, code, severity, offset, track=None, message=None):
+        self._code = code
+        self._severity = severity
+        self._offset = offset
+        self._track = track
+        self._message = message
+
+    @property
+    def code(self):
+        return self._code
+
+    @property
+    def severity(self):
+        return self._severity
+
+    @property
+    def offset(self):
+        return self._offset
+
+    @property
+    def track(self):
+        return self._track
+
+    @property
+    def message(self):
+        return self._message
+
+    def __repr__(self):
+        return "midiio.Finding(code=%r, severity=%r, offset=%r, track=%r, " \
+            "message=%r)" % (self.code, self.severity, self.offset, self.track,
+                self.message)
+
+
+class _Chunk(object):
+    def __init__(self, chunk_id, start, body, end, track=None, valid=True):
+        self.chunk_id = chunk_id
+        self.start = start
+        self.body = body
+        self.end = end
+        self.track = track
+        self.valid = valid
+
+
+class ValidationReport(object):
+    def __init__(self, findings, format=None, header_tracks=None, resolution=None,
+            chunks=()):
+        self._findings = tuple(findings)
+        self._format = format
+        self._header_tracks = header_tracks
+        self._resolution = resolution
+        self._chunks = tuple(chunks)
+
+    @property
+    def findings(self):
+        return self._findings
+
+    @property
+    def errors(self):
+        return [ finding for finding in self._findings if finding.severity == ERROR ]
+
+    @property
+    def warnings(self):
+        return [ finding for finding in self._findings
+            if finding.severity == WARNING ]
+
+    @property
+    def valid(self):
+        """True if the file has no errors, warnings are allowed."""
+        return not self.errors
+
+    @property
+    def repairable(self):
+        """True if the file has a header the normalizer can start from."""
+        return self._format is not None
+
+    @property
+    def format(self):
+        return self._format
+
+    @property
+    def header_tracks(self):
+        """The number of tracks declared in the header."""
+        return self._header_tracks
+
+    @property
+    def tracks(self):
+        """The number of track chunks actually found."""
+        return len([ chunk for chunk in self._chunks if chunk.track is not None ])
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    @property
+    def codes(self):
+        return set(finding.code for finding in self._findings)
+
+    def __repr__(self):
+        return "midiio.ValidationReport(valid=%r, findings=%r)" % \
+            (self.valid, list(self.findings))
+
+
+class Validator(object):
+    """
+    Single-pass checker of the structure of standard MIDI files.
+
+    Checks the header fields against the chunks actually present, chunk lengths
+    against the file size and the events they contain, the encoding of
+    variable-length quantities, status bytes and data bytes of channel messages,
+    the termination of sysex messages and the end of track of every track.
+
+    A track chunk whose length does not match its events ends after its first end
+    of track event instead.
+    """
+    def __init__(self, event_registry=EVENTIO_REGISTRY):
+        registry = event_registry.freeze()
+        self._lengths = { event_type.statusmsg: event_type.length
+                for event_type in registry.get_midi_events() }
+
+    def validate(self, data):
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        findings = []
+        size = len(data)
+
+        if size < 14 or data[0:4] != b'MThd':
+            findings.append(Finding(INVALID_HEADER, ERROR, 0,
+                message="File does not start with an MThd chunk"))
+            return ValidationReport(findings)
+
+        header_length = read_long(data[4:8])
+        if header_length < 6:
+            findings.append(Finding(INVALID_HEADER, ERROR, 4,
+                message="Header length %d is too short" % header_length))
+            return ValidationReport(findings)
+        if header_length != 6:
+            findings.append(Finding(HEADER_LENGTH, WARNING, 4,
+                message="Header length %d instead of 6" % header_length))
+
+        format_version = read_short(data[8:10])
+        header_tracks = read_short(data[10:12])
+        resolution = read_signed_short(data[12:14])
+        if format_version > 2:
+            findings.append(Finding(INVALID_FORMAT, ERROR, 8,
+                message="Unknown format %d" % format_version))
+
+        chunks = [_Chunk(b'MThd', 0, 8, min(8 + header_length, size))]
+        position = chunks[0].end
+        while position < size:
+            if size - position < 8:
+                findings.append(Finding(TRAILING_DATA, WARNING, position,
+                    message="%d bytes after the last chunk" % (size - position)))
+                break
+
+            chunk_id = data[position:position + 4]
+            if not all(0x20 <= byte < 0x7F for byte in chunk_id):
+                resync = data.find(b'MTrk', position)
+                findings.append(Finding(INVALID_CHUNK, ERROR, position,
+                    message="Invalid chunk id %r" % chunk_id))
+                if resync < 0:
+                    break
+                position = resync
+                continue
+
+            body = position + 8
+            end = body + read_long(data[position + 4:body])
+            if chunk_id != b'MTrk':
+                valid = end <= size
+                if valid:
+                    findings.append(Finding(UNKNOWN_CHUNK, WARNING, position,
+                        message="Unknown chunk %r" % chunk_id))
+                else:
+                    findings.append(Finding(CHUNK_LENGTH, ERROR, position + 4,
+                        message="Chunk %r exceeds the file" % chunk_id))
+                chunks.append(_Chunk(chunk_id, position, body, min(end, size),
+                    valid=valid))
+                position = end
+                continue
+
+            track = len([ chunk for chunk in chunks if chunk.track is not None ])
+            track_findings = []
+            if not self._is_chunk_boundary(data, end):
+                # the length does not fit, so the track ends with its end of track
+                track_findings.append(Finding(CHUNK_LENGTH, ERROR, position + 4,
+                    track, "Track length %d does not match the track data" %
+                        (end - body)))
+                end = self.walk_track(data, body, size, track, track_findings,
+                    stop_at_end_of_track=True)
+            else:
+                self.walk_track(data, body, end, track, track_findings)
+
+            findings.extend(track_findings)
+            chunks.append(_Chunk(chunk_id, position, body, end, track,
+                not track_findings))
+            position = end
+
+        tracks = len([ chunk for chunk in chunks if chunk.track is not None ])
+        if tracks != header_tracks:
+            findings.append(Finding(TRACK_COUNT, ERROR, 10,
+                message="Header declares %d tracks, found %d" %
+                    (header_tracks, tracks)))
+        if format_version == 0 and tracks > 1:
+            findings.append(Finding(INVALID_FORMAT, WARNING, 8,
+                message="Format 0 file with %d tracks" % tracks))
+
+        return ValidationReport(findings, format_version, header_tracks, resolution,
+            chunks)
+
+    def _is_chunk_boundary(self, data, position):
+        size = len(data)
+        if position > size:
+            return False
+        if size - position < 8:
+            # too short for another chunk, reported as trailing data
+            return True
+
+        return all(0x20 <= byte < 0x7F for byte in data[position:position + 4])
+
+    def _read_varlen(self, data, position, end, track, findings):
+        """
+        Read a variable-length quantity, raising IndexError at the end of the data.
+        """
+        start = position
+        value = 0
+        while True:
+            if position >= end:
+                raise IndexError(start)
+            datum = data[position]
+            position += 1
+            value = (value << 7) | (datum & 0x7F)
+            if not datum & 0x80:
+                break
+
+        if position - start > 4 or value > MAX_VARLEN:
+            findings.append(Finding(VARLEN_OVERFLOW, ERROR, start, track,
+                "Variable-length quantity of %d bytes" % (position - start)))
+
+        return value, position
+
+    def walk_track(self, data, start, end, track=None, findings=None, output=None,
+            stop_at_end_of_track=False):
+        """
+        Check the events in data[start:end] and return the offset after the last
+        event read.
+
+        Findings are appended to findings. If output is a bytearray, the repaired
+        events are appended to it: variable-length quantities are written in their
+        shortest form, sysex messages that are not continued by an 0xF7 packet are
+        terminated, events after the end of track or after an unreadable event are
+        dropped and a missing end of track is added.
+        """
+        if findings is None:
+            findings = []
+        lengths = self._lengths
+
+        running_status = None
+        written_status = None
+        position = start
+        end_of_track = False
+        # an 0xF0 packet without 0xF7, which is held back until the next event shows
+        # whether it is the first packet of a divided message
+        divided = None
+        while position < end:
+            offset = position
+            try:
+                delta, position = self._read_varlen(data, position, end, track,
+                    findings)
+                if position >= end:
+                    raise IndexError(offset)
+                if end_of_track:
+                    findings.append(Finding(DATA_AFTER_END_OF_TRACK, WARNING, offset,
+                        track, "%d bytes after the end of track" % (end - offset)))
+                    position = end
+                    break
+
+                status_byte = data[position]
+                if divided is not None:
+                    self._end_sysex(divided, status_byte == 0xF7, track, findings,
+                        output)
+                    divided = None
+                if status_byte == 0xFF:
+                    if position + 1 >= end:
+                        raise IndexError(offset)
+                    meta_command = data[position + 1]
+                    length, body = self._read_varlen(data, position + 2, end, track,
+                        findings)
+                    if body + length > end:
+                        raise IndexError(offset)
+                    if output is not None:
+                        output += write_varlen(min(delta, MAX_VARLEN))
+                        output += bytes((0xFF, meta_command))
+                        output += write_varlen(length)
+                        output += data[body:body + length]
+                    position = body + length
+                    running_status = written_status = None
+                    if meta_command == 0x2F:
+                        end_of_track = True
+                        if stop_at_end_of_track:
+                            break
+                elif status_byte in (0xF0, 0xF7):
+                    length, body = self._read_varlen(data, position + 1, end, track,
+                        findings)
+                    if body + length > end:
+                        raise IndexError(offset)
+                    payload = bytes(data[body:body + length])
+                    if status_byte == 0xF0 and payload[-1:] != b'\xF7':
+                        divided = (offset, delta, payload)
+                    elif output is not None:
+                        self._write_sysex(output, delta, status_byte, payload)
+                    position = body + length
+                    running_status = written_status = None
+                else:
+                    if status_byte & 0x80:
+                        running_status = status_byte
+                        position += 1
+                    elif running_status is None:
+                        findings.append(Finding(MISSING_STATUS, ERROR, position,
+                            track, "Data byte %d without running status" %
+                                status_byte))
+                        position = end
+                        break
+
+                    length = lengths.get(running_status & 0xF0)
+                    if length is None:
+                        findings.append(Finding(INVALID_STATUS, ERROR, position,
+                            track, "Invalid status byte %d" % running_status))
+                        position = end
+                        break
+                    if position + length > end:
+                        raise IndexError(offset)
+                    event_data = bytes(data[position:position + length])
+                    if any(byte & 0x80 for byte in event_data):
+                        findings.append(Finding(INVALID_DATA, ERROR, position,
+                            track, "Data byte with high bit set"))
+                        position = end
+                        break
+                    if output is not None:
+                        output += write_varlen(min(delta, MAX_VARLEN))
+                        if running_status != written_status:
+                            output.append(running_status)
+                            written_status = running_status
+                        output += event_data
+                    position += length
+            except IndexError:
+                findings.append(Finding(TRUNCATED_EVENT, ERROR, offset, track,
+                    "Event exceeds the track data"))
+                position = end
+                break
+
+        if divided is not None:
+            self._end_sysex(divided, False, track, findings, output)
+        if not end_of_track:
+            findings.append(Finding(MISSING_END_OF_TRACK, ERROR, end, track,
+                "Track without end of track event"))
+            if output is not None:
+                output += b'\x00' + _END_OF_TRACK
+
+        return position
+
+    def _end_sysex(self, divided, continued, track, findings, output):
+        offset, delta, payload = divided
+        if not continued:
+            findings.append(Finding(UNTERMINATED_SYSEX, WARNING, offset, track,
+                "Sysex message without terminating 0xF7"))
+            payload += b'\xF7'
+        if output is not None:
+            self._write_sysex(output, delta, 0xF0, payload)
+
+    def _write_sysex(self, output, delta, status_byte, payload):
+        output += write_varlen(min(delta, MAX_VARLEN))
+        output.append(status_byte)
+        output += write_varlen(len(payload))
+        output += payload
+
+    def normalize(self, data, report=None, keep_unknown=False):
+        """
+        Return the bytes of a corrected file.
+
+        The header is rewritten with the number of tracks found and chunks without
+        findings are copied unchanged. Tracks with findings are rewritten as
+        described in walk_track. Unknown chunks are dropped, as MidiIO does not
+        read them, unless keep_unknown is set; those exceeding the file are always
+        dropped.
+        """
+        if report is None:
+            report = self.validate(data)
+        if not report.repairable:
+            raise ValueError("File can not be repaired: " + repr(report.errors))
+
+        view = memoryview(data).cast('B')
+        output = bytearray(b'MThd')
+        output += long_to_bytes(6)
+        output += short_to_bytes(report.format)
+        output += short_to_bytes(report.tracks)
+        output += signed_short_to_bytes(report.resolution)
+        for chunk in report._chunks[1:]:
+            if chunk.track is None and not keep_unknown:
+                continue
+            if chunk.valid:
+                output += view[chunk.start:chunk.end]
+            elif chunk.track is not None:
+                track_data = bytearray()
+                self.walk_track(view, chunk.body, chunk.end, chunk.track, [],
+                    track_data)
+                output += b'MTrk'
+                output += long_to_bytes(len(track_data))
+                output += track_data
+
+        return bytes(output)
+
+
+def _read_data(midifile):
+    if type(midifile) in (str, bytes):
+        with open(midifile, 'rb') as inp:
+            return inp.read()
+
+    return midifile.read()
+
+
+def validate_midifile(midifile):
+    return Validator().validate(_read_data(midifile))
+
+
+def normalize_midifile(midifile, output):
+    """
+    Write the corrected version of midifile to output, a path or a writable file,
+    and return the report of the validation.
+    """
+    validator = Validator()
+    data = _read_data(midifile)
+    report = validator.validate(data)
+    normalized = validator.normalize(data, report)
+
+    if type(output) in (str, bytes):
+        with open(output, 'wb') as out:
+            out.write(normalized)
+    else:
+        output.write(normalized)
+
+    return report
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+"""
+Measure the time to import midiio modules in a fresh interpreter.
+
+Usage: bench_import.py [--runs N] [<module> ...]
+"""
+import subprocess
+import sys
+
+
+def import_time(module):
+    """
+    Return the cumulative import time of module in microseconds, as reported by
+    python -X importtime.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+        'import ' + module], stderr=subprocess.PIPE, universal_newlines=True,
+            check=True)
+    for line in reversed(result.stderr.splitlines()):
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+
+    raise ValueError("No import time reported for " + module)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    runs = 10
+    if args[:1] == ['--runs']:
+        runs = int(args[1])
+        args = args[2:]
+    modules = args or ['midiio', 'midiio.fileio', 'midiio.metadata']
+
+    for module in modules:
+        times = sorted(import_time(module) for _ in range(runs))
+        print("{0}: {1:.1f} ms (median of {2}, best {3:.1f} ms)".format(module,
+            times[len(times) // 2] / 1000, runs, times[0] / 1000))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Measure the memory held by parsed MIDI files with and without an EventPool.
+
+Usage: bench_intern.py [<midifile> ...]
+
+Without files, a generated drum track of 2000 bars of sixteenth note hi-hats with
+kick and snare on the beats is measured.
+"""
+import io
+import sys
+import time
+import tracemalloc
+
+from midiio.containers import Pattern, Track
+from midiio.events import NoteOnEvent, TrackNameMetaEvent
+from midiio.fileio import EventPool, read_midifile, write_midifile
+
+
+def drum_file(bars=2000):
+    events = [TrackNameMetaEvent(0, 'Drums')]
+    for bar in range(bars):
+        for step in range(16):
+            events.append(NoteOnEvent(0, 42, 90 if step % 2 else 110, 9))
+            if step % 4 == 0:
+                events.append(NoteOnEvent(0, 36 if step % 8 == 0 else 38, 120, 9))
+            events.append(NoteOnEvent(60, 42, 0, 9))
+            if step % 4 == 0:
+                events.append(NoteOnEvent(0, 36 if step % 8 == 0 else 38, 0, 9))
+
+    buf = io.BytesIO()
+    write_midifile(buf, Pattern([Track(events)]))
+
+    return buf.getvalue()
+
+
+def measure(data, event_pool):
+    """
+    Return the number of bytes allocated for the parsed pattern and the parse
+    time in seconds.
+    """
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        pattern = read_midifile(io.BytesIO(data), event_pool=event_pool)
+        seconds = time.perf_counter() - start
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del pattern
+
+    return size, seconds
+
+
+if __name__ == '__main__':
+    files = [ (path, open(path, 'rb').read()) for path in sys.argv[1:] ] or \
+        [('generated drum track', drum_file())]
+
+    for name, data in files:
+        plain_size, plain_seconds = measure(data, None)
+        pool = EventPool()
+        pooled_size, pooled_seconds = measure(data, pool)
+        print("{0}: {1:.0f} KiB plain, {2:.0f} KiB pooled ({3:.0%}), "
+            "{4} pooled events, {5} hits, {6:.0f} ms vs {7:.0f} ms".format(name,
+                plain_size / 1024, pooled_size / 1024, pooled_size / plain_size,
+                len(pool), pool.hits, plain_seconds * 1000, pooled_seconds * 1000))
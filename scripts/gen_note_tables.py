@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+"""
+Generate midiio/_note_tables.py, the note name constants of midiio.constants.
+
+Usage: gen_note_tables.py [<output file>]
+"""
+import os
+import sys
+
+NOTE_NAMES = ['C', 'Cs', 'D', 'Ds', 'E', 'F', 'Fs', 'G', 'Gs', 'A', 'As', 'B']
+NOTE_PER_OCTAVE = len(NOTE_NAMES)
+
+
+def note_tables():
+    """
+    Return the flat and sharp name maps and value lists and the module level names
+    of all 128 notes.
+    """
+    name_map_flat = {}
+    value_map_flat = []
+    name_map_sharp = {}
+    value_map_sharp = []
+    names = []
+
+    for value in range(128):
+        noteidx = value % NOTE_PER_OCTAVE
+        octidx = value // NOTE_PER_OCTAVE
+        name = NOTE_NAMES[noteidx]
+        sharp = '%s_%d' % (name, octidx)
+        if len(name) == 2:
+            flat = '%s_%d' % (NOTE_NAMES[noteidx + 1] + 'b', octidx)
+            names.append((sharp, value))
+            names.append((flat, value))
+        else:
+            flat = sharp
+            names.append((sharp, value))
+        name_map_flat[flat] = value
+        name_map_sharp[sharp] = value
+        value_map_flat.append(flat)
+        value_map_sharp.append(sharp)
+
+    return name_map_flat, value_map_flat, name_map_sharp, value_map_sharp, names
+
+
+def generate():
+    name_map_flat, value_map_flat, name_map_sharp, value_map_sharp, names = \
+        note_tables()
+
+    lines = ['# Generated by scripts/gen_note_tables.py, do not edit.', '']
+    for table_name, table in (('NOTE_NAME_MAP_FLAT', name_map_flat),
+            ('NOTE_NAME_MAP_SHARP', name_map_sharp)):
+        lines.append('%s = {' % table_name)
+        lines.extend('    %r: %d,' % item for item in table.items())
+        lines.extend(['}', ''])
+    for table_name, table in (('NOTE_VALUE_MAP_FLAT', value_map_flat),
+            ('NOTE_VALUE_MAP_SHARP', value_map_sharp)):
+        lines.append('%s = [' % table_name)
+        lines.extend('    %r,' % name for name in table)
+        lines.extend([']', ''])
+    lines.extend('%s = %d' % item for item in names)
+
+    return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        print("Usage: {0} [<output file>]".format(sys.argv[0]))
+        sys.exit(2)
+
+    output = sys.argv[1] if len(sys.argv) == 2 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'midiio', '_note_tables.py')
+    with open(output, 'w') as out:
+        out.write(generate())
@@ -1,14 +1,14 @@
 #!/usr/bin/env python
 """
-Print a description of a MIDI file.
+Print the events or a summary of MIDI files.
+
+Usage: mididump.py [--json] [--summary | --header] [-j <workers>] [filters] <path>...
+
+Run with --help for all options, see midiio.dump for the output formats.
 """
-import midi
 import sys
 
-if len(sys.argv) != 2:
-    print("Usage: {0} <midifile>".format(sys.argv[0]))
-    sys.exit(2)
+from midiio.dump import main
 
-midifile = sys.argv[1]
-pattern = midi.read_midifile(midifile)
-print(repr(pattern))
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,7 +15,7 @@ __base__ = {
     'maintainer': 'blowfeld',
     'maintainer_email': 'grand.hifi@gmail.com',
     'package_dir': {'midiio':'midiio'},
-    'py_modules': ['midiio.containers', 'midiio.__init__', 'midiio.events', 'midiio.eventio', 'midiio.util', 'midiio.fileio', 'midiio.constants'],
+    'py_modules': ['midiio.containers', 'midiio.__init__', 'midiio.events', 'midiio.eventio', 'midiio.util', 'midiio.fileio', 'midiio.constants', 'midiio.metadata', 'midiio.transform', 'midiio.thinning', 'midiio.dedup', 'midiio.serialization', 'midiio.archive', 'midiio.timing', 'midiio.pianoroll', 'midiio.dataset', 'midiio.tokens', 'midiio.fingerprint', 'midiio.stats', 'midiio.validate', 'midiio.stream', 'midiio.sysex', 'midiio.dump', 'midiio.diff', 'midiio.editing', 'midiio._note_tables'],
     'ext_modules': [],
     'ext_package': '',
     'scripts': ['scripts/mididump.py',],
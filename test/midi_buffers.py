@@ -0,0 +1,11 @@
+import io
+import midiio.fileio
+
+def midi_buffer(pattern):
+    """
+    Write a pattern as a MIDI file into a BytesIO, positioned at its start.
+    """
+    buf = io.BytesIO()
+    midiio.fileio.write_midifile(buf, pattern)
+    buf.seek(0)
+    return buf
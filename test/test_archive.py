@@ -0,0 +1,83 @@
+import unittest
+import os
+import midiio.fileio
+from midiio.events import *
+from midiio.containers import *
+from midiio.archive import *
+import mary_test
+
+class TestArchive(unittest.TestCase):
+    test_file = "archive.mida"
+    midi_file = "mary.mid"
+
+    def _pattern(self, pitch):
+        return Pattern([Track([NoteOnEvent(0, pitch, 100), NoteOnEvent(10, pitch, 0),
+            EndOfTrackMetaEvent(0)])], resolution=96)
+
+    def test_write_and_read(self):
+        midiio.fileio.write_midifile(self.midi_file, mary_test.MARY_MIDI)
+        with MidiArchive(self.test_file, 'a') as archive:
+            archive.add_midifile("mary", self.midi_file)
+            archive.add_pattern("snapshot", self._pattern(60), snapshot=True)
+
+        with MidiArchive(self.test_file) as archive:
+            self.assertEqual(archive.names(), ["mary", "snapshot"])
+            self.assertEqual(len(archive["mary"][1]), len(mary_test.MARY_MIDI[1]))
+            self.assertEqual(archive["snapshot"][0][0].pitch, 60)
+            self.assertEqual(archive["snapshot"].resolution, 96)
+            with open(self.midi_file, 'rb') as inp:
+                self.assertEqual(bytes(archive.get_bytes("mary")), inp.read())
+
+    def test_append(self):
+        with MidiArchive(self.test_file, 'a') as archive:
+            archive.add_pattern("a", self._pattern(60))
+        size = os.path.getsize(self.test_file)
+
+        with MidiArchive(self.test_file, 'a') as archive:
+            self.assertIn("a", archive)
+            archive.add_pattern("b", self._pattern(62))
+            archive.add_pattern("c", self._pattern(64))
+
+        with open(self.test_file, 'rb') as inp:
+            data = inp.read()
+        self.assertTrue(len(data) > size)
+
+        with MidiArchive(self.test_file) as archive:
+            self.assertEqual(len(archive), 3)
+            self.assertEqual([ (name, pattern[0][0].pitch)
+                for name, pattern in archive.items() ],
+                [("a", 60), ("b", 62), ("c", 64)])
+            self.assertRaises(ValueError, archive.add, "d", b'')
+
+    def test_append_size(self):
+        names = [ "b%d" % index for index in range(20) ]
+        with MidiArchive(self.test_file, 'a') as archive:
+            archive.add("a", b'a' * 100)
+        for name in names:
+            with MidiArchive(self.test_file, 'a') as archive:
+                archive.add(name, b'b' * 10)
+
+        # every append replaces the index instead of leaving the old one behind
+        index_size = sum(2 + len(name) + 17 for name in ["a"] + names)
+        self.assertEqual(os.path.getsize(self.test_file),
+            32 + 100 + 10 * len(names) + index_size)
+
+        with MidiArchive(self.test_file, 'a') as archive:
+            self.assertEqual(len(archive), 21)
+            self.assertEqual(bytes(archive.get_bytes("b19")), b'b' * 10)
+            view = archive.get_bytes("a")
+            archive.add("c", b'c')
+            self.assertRaises(ValueError, archive.flush)
+            view.release()
+            archive.flush()
+            self.assertEqual(bytes(archive.get_bytes("c")), b'c')
+
+    def tearDown(self):
+        for path in (self.test_file, self.midi_file):
+            try:
+                os.remove(path)
+            except:
+                pass
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os
+import shutil
+import tempfile
+import midiio.fileio
+from midiio.events import *
+from midiio.containers import *
+from midiio.dataset import *
+
+class TestDataset(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.paths = []
+        for index in range(6):
+            path = os.path.join(self.directory, "file%d.mid" % index)
+            events = [SetTempoMetaEvent(0, 500000)]
+            for step in range(10):
+                events.append(NoteOnEvent(0 if step == 0 else 48, 60 + index, 100,
+                    step % 2))
+                events.append(NoteOnEvent(48, 60 + index, 0, step % 2))
+            events.append(EndOfTrackMetaEvent(0))
+            midiio.fileio.write_midifile(path, Pattern([Track(events)], resolution=96))
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_event_windows(self):
+        dataset = WindowDataset(self.paths, 8, stride=4, workers=0)
+
+        windows = list(dataset)
+
+        # 22 events per file give windows starting at 0, 4, 8, 12
+        self.assertEqual(len(windows), 6 * 4)
+        self.assertTrue(all(len(window) == 8 for window in windows))
+        self.assertEqual(windows[0].source, self.paths[0])
+        self.assertEqual(windows[1].track[0].tick, 0)
+        self.assertEqual(dataset.stats.files, 6)
+        self.assertEqual(dataset.stats.windows, 24)
+        self.assertEqual(dataset.stats.events, 6 * 22)
+
+    def test_tick_windows_and_channels(self):
+        dataset = WindowDataset(self.paths[:1], 192, unit=TICKS, channels=[0],
+            workers=0)
+
+        windows = list(dataset)
+
+        self.assertEqual([ (window.start, window.end) for window in windows ],
+            [(0, 192), (192, 384), (384, 576), (576, 768)])
+        # the notes of channel 1 start every other quarter and are dropped
+        self.assertEqual([ [ event.channel for event in window.track if
+            isinstance(event, NoteOnEvent) and event.velocity ]
+                for window in windows ], [[0], [0], [0], [0]])
+        self.assertEqual(windows[1].track[0].tick, 0)
+
+    def test_seconds_windows(self):
+        # 96 ticks per quarter at 120 bpm, so one second is 192 ticks
+        ticks = list(WindowDataset(self.paths[:1], 192, unit=TICKS, workers=0))
+        seconds = list(WindowDataset(self.paths[:1], 1.0, unit=SECONDS, workers=0))
+
+        self.assertEqual([ len(window) for window in ticks ],
+            [ len(window) for window in seconds ])
+
+    def test_shuffle_is_deterministic(self):
+        def order(seed, workers, processes=True):
+            dataset = WindowDataset(self.paths, 22, shuffle=True, seed=seed,
+                workers=workers, prefetch=2, processes=processes)
+            return [ window.source for window in dataset ]
+
+        self.assertEqual(order(1, 0), order(1, 2, processes=False))
+        self.assertEqual(order(1, 0), order(1, 2))
+        self.assertEqual(sorted(order(1, 0)), self.paths)
+        self.assertNotEqual(order(1, 0), order(2, 0))
+
+    def test_failures_are_counted(self):
+        dataset = WindowDataset(self.paths[:2] + ["missing.mid"], 8, workers=1,
+            processes=False)
+
+        self.assertEqual(len(list(dataset)), 4)
+        self.assertEqual(dataset.stats.failures, 1)
+        self.assertTrue(dataset.stats.windows_per_second > 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import midiio.fileio
+from midiio.events import *
+from midiio.containers import *
+from midiio.dedup import *
+from midi_buffers import midi_buffer
+
+class TestDedup(unittest.TestCase):
+    def _drums(self, name, note_off):
+        return Track([TrackNameMetaEvent(0, name),
+            NoteOnEvent(0, 36, 100, 9),
+            note_off(120, 36, 0, 9),
+            NoteOnEvent(0, 42, 80, 9),
+            note_off(120, 42, 0, 9),
+            EndOfTrackMetaEvent(0)])
+
+    def test_canonical_hash(self):
+        track1 = self._drums("drums", NoteOnEvent)
+        track2 = self._drums("kit", NoteOffEvent)
+        track3 = Track([TrackNameMetaEvent(120, "moved")] + list(track1[1:]))
+
+        self.assertEqual(hash_track(track1), hash_track(track2))
+        self.assertNotEqual(hash_track(track1), hash_track(track3))
+        self.assertNotEqual(TrackHasher(ignore_types=()).hash_track(track1),
+            TrackHasher(ignore_types=()).hash_track(track2))
+
+    def test_running_status(self):
+        # the same notes with and without running status
+        explicit = bytes([0x00, 0x90, 60, 100, 0x10, 0x90, 60, 0,
+            0x00, 0xFF, 0x2F, 0x00])
+        running = bytes([0x00, 0x90, 60, 100, 0x10, 60, 0,
+            0x00, 0xFF, 0x2F, 0x00])
+        event_io = midiio.fileio.EventIO(midiio.eventio.EVENTIO_REGISTRY)
+
+        self.assertEqual(hash_track(Track(event_io.parse_events(explicit))),
+            hash_track(Track(event_io.parse_events(running))))
+        self.assertNotEqual(chunk_digest(explicit), chunk_digest(running))
+
+    def test_shared_tracks(self):
+        index = DedupIndex()
+        pattern1 = index.read_midifile(midi_buffer(Pattern([
+            self._drums("drums", NoteOnEvent)])))
+        pattern2 = index.read_midifile(midi_buffer(Pattern([
+            self._drums("kit", NoteOnEvent),
+            Track([NoteOnEvent(0, 60, 100), EndOfTrackMetaEvent(10)])])))
+
+        # the tracks only differ in their name, which is kept
+        self.assertIsNot(pattern1[0], pattern2[0])
+        self.assertEqual(pattern2[0][0].text, "kit")
+        pattern3 = index.read_midifile(midi_buffer(Pattern([
+            self._drums("drums", NoteOnEvent)])))
+        self.assertIs(pattern3[0], pattern1[0])
+        self.assertEqual(len(index), 2)
+        digest = hash_track(pattern1[0])
+        self.assertIn(digest, index)
+        self.assertEqual(len(index.duplicates()), 1)
+        self.assertEqual(len(index.get_sources(digest)), 3)
+
+    def test_raw_chunks(self):
+        index = DedupIndex()
+        pattern = Pattern([self._drums("drums", NoteOnEvent)])
+        digests1 = index.add_raw_midifile(midi_buffer(pattern))
+        digests2 = index.add_raw_midifile(midi_buffer(pattern))
+
+        self.assertEqual(digests1, digests2)
+        self.assertEqual(index.get_sources(digests1[0]), [(None, 0), (None, 0)])
+        self.assertEqual(list(index.duplicates()), digests1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import io
+import random
+import midiio.fileio
+from midiio.events import *
+from midiio.containers import *
+from midiio.diff import *
+import mary_test
+
+class TestDiff(unittest.TestCase):
+    def _mary(self):
+        buf = io.BytesIO()
+        midiio.fileio.write_midifile(buf, mary_test.MARY_MIDI)
+        return midiio.fileio.read_midifile(io.BytesIO(buf.getvalue()))
+
+    def test_track_hash(self):
+        first = self._mary()
+        second = self._mary()
+
+        self.assertIsNot(first[1], second[1])
+        self.assertEqual(first[1], second[1])
+        self.assertEqual(hash(first[1]), hash(second[1]))
+        self.assertNotEqual(first[0], first[1])
+        self.assertEqual(first, second)
+
+    def test_diff_sequences(self):
+        random.seed(4)
+        for _ in range(200):
+            old = [ random.randint(0, 4) for _ in range(random.randint(0, 30)) ]
+            new = [ random.randint(0, 4) for _ in range(random.randint(0, 30)) ]
+            self.assertEqual(apply_hunks(old, diff_sequences(old, new)), new)
+
+        hunks = diff_sequences('abcabba', 'cbabac')
+        self.assertEqual(''.join(apply_hunks('abcabba', hunks)), 'cbabac')
+        self.assertEqual(sum(hunk.deleted + len(hunk.events) for hunk in hunks), 5)
+        self.assertEqual(diff_sequences('abc', 'abc'), [])
+
+    def test_edit_kinds(self):
+        events = [ NoteOnEvent(10, pitch, 100) for pitch in range(60, 70) ]
+        edited = events[:2] + [NoteOnEvent(10, 80, 100)] + events[3:5] + \
+            events[6:] + [NoteOffEvent(0, 69, 0)]
+
+        hunks = diff_sequences(events, edited)
+
+        self.assertEqual([ hunk.kind for hunk in hunks ],
+            ['modify', 'delete', 'insert'])
+        self.assertEqual(hunks[0], Hunk(2, 1, [NoteOnEvent(10, 80, 100)]))
+
+    def test_pattern_patch(self):
+        base = self._mary()
+        notes = list(base[1])
+        notes[5] = notes[5].replace(velocity=1)
+        del notes[9]
+        pattern = Pattern([Track(notes), base[0],
+            Track([TrackNameMetaEvent(0, 'new'), EndOfTrackMetaEvent(0)])],
+            base.resolution, base.format)
+
+        patch = diff_patterns(base, pattern)
+
+        self.assertEqual([ source for source, hunks in patch.tracks ], [1, 0, None])
+        self.assertEqual(patch.tracks[1][1], ())
+        self.assertEqual(patch.changed_tracks, [0, 2])
+        self.assertEqual(apply_patch(base, patch), pattern)
+        self.assertIs(apply_patch(base, patch)[1], base[0])
+
+        data = patch_to_bytes(patch)
+        self.assertEqual(patch_from_bytes(data), patch)
+        self.assertEqual(apply_patch(base, data), pattern)
+        self.assertLess(len(data), len(base.to_bytes()) / 2)
+
+        with self.assertRaises(ValueError):
+            apply_patch(pattern, data)
+        self.assertEqual(diff_patterns(base, base).changed_tracks, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+import midiio.fileio
+from midiio.events import *
+from midiio.dump import *
+import mary_test
+
+class TestDump(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'mary.mid')
+        midiio.fileio.write_midifile(self.path, mary_test.MARY_MIDI)
+        self.broken = os.path.join(self.directory, 'broken.mid')
+        with open(self.broken, 'wb') as out:
+            out.write(b'MThx\x00\x00\x00\x06')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _main(self, *args):
+        output = io.StringIO()
+        exit_code = main(list(args), output)
+        return exit_code, output.getvalue().splitlines()
+
+    def test_json_events(self):
+        exit_code, lines = self._main('--json', self.path)
+        records = [ json.loads(line) for line in lines ]
+        pattern = midiio.fileio.read_midifile(self.path)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(records[0], {'file': self.path, 'format': pattern.format,
+            'resolution': pattern.resolution, 'tracks': len(pattern)})
+        self.assertEqual(records[-1], {'file': self.path, 'exit': 0,
+            'records': sum(len(track) for track in pattern)})
+
+        events = records[1:-1]
+        self.assertEqual(len(events), sum(len(track) for track in pattern))
+        notes = [ record for record in events if record['type'] == 'NoteOnEvent' ]
+        note = [ event for track in pattern for event in track
+            if isinstance(event, NoteOnEvent) ][0]
+        self.assertEqual((notes[0]['pitch'], notes[0]['velocity'],
+            notes[0]['channel']), (note.pitch, note.velocity, note.channel))
+        self.assertEqual(events[-1]['tick'], sum(event.tick for event in pattern[-1]))
+
+    def test_text_events(self):
+        exit_code, lines = self._main(self.path)
+        pattern = midiio.fileio.read_midifile(self.path)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(len(lines), sum(len(track) for track in pattern))
+        self.assertTrue(lines[0].startswith(self.path + ':0 0 '))
+        self.assertIn('NoteOnEvent pitch=', '\n'.join(lines))
+
+    def test_filter(self):
+        exit_code, lines = self._main('--type', 'NoteOnEvent', '--channels', '0',
+            self.path)
+
+        self.assertEqual(exit_code, 0)
+        self.assertTrue(lines)
+        self.assertTrue(all(' NoteOnEvent ' in line for line in lines))
+
+        self.assertEqual(self._main('--type', 'NoSuchEvent', self.path)[0], USAGE)
+
+    def test_summary_and_header(self):
+        exit_code, lines = self._main('--summary', '--json', self.path)
+        summary = json.loads(lines[0])
+        info = midiio.scan_midifile(self.path)
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(summary['notes'], info.note_count)
+        self.assertEqual(summary['duration'], info.duration)
+
+        exit_code, lines = self._main('--header', self.path)
+        self.assertEqual(lines, ['%s format=%d resolution=%d tracks=%d' % (self.path,
+            info.format, info.resolution, len(info.tracks))])
+
+    def test_failures(self):
+        exit_code, lines = self._main('--json', '--header', self.path, self.broken)
+        records = [ json.loads(line) for line in lines ]
+
+        self.assertEqual(exit_code, 1)
+        self.assertEqual([ record['exit'] for record in records
+            if 'exit' in record ], [0, 1])
+        self.assertEqual(records[-1]['file'], self.broken)
+
+        self.assertEqual(self._main(os.path.join(self.directory, '*.none'))[0], 1)
+        self.assertEqual(main([], io.StringIO()), USAGE)
+
+    def test_expand_paths(self):
+        self.assertEqual(expand_paths([self.directory]), [self.broken, self.path])
+        self.assertEqual(expand_paths([os.path.join(self.directory, 'm*.mid')]),
+            [self.path])
+
+    def test_workers(self):
+        paths = [self.path, self.broken, self.path]
+        output = io.StringIO()
+        exit_codes = dump_files(paths, output, 'events', 'json', workers=2)
+        serial = io.StringIO()
+        dump_files(paths, serial, 'events', 'json')
+
+        self.assertEqual(exit_codes, [0, 1, 0])
+        self.assertEqual(output.getvalue(), serial.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import random
+import midiio.editing
+from midiio.events import *
+from midiio.containers import *
+from midiio.editing import *
+import mary_test
+
+class TestEditableTrack(unittest.TestCase):
+    def test_round_trip(self):
+        track = mary_test.MARY_MIDI[1]
+        editable = EditableTrack.from_track(track)
+
+        self.assertEqual(len(editable), len(track))
+        self.assertEqual(list(editable.to_track()), list(track))
+        self.assertTrue(all(first is second for first, second in
+            zip(editable.to_track(), track)))
+
+    def test_edits(self):
+        editable = EditableTrack([(0, NoteOnEvent(0, 60, 100)),
+            (96, NoteOffEvent(0, 60, 0))])
+        editable.add(NoteOnEvent(48, 64, 100))
+        editable.add(NoteOffEvent(0, 64, 0), 96)
+
+        self.assertEqual(list(editable.to_track()), [NoteOnEvent(0, 60, 100),
+            NoteOnEvent(48, 64, 100), NoteOffEvent(48, 60, 0), NoteOffEvent(0, 64, 0)])
+
+        editable.remove(NoteOffEvent(96, 60, 0))
+        self.assertEqual([ tick for tick, event in editable ], [0, 48, 96])
+        with self.assertRaises(ValueError):
+            editable.remove(NoteOffEvent(95, 60, 0))
+
+        editable.move(40, 100, 100)
+        self.assertEqual(list(editable), [(0, NoteOnEvent(0, 60, 100)),
+            (148, NoteOnEvent(48, 64, 100)), (196, NoteOffEvent(0, 64, 0))])
+        self.assertEqual(editable[-1], (196, NoteOffEvent(0, 64, 0)))
+        self.assertEqual(editable.end_tick, 196)
+        with self.assertRaises(ValueError):
+            editable.move(100, 200, -150)
+        self.assertEqual(len(editable), 3)
+
+        self.assertEqual(list(editable.range(100, 196)),
+            [(148, NoteOnEvent(48, 64, 100))])
+        self.assertEqual(editable.remove_range(100), [(148, NoteOnEvent(48, 64, 100)),
+            (196, NoteOffEvent(0, 64, 0))])
+        self.assertEqual(len(editable), 1)
+
+    def test_end_of_track(self):
+        editable = EditableTrack([(0, NoteOnEvent(0, 60, 100)),
+            (96, EndOfTrackMetaEvent(0))])
+        editable.add(NoteOffEvent(0, 60, 0), 192)
+        editable.add(NoteOnEvent(0, 62, 100), 192)
+
+        self.assertEqual(list(editable.to_track()), [NoteOnEvent(0, 60, 100),
+            NoteOffEvent(192, 60, 0), NoteOnEvent(0, 62, 100), EndOfTrackMetaEvent(0)])
+
+        editable.move(0, 1, 300)
+        self.assertEqual(editable[-1], (300, EndOfTrackMetaEvent(0)))
+        editable.move(300, None, -200)
+        self.assertEqual(list(editable), [(100, NoteOnEvent(0, 60, 100)),
+            (192, NoteOffEvent(0, 60, 0)), (192, NoteOnEvent(0, 62, 100)),
+            (192, EndOfTrackMetaEvent(0))])
+
+    def test_failed_move(self):
+        first = NoteOnEvent(0, 60, 100)
+        second = NoteOnEvent(0, 62, 100)
+        editable = EditableTrack([(10, first), (10, second),
+            (20, NoteOffEvent(0, 60, 0))])
+
+        with self.assertRaises(ValueError):
+            editable.move(10, 11, -20)
+        self.assertIs(editable[0][1], first)
+        self.assertIs(editable[1][1], second)
+
+        editable.add(NoteOffEvent(0, 62, 0), 10)
+        with self.assertRaises(ValueError):
+            editable.move(10, 11, -20)
+        self.assertEqual([ event for tick, event in editable ], [first, second,
+            NoteOffEvent(0, 62, 0), NoteOffEvent(0, 60, 0)])
+
+    def test_random_edits(self):
+        # small blocks so that splitting and merging happen
+        load = midiio.editing.LOAD
+        midiio.editing.LOAD = 4
+        try:
+            rng = random.Random(7)
+            editable = EditableTrack()
+            model = []
+            serials = iter(range(100000))
+            for serial in range(2000):
+                operation = rng.random()
+                if operation < 0.6 or not model:
+                    tick = rng.randrange(500)
+                    event = NoteOnEvent(0, serial % 128, 100)
+                    editable.add(event, tick)
+                    model.append((tick, next(serials), event))
+                elif operation < 0.8:
+                    tick, _, event = model.pop(rng.randrange(len(model)))
+                    editable.remove(event, tick)
+                elif operation < 0.95:
+                    start = rng.randrange(500)
+                    end = start + rng.randrange(20)
+                    removed = editable.remove_range(start, end)
+                    model.sort(key=lambda item: item[:2])
+                    self.assertEqual(removed, [ (tick, event)
+                        for tick, _, event in model if start <= tick < end ])
+                    model = [ item for item in model if not start <= item[0] < end ]
+                else:
+                    start = rng.randrange(500)
+                    end = start + rng.randrange(20)
+                    editable.move(start, end, 3)
+                    model.sort(key=lambda item: item[:2])
+                    model = [ (tick + 3, next(serials), event)
+                        if start <= tick < end else (tick, order, event)
+                            for tick, order, event in model ]
+
+                model.sort(key=lambda item: item[:2])
+                self.assertEqual(len(editable), len(model))
+
+            self.assertEqual(list(editable), [ (tick, event)
+                for tick, _, event in model ])
+            self.assertEqual(editable[len(model) // 2], model[len(model) // 2][::2])
+            self.assertTrue(max(len(block) for block in editable._blocks) <= 8)
+        finally:
+            midiio.editing.LOAD = load
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,12 +1,15 @@
 from pprint import pprint
 import unittest
+import io
+import threading
 from midiio.events import *
 from midiio.eventio import *
+from midiio.fileio import MidiIO
 
 class TestEventsIO(unittest.TestCase):
     def test_registry(self):
         self.assertEqual(len(EVENTIO_REGISTRY.get_midi_events()), 7)
-        self.assertEqual(len(EVENTIO_REGISTRY.get_sysex_events()), 1)
+        self.assertEqual(len(EVENTIO_REGISTRY.get_sysex_events()), 2)
         self.assertEqual(len(EVENTIO_REGISTRY.get_meta_events()), 18)
 
         self.assertEqual(EVENTIO_REGISTRY.get_midi_event(0x90), BinaryNoteOnEvent)
@@ -25,7 +28,7 @@ class TestEventsIO(unittest.TestCase):
 
         # SysEx Event
         self.assertEqual(BinarySysexEvent.statusmsg, 0xF0)
-        # self.assertEqual(BinarySysexEvent.statusmsg, 0xF7)
+        self.assertEqual(BinarySysexEscapeEvent.statusmsg, 0xF7)
 
         # Meta Events
         self.assertEqual(BinarySequenceNumberMetaEvent.statusmsg, 0xFF)
@@ -84,6 +87,104 @@ class TestEventsIO(unittest.TestCase):
 
         self.assertIs(binaryNoteOnEvent, copy)
 
+    def test_equality(self):
+        self.assertEqual(NoteOnEvent(1, 60, 100, 9), BinaryNoteOnEvent(1, 60, 100, 9))
+        self.assertNotEqual(NoteOnEvent(1, 60, 100), NoteOnEvent(2, 60, 100))
+        self.assertNotEqual(NoteOnEvent(1, 60, 0), NoteOffEvent(1, 60, 0))
+        self.assertEqual(SysexEvent(0, [1, 2]), BinarySysexEvent(0, b'\x01\x02'))
+        self.assertNotEqual(NoteOnEvent(0, 60, 100), 0)
+
+        events = {NoteOnEvent(0, 60, 100), BinaryNoteOnEvent(0, 60, 100),
+            TrackNameMetaEvent(0, 'name'), BinaryTrackNameMetaEvent(0, 'name')}
+        self.assertEqual(len(events), 2)
+        self.assertIs(BinaryNoteOnEvent.event_type(), NoteOnEvent)
+
+        custom_type, binary_custom_type = self._custom_text_event(0x60)
+        self.assertEqual(custom_type(0, 'x'), binary_custom_type(0, 'x'))
+        self.assertNotEqual(custom_type(0, 'x'), TextMetaEvent(0, 'x'))
+
+    def test_not_ordered(self):
+        with self.assertRaises(TypeError):
+            sorted([NoteOffEvent(10, 60, 0), NoteOnEvent(5, 60, 100)])
+
+    def _custom_text_event(self, meta_command):
+        class CustomMetaEvent(MetaEventWithText):
+            name = 'Custom'
+
+        class BinaryCustomMetaEvent(CustomMetaEvent, BinaryMetaEventWithTextMixin):
+            pass
+        BinaryCustomMetaEvent.meta_command = meta_command
+
+        return CustomMetaEvent, BinaryCustomMetaEvent
+
+    def test_overlay(self):
+        base_type, binary_type = self._custom_text_event(0x01)
+        registry = EVENTIO_REGISTRY.overlay()
+        registry.register(binary_type, base_type)
+
+        self.assertIs(registry.get_meta_event(0x01), binary_type)
+        self.assertIs(registry.get_meta_event(0x03), BinaryTrackNameMetaEvent)
+        self.assertIs(EVENTIO_REGISTRY.get_meta_event(0x01), BinaryTextMetaEvent)
+        self.assertEqual(len(registry.get_meta_events()), 18)
+
+    def test_overlay_sees_parent_changes(self):
+        base = EventRegistry()
+        registry = base.overlay()
+        frozen = registry.freeze()
+        base.register(BinaryNoteOnEvent, NoteOnEvent)
+
+        self.assertFalse(frozen.is_midi_event(0x91))
+        self.assertTrue(registry.is_midi_event(0x91))
+        self.assertIs(registry.get_binary_type(NoteOnEvent), BinaryNoteOnEvent)
+
+    def test_frozen(self):
+        frozen = EVENTIO_REGISTRY.freeze()
+
+        self.assertIs(frozen, EVENTIO_REGISTRY.freeze())
+        self.assertIs(frozen.freeze(), frozen)
+        self.assertRaises(TypeError, frozen._register, BinaryNoteOnEvent, NoteOnEvent)
+        self.assertIs(frozen.get_midi_event(0x9F), BinaryNoteOnEvent)
+        self.assertRaises(KeyError, frozen.get_midi_event, 0xF8)
+
+    def test_copy_from_registry(self):
+        registry = EVENTIO_REGISTRY.overlay()
+
+        @copy_from(TextMetaEvent, registry=registry)
+        class BinaryUpperTextMetaEvent(TextMetaEvent, BinaryMetaEventWithTextMixin):
+            meta_command = 0x01
+
+            @property
+            def data(self):
+                return self.text.upper().encode('ascii')
+
+        self.assertIs(registry.get_binary_type(TextMetaEvent), BinaryUpperTextMetaEvent)
+        self.assertIs(EVENTIO_REGISTRY.get_binary_type(TextMetaEvent),
+            BinaryTextMetaEvent)
+
+    def test_concurrent_parsing(self):
+        base_type, binary_type = self._custom_text_event(0x01)
+        registry = EVENTIO_REGISTRY.overlay()
+        registry.register(binary_type, base_type)
+        data = bytes([0x4D, 0x54, 0x68, 0x64, 0, 0, 0, 6, 0, 0, 0, 1, 0, 96,
+            0x4D, 0x54, 0x72, 0x6B, 0, 0, 0, 10,
+            0x00, 0xFF, 0x01, 0x02, 0x68, 0x69, 0x00, 0xFF, 0x2F, 0x00])
+
+        results = {}
+        def parse(key, midi_io):
+            results[key] = [ type(midi_io.parse(io.BytesIO(data))[0][0])
+                for _ in range(50) ]
+
+        threads = [ threading.Thread(target=parse, args=(key, MidiIO(reg)))
+            for key, reg in enumerate([registry, EVENTIO_REGISTRY] * 4) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for key, types in results.items():
+            expected = binary_type if key % 2 == 0 else BinaryTextMetaEvent
+            self.assertEqual(set(types), {expected})
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,18 @@
 import unittest
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+import tempfile
+import tracemalloc
 import midiio.fileio
+import midiio.sysex
+import midiio.timing
 import midiio.util
+import midiio.validate
+from midiio.events import *
+from midiio.containers import *
+from midiio.eventio import EVENTIO_REGISTRY, BinarySysexEvent, BinarySysexEscapeEvent
 import mary_test
 
 class TestFileIO(unittest.TestCase):
@@ -24,6 +35,250 @@ class TestFileIO(unittest.TestCase):
                 self.assertEqual(event1.tick, event2.tick)
                 self.assertEqual(event1.data, event2.data)
 
+    def test_event_filter(self):
+        # note events on two channels interleaved with control changes
+        track_data = bytes([0x00, 0x91, 60, 100,
+                            0x10, 0xB1, 1, 10,
+                            0x10, 0x02, 20,
+                            0x10, 0x91, 62, 100,
+                            0x10, 62, 0,
+                            0x10, 0x90, 64, 90,
+                            0x00, 0xFF, 0x2F, 0x00])
+        event_io = midiio.fileio.EventIO(EVENTIO_REGISTRY, midiio.fileio.EventFilter(
+            event_types=[NoteOnEvent, NoteOffEvent], channels=[1]))
+
+        events = event_io.parse_events(track_data)
+
+        self.assertEqual([ type(event) for event in events ],
+            [ midiio.eventio.BinaryNoteOnEvent, midiio.eventio.BinaryNoteOnEvent,
+                midiio.eventio.BinaryNoteOffEvent,
+                    midiio.eventio.BinaryEndOfTrackMetaEvent ])
+        self.assertEqual([ event.tick for event in events ], [0, 0x30, 0x10, 0x10])
+
+    def test_event_filter_controls_and_ticks(self):
+        track_data = bytes([0x00, 0xB0, 1, 10,
+                            0x10, 0xB0, 7, 100,
+                            0x10, 0xB0, 1, 11,
+                            0x10, 0x90, 62, 90,
+                            0x10, 0xE0, 0, 64,
+                            0x00, 0xFF, 0x2F, 0x00])
+        event_io = midiio.fileio.EventIO(EVENTIO_REGISTRY, midiio.fileio.EventFilter(
+            exclude_types=[PitchWheelEvent], exclude_controls=[1], start_tick=0x10,
+            end_tick=0x40))
+
+        events = event_io.parse_events(track_data)
+
+        self.assertEqual([ (event.tick, event.data) for event in events ],
+            [ (0x10, (7, 100)), (0x20, (62, 90)), (0x10, ()) ])
+        self.assertTrue(isinstance(events[-1], EndOfTrackMetaEvent))
+
+    def test_read_with_filter(self):
+        midiio.fileio.write_midifile(self.test_file, mary_test.MARY_MIDI)
+        event_filter = midiio.fileio.EventFilter(meta_commands=[])
+        pattern = midiio.fileio.read_midifile(self.test_file, event_filter)
+
+        # only the end of track events are kept
+        self.assertEqual(list(pattern[0]), [EndOfTrackMetaEvent(1)])
+        self.assertEqual(len(pattern[1]), len(mary_test.MARY_MIDI[1]))
+        self.assertEqual(sum(event.tick for event in pattern[1]),
+            sum(event.tick for event in mary_test.MARY_MIDI[1]))
+
+    def test_write_filtered(self):
+        midiio.fileio.write_midifile(self.test_file, mary_test.MARY_MIDI)
+        end_tick = sum(event.tick for event in mary_test.MARY_MIDI[1][:10])
+        for event_filter in (midiio.fileio.EventFilter(meta_commands=[0x51]),
+                midiio.fileio.EventFilter(end_tick=end_tick)):
+            pattern = midiio.fileio.read_midifile(self.test_file, event_filter)
+            buf = io.BytesIO()
+            midiio.fileio.write_midifile(buf, pattern)
+
+            self.assertTrue(midiio.validate.Validator().validate(buf.getvalue()).valid)
+            self.assertEqual(midiio.fileio.read_midifile(io.BytesIO(buf.getvalue())),
+                pattern)
+            self.assertTrue(all(isinstance(track[-1], EndOfTrackMetaEvent)
+                for track in pattern))
+
+        self.assertEqual(sum(event.tick for event in pattern[1]), end_tick)
+        self.assertEqual(len(pattern[1]), 10)
+
+    def _assert_same(self, pattern1, pattern2):
+        self.assertEqual(len(pattern1), len(pattern2))
+        for track1, track2 in zip(pattern1, pattern2):
+            self.assertEqual([ (e.name, e.tick, tuple(e.data)) for e in track1 ],
+                [ (e.name, e.tick, tuple(e.data)) for e in track2 ])
+
+    def test_concurrent_decoding(self):
+        midiio.fileio.write_midifile(self.test_file, mary_test.MARY_MIDI)
+        pattern = midiio.fileio.read_midifile(self.test_file)
+
+        self._assert_same(midiio.fileio.read_midifile(self.test_file, workers=2),
+            pattern)
+        with ThreadPoolExecutor(2) as executor, open(self.test_file, 'rb') as inp:
+            self._assert_same(midiio.fileio.MidiIO(executor=executor).parse(inp),
+                pattern)
+
+    def test_invalid_header(self):
+        self.assertRaises(ValueError, midiio.fileio.read_midifile,
+            io.BytesIO(b'RIFF' + bytes(10)))
+
+    def test_smpte_division(self):
+        division = midiio.timing.smpte_resolution(29, 80)
+        pattern = Pattern([Track([NoteOnEvent(2400, 60, 100),
+            EndOfTrackMetaEvent(0)])], resolution=division)
+        buf = io.BytesIO()
+        midiio.fileio.write_midifile(buf, pattern)
+
+        self.assertEqual(buf.getvalue()[12:14], b'\xe3\x50')
+        result = midiio.fileio.read_midifile(io.BytesIO(buf.getvalue()))
+        self.assertEqual(result.resolution, division)
+        self.assertEqual(midiio.timing.smpte_division(result.resolution),
+            (Fraction(30000, 1001), 80))
+        self.assertAlmostEqual(midiio.timing.TempoMap.from_pattern(result)
+            .tick_to_seconds(2400), 1.001)
+
+    def test_sysex(self):
+        payload = bytes(range(0x80)) * 1000
+        pattern = Pattern([Track([SysexEvent(0, b'\x7e\x7f\x09\x01'),
+            SysexEvent(10, payload),
+            SysexEscapeEvent(0, b'\xf8'),
+            EndOfTrackMetaEvent(0)])])
+        buf = io.BytesIO()
+        midiio.fileio.write_midifile(buf, pattern)
+        data = buf.getvalue()
+
+        self.assertTrue(b'\x00\xf0\x05\x7e\x7f\x09\x01\xf7\x0a\xf0\x87\xe8\x01' in data)
+        self.assertTrue(b'\x00\xf7\x01\xf8\x00\xff\x2f\x00' in data)
+
+        events = midiio.fileio.read_midifile(io.BytesIO(data))[0]
+        self.assertEqual([ type(event) for event in events[:3] ],
+            [BinarySysexEvent, BinarySysexEvent, BinarySysexEscapeEvent])
+        self.assertEqual([ event.data for event in events[:3] ],
+            [b'\x7e\x7f\x09\x01', payload, b'\xf8'])
+        self.assertEqual(events[1].tick, 10)
+
+        lazy = midiio.fileio.read_midifile(io.BytesIO(data),
+            sysex_sink=midiio.sysex.LazySysexSink(1000))[0]
+        self.assertTrue(isinstance(lazy[1].data, memoryview))
+        self.assertEqual(lazy[1].data, payload)
+        self.assertEqual(lazy[0].data, b'\x7e\x7f\x09\x01')
+
+        lengths = []
+        midiio.fileio.read_midifile(io.BytesIO(data),
+            sysex_sink=midiio.sysex.CallbackSysexSink(lambda view:
+                lengths.append(len(view)), 1000))
+        self.assertEqual(lengths, [len(payload)])
+
+        # a sysex event dropped by the filter is not passed to the sink
+        lengths = []
+        notes = midiio.fileio.read_midifile(io.BytesIO(data),
+            midiio.fileio.EventFilter(event_types=[NoteOnEvent]),
+            sysex_sink=midiio.sysex.CallbackSysexSink(lambda view:
+                lengths.append(len(view)), 1))
+        self.assertEqual(lengths, [])
+        self.assertEqual(list(notes[0]), [EndOfTrackMetaEvent(10)])
+
+        with tempfile.TemporaryFile() as sink_file:
+            stored = midiio.fileio.read_midifile(io.BytesIO(data),
+                sysex_sink=midiio.sysex.FileSysexSink(sink_file, 1000))
+            self.assertEqual(len(stored[0][1].data), len(payload))
+            self.assertEqual(bytes(stored[0][1].data), payload)
+            rewritten = io.BytesIO()
+            midiio.fileio.write_midifile(rewritten, stored)
+            self.assertEqual(rewritten.getvalue(), data)
+
+    def test_divided_sysex(self):
+        # a sysex message sent in three packets, only the last one ends with 0xF7
+        track_data = b'\x00\xf0\x03\x43\x12\x00\x60\xf7\x02\x43\x12' + \
+            b'\x60\xf7\x03\x43\x12\xf7\x00\xff\x2f\x00'
+        data = b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\x00\x60' + b'MTrk' + \
+            midiio.util.long_to_bytes(len(track_data)) + track_data
+
+        events = midiio.fileio.read_midifile(io.BytesIO(data))[0]
+        self.assertFalse(events[0].terminated)
+        self.assertEqual(events[0].data, b'\x43\x12\x00')
+        self.assertEqual(events[0], SysexEvent(0, b'\x43\x12\x00', terminated=False))
+        self.assertNotEqual(events[0], SysexEvent(0, b'\x43\x12\x00'))
+        self.assertEqual(events[2].data, b'\x43\x12\xf7')
+
+        buf = io.BytesIO()
+        midiio.fileio.write_midifile(buf, Pattern([Track(list(events))],
+            resolution=0x60, format=0))
+        self.assertEqual(buf.getvalue(), data)
+
+    def test_event_pool(self):
+        drums = []
+        for bar in range(200):
+            for step in range(16):
+                drums.append(NoteOnEvent(0 if step else 120, 42, 100, 9))
+                drums.append(NoteOnEvent(60, 42, 0, 9))
+        pattern = Pattern([Track([TrackNameMetaEvent(0, 'Drums')] + drums),
+            Track([TrackNameMetaEvent(0, 'Drums'), ControlChangeEvent(0, 7, 100)])])
+        buf = io.BytesIO()
+        midiio.fileio.write_midifile(buf, pattern)
+        data = buf.getvalue()
+
+        pool = midiio.fileio.EventPool()
+        pooled = midiio.fileio.read_midifile(io.BytesIO(data), event_pool=pool)
+        plain = midiio.fileio.read_midifile(io.BytesIO(data))
+
+        self.assertEqual([ list(track) for track in pooled ],
+            [ list(track) for track in plain ])
+        self.assertIs(pooled[0][2], pooled[0][4])
+        self.assertIs(pooled[0][0], pooled[1][0])
+        self.assertEqual(len(pool), 5)
+        self.assertEqual(pool.hits, len(drums) + 3 - len(pool))
+
+        tracemalloc.start()
+        try:
+            midiio.fileio.read_midifile(io.BytesIO(data))
+            plain_size = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+            midiio.fileio.read_midifile(io.BytesIO(data),
+                event_pool=midiio.fileio.EventPool())
+            pooled_size = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(pooled_size, plain_size / 2)
+
+    def test_unchanged_tracks_are_copied(self):
+        # note events in running status, which the writer does not use
+        track_data = b'\x00\x90\x3c\x40\x60\x3c\x00\x00\xff\x2f\x00'
+        data = b'MThd\x00\x00\x00\x06\x00\x01\x00\x02\x00\x60' + \
+            (b'MTrk' + midiio.util.long_to_bytes(len(track_data)) + track_data) * 2
+
+        self.assertIsNone(midiio.fileio.read_midifile(io.BytesIO(data))[0].chunk)
+        pattern = midiio.fileio.read_midifile(io.BytesIO(data), keep_chunks=True)
+        self.assertEqual(pattern[0].chunk, track_data)
+
+        buf = io.BytesIO()
+        midiio.fileio.write_midifile(buf, pattern)
+        self.assertEqual(buf.getvalue(), data)
+
+        # an equal track read before is found by its content
+        buf = io.BytesIO()
+        midiio.fileio.write_midifile(buf, Pattern([Track(list(pattern[0])),
+            pattern[1]], pattern.resolution, pattern.format))
+        self.assertEqual(buf.getvalue(), data)
+
+        edited = Pattern([pattern[0], Track([pattern[1][0].replace(velocity=1)] +
+            list(pattern[1][1:]))], pattern.resolution, pattern.format)
+        self.assertIsNone(edited[1].chunk)
+        buf = io.BytesIO()
+        midiio.fileio.write_midifile(buf, edited)
+        written = buf.getvalue()
+        self.assertTrue(written.startswith(data[:-len(track_data) - 8]))
+        self.assertNotEqual(written, data)
+        self.assertEqual(midiio.fileio.read_midifile(io.BytesIO(written)), edited)
+
+        filtered = midiio.fileio.read_midifile(io.BytesIO(data),
+            midiio.fileio.EventFilter(event_types=[MetaEvent]), keep_chunks=True)
+        self.assertIsNone(filtered[0].chunk)
+        sunk = midiio.fileio.read_midifile(io.BytesIO(data),
+            sysex_sink=midiio.sysex.LazySysexSink(), keep_chunks=True)
+        self.assertIsNone(sunk[0].chunk)
+        self.assertEqual(midiio.fileio.read_midifile(io.BytesIO(data),
+            workers=2, keep_chunks=True)[1].chunk, track_data)
+
     def tearDown(self):
         try:
             os.remove(self.test_file)
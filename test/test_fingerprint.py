@@ -0,0 +1,83 @@
+import unittest
+import os
+import shutil
+import tempfile
+from midiio.events import *
+from midiio.containers import *
+from midiio.fingerprint import *
+
+ODE = [64, 64, 65, 67, 67, 65, 64, 62, 60, 60, 62, 64, 64, 62, 62]
+SCALE = [60, 62, 64, 65, 67, 69, 71, 72, 71, 69, 67, 65, 64, 62, 60]
+
+def melody_track(pitches, channel=0, chord=None):
+    events = []
+    for pitch in pitches:
+        events.append(NoteOnEvent(0, pitch, 100, channel))
+        if chord is not None:
+            events.append(NoteOnEvent(0, pitch - chord, 100, channel))
+            events.append(NoteOffEvent(48, pitch - chord, 0, channel))
+            events.append(NoteOffEvent(0, pitch, 0, channel))
+        else:
+            events.append(NoteOffEvent(48, pitch, 0, channel))
+    events.append(EndOfTrackMetaEvent(0))
+
+    return Track(events)
+
+class TestFingerprint(unittest.TestCase):
+    def test_melody(self):
+        pattern = Pattern([melody_track(ODE[:4], chord=12),
+            melody_track([30] * 4, channel=9)])
+
+        self.assertEqual(melody(pattern), ODE[:4])
+        self.assertEqual(melody(pattern, channels=[9]), [30] * 4)
+
+    def test_transposition_invariant(self):
+        self.assertEqual(interval_ngrams(ODE), interval_ngrams([ pitch + 5
+            for pitch in ODE ]))
+        self.assertEqual(len(interval_ngrams(ODE, 4)), len(ODE) - 4)
+        self.assertEqual(interval_ngrams(ODE[:4], 4), [])
+
+    def test_query(self):
+        index = FingerprintIndex()
+        index.add("ode", melody_track(ODE + SCALE))
+        index.add("scale", melody_track(SCALE))
+        index.add("ode transposed", melody_track([ pitch - 3 for pitch in ODE ]))
+
+        matches = index.query(ODE, min_containment=0.5)
+
+        self.assertEqual([ match.name for match in matches ],
+            ["ode transposed", "ode"])
+        self.assertEqual(matches[0].containment, 1.0)
+        self.assertEqual(matches[0].similarity, 1.0)
+        self.assertEqual(matches[1].containment, 1.0)
+        self.assertTrue(matches[1].similarity < 1.0)
+        self.assertEqual(index.query(ODE)[-1].name, "scale")
+        self.assertEqual(index.query(SCALE[:8], limit=1)[0].name, "scale")
+        self.assertEqual(index.query([60, 61, 60, 61, 60, 61]), [])
+
+    def test_update_and_persist(self):
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "index.db")
+            with FingerprintIndex(path, n=3) as index:
+                index.add("a", ODE)
+                index.add("b", ODE)
+                index.add("b", SCALE)
+                self.assertTrue(index.remove("a"))
+                self.assertFalse(index.remove("a"))
+
+            with FingerprintIndex(path) as index:
+                self.assertEqual(index.n, 3)
+                self.assertEqual(index.names(), ["b"])
+                self.assertEqual(index.query(ODE, min_containment=0.5), [])
+                self.assertEqual(index.query(SCALE)[0].name, "b")
+                index.add("a", ODE)
+
+            with FingerprintIndex(path) as index:
+                self.assertEqual(len(index), 2)
+                self.assertTrue("a" in index)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
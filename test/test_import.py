@@ -0,0 +1,58 @@
+import unittest
+import os
+import subprocess
+import sys
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts')
+PACKAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def loaded_modules(statement):
+    output = subprocess.check_output([sys.executable, '-c', statement +
+        '; import sys; print(" ".join(sorted(sys.modules)))'],
+            cwd=PACKAGE, universal_newlines=True)
+    return set(output.split())
+
+class TestImport(unittest.TestCase):
+    def test_package_is_lazy(self):
+        modules = loaded_modules('import midiio')
+
+        self.assertEqual(set(module for module in modules
+            if module.startswith('midiio')), {'midiio'})
+
+    def test_reader_dependencies(self):
+        # a regression of the import time of the file reader shows up as one of
+        # these modules being imported again
+        for statement in ('import midiio.fileio', 'import midiio.metadata',
+                'import midiio; midiio.read_midifile'):
+            modules = loaded_modules(statement)
+            self.assertEqual(modules & {'numpy', 'concurrent.futures', 'pprint',
+                'inspect', 'midiio.transform'}, set(), statement)
+
+    def test_lazy_attributes(self):
+        import midiio
+        import midiio.containers
+        import midiio.transform
+
+        self.assertIs(midiio.Pattern, midiio.containers.Pattern)
+        self.assertEqual(midiio.Cs_4, 49)
+        self.assertEqual(midiio.Db_4, 49)
+        self.assertIs(midiio.transform, sys.modules['midiio.transform'])
+        self.assertTrue('NoteOnEvent' in midiio.__all__)
+        self.assertTrue('scan_midifile' in dir(midiio))
+        self.assertRaises(AttributeError, getattr, midiio, 'no_such_name')
+
+    def test_generated_note_tables(self):
+        sys.path.insert(0, SCRIPTS)
+        try:
+            import gen_note_tables
+        finally:
+            sys.path.remove(SCRIPTS)
+        with open(os.path.join(PACKAGE, 'midiio', '_note_tables.py')) as inp:
+            self.assertEqual(inp.read(), gen_note_tables.generate())
+
+        import midiio.constants
+        self.assertEqual(midiio.constants.NOTE_VALUE_MAP_SHARP[60], 'C_5')
+        self.assertEqual(midiio.constants.NOTE_NAME_MAP_FLAT['Bb_9'], 118)
+
+if __name__ == '__main__':
+    unittest.main()
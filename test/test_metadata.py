@@ -0,0 +1,66 @@
+import unittest
+import io
+import midiio.fileio
+import midiio.metadata
+import midiio.util
+from midiio.events import *
+from midiio.containers import *
+import mary_test
+from midi_buffers import midi_buffer
+
+class TestMetadata(unittest.TestCase):
+    def test_mary(self):
+        info = midiio.metadata.scan_midifile(midi_buffer(mary_test.MARY_MIDI))
+        pattern = midiio.fileio.read_midifile(midi_buffer(mary_test.MARY_MIDI))
+
+        self.assertEqual(info.format, pattern.format)
+        self.assertEqual(info.resolution, pattern.resolution)
+        self.assertEqual(len(info.tracks), len(pattern))
+        self.assertEqual(info.track_names, [None, None])
+        self.assertEqual(info.tracks[1].event_count, len(pattern[1]))
+        self.assertEqual(info.tracks[1].length, sum(event.tick for event in pattern[1]))
+        self.assertEqual(info.note_count, len([ event for event in pattern[1]
+            if isinstance(event, NoteOnEvent) and event.velocity > 0 ]))
+        self.assertEqual(len(info.time_signatures), 1)
+        self.assertEqual(info.time_signatures[0].nominator, 4)
+        self.assertEqual(len(info.key_signatures), 1)
+
+    def test_tempo_and_names(self):
+        pattern = Pattern([
+            Track([TrackNameMetaEvent(0, "conductor"),
+                SetTempoMetaEvent(0, 500000),
+                SetTempoMetaEvent(480, 250000),
+                EndOfTrackMetaEvent(0)]),
+            Track([TrackNameMetaEvent(0, "piano"),
+                NoteOnEvent(0, 60, 100),
+                NoteOnEvent(960, 60, 0),
+                EndOfTrackMetaEvent(0)])], resolution=480)
+
+        info = midiio.metadata.scan_midifile(midi_buffer(pattern))
+
+        self.assertEqual(info.track_names, ["conductor", "piano"])
+        self.assertEqual([ (e.tick, e.micros_per_quarter) for e in info.tempos ],
+            [(0, 500000), (480, 250000)])
+        self.assertEqual(info.duration, 960)
+        self.assertEqual(info.note_count, 1)
+        self.assertAlmostEqual(info.seconds, 0.75)
+
+    def test_truncated_track(self):
+        # the last note on event misses its velocity byte
+        track_data = b'\x00\x90\x3c\x40\x60\x3c\x00\x00\x90\x3e'
+        data = b'MThd\x00\x00\x00\x06\x00\x00\x00\x01\x00\x60' + b'MTrk' + \
+            midiio.util.long_to_bytes(len(track_data)) + track_data
+        event_io = midiio.fileio.EventIO(midiio.eventio.EVENTIO_REGISTRY)
+
+        self.assertEqual(len(list(event_io.scan_events(track_data))),
+            len(event_io.parse_events(track_data)))
+        info = midiio.metadata.scan_midifile(io.BytesIO(data))
+        self.assertEqual(info.tracks[0].event_count, 2)
+        self.assertEqual(info.note_count, 1)
+
+        with self.assertRaisesRegex(ValueError, "xff"):
+            midiio.metadata.scan_midifile(io.BytesIO(b'\xff\xfe\x00\x00' +
+                data[4:]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from midiio.events import *
+from midiio.containers import *
+from midiio.pianoroll import *
+from midiio.timing import TempoMap
+import mary_test
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestPianoRoll(unittest.TestCase):
+    def _pattern(self):
+        return Pattern([
+            Track([SetTempoMetaEvent(0, 500000), SetTempoMetaEvent(960, 250000)]),
+            Track([NoteOnEvent(0, 60, 100),
+                NoteOnEvent(0, 64, 90, channel=1),
+                NoteOnEvent(480, 60, 0),
+                NoteOffEvent(480, 64, 0, channel=1),
+                NoteOnEvent(0, 67, 80),
+                NoteOnEvent(480, 67, 0)])], resolution=480)
+
+    def test_dense(self):
+        roll = piano_roll(self._pattern(), 240)
+
+        self.assertEqual(roll.shape, (16, 6, 128))
+        self.assertEqual(list(roll[0, :, 60]), [100, 100, 0, 0, 0, 0])
+        self.assertEqual(list(roll[1, :, 64]), [90, 90, 90, 90, 0, 0])
+        self.assertEqual(list(roll[0, :, 67]), [0, 0, 0, 0, 80, 80])
+
+        merged = piano_roll(self._pattern(), 240, mode=BINARY, merge_channels=True)
+        self.assertEqual(merged.shape, (6, 128))
+        self.assertEqual(int(merged.sum()), 8)
+
+    def test_seconds(self):
+        # the second tempo doubles the speed after one second
+        roll = piano_roll(self._pattern(), 0.25, unit=SECONDS)
+
+        self.assertEqual(roll.shape, (16, 5, 128))
+        self.assertEqual(list(roll[1, :, 64]), [90, 90, 90, 90, 0])
+        self.assertEqual(list(roll[0, :, 67]), [0, 0, 0, 0, 80])
+        self.assertRaises(ValueError, piano_roll, self._pattern()[1], 0.25, SECONDS)
+        tempo_map = TempoMap([(0, 500000)], 480)
+        self.assertEqual(piano_roll(self._pattern()[1], 0.25, SECONDS,
+            tempo_map=tempo_map).shape, (16, 6, 128))
+
+    def test_sparse_matches_dense(self):
+        pattern = Pattern([ Track(track) for track in mary_test.MARY_MIDI ])
+        for merge in (False, True):
+            dense = piano_roll(pattern, 50, merge_channels=merge)
+            coordinates, rows = piano_roll(pattern, 50, merge_channels=merge,
+                sparse=True)
+            rebuilt = numpy.zeros_like(dense)
+            rebuilt[coordinates[:-1]] = coordinates[-1]
+
+            self.assertTrue((rebuilt == dense).all())
+
+    def test_windows(self):
+        pattern = Pattern([ Track(track) for track in mary_test.MARY_MIDI ])
+        roll = PianoRoll(20)
+        dense = roll.dense(pattern)
+
+        windows = list(roll.windows(pattern, 64))
+        joined = numpy.concatenate([ window for _, window in windows ], axis=1)
+
+        self.assertEqual([ first for first, _ in windows ][:2], [0, 64])
+        self.assertTrue((joined[:, :dense.shape[1]] == dense).all())
+        self.assertFalse(joined[:, dense.shape[1]:].any())
+
+    def test_to_track(self):
+        pattern = self._pattern()
+        roll = piano_roll(pattern, 240)
+
+        track = piano_roll_to_track(roll, 240)
+        self.assertTrue((piano_roll(Pattern([track]), 240) == roll).all())
+        self.assertIsInstance(track[-1], EndOfTrackMetaEvent)
+
+        binary = piano_roll(pattern, 240, mode=BINARY, merge_channels=True)
+        track = piano_roll_to_track(binary.astype(bool), 240, velocity=64)
+        self.assertEqual({ e.velocity for e in track if isinstance(e, NoteOnEvent) },
+            {64})
+
+    def test_binary_round_trip(self):
+        track = Track([NoteOnEvent(0, 60, 90), NoteOffEvent(10, 60, 0),
+            EndOfTrackMetaEvent(0)])
+        roll = piano_roll(track, 10, mode=BINARY)
+
+        self.assertEqual(roll.dtype, numpy.uint8)
+        self.assertEqual([ (e.tick, e.velocity) for e in
+            piano_roll_to_track(roll[0], 10)[:2] ], [(0, 100), (10, 0)])
+        self.assertEqual(piano_roll_to_track(roll[0], 10, velocity=90,
+            mode=BINARY)[0], NoteOnEvent(0, 60, 90))
+        self.assertEqual(piano_roll_to_track(roll[0], 10, mode=VELOCITY)[0],
+            NoteOnEvent(0, 60, 1))
+        with self.assertRaises(ValueError):
+            piano_roll_to_track(roll[0], 10, mode='onset')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import pickle
+from midiio.events import *
+from midiio.containers import *
+from midiio.eventio import EVENTIO_REGISTRY
+from midiio.serialization import *
+import mary_test
+
+class TestSerialization(unittest.TestCase):
+    def _assert_same(self, pattern1, pattern2):
+        self.assertEqual(pattern1.format, pattern2.format)
+        self.assertEqual(pattern1.resolution, pattern2.resolution)
+        self.assertEqual(len(pattern1), len(pattern2))
+        for track1, track2 in zip(pattern1, pattern2):
+            self.assertEqual(len(track1), len(track2))
+            for event1, event2 in zip(track1, track2):
+                self.assertEqual(event1.name, event2.name)
+                self.assertEqual(event1.tick, event2.tick)
+                self.assertEqual(tuple(self._binary(event1).data),
+                    tuple(self._binary(event2).data))
+
+    def _binary(self, event):
+        return EVENTIO_REGISTRY.get_binary_type(type(event)).copy_from(event)
+
+    def _pattern(self):
+        return Pattern([ Track(track) for track in mary_test.MARY_MIDI ] + [
+            Track([TrackNameMetaEvent(0, "lead"),
+                SetTempoMetaEvent(0, 400000),
+                PitchWheelEvent(10, -200, 3),
+                ChannelAfterTouchEvent(5, 64, 3),
+                EndOfTrackMetaEvent(0)])], resolution=480, format=1)
+
+    def test_round_trip(self):
+        pattern = self._pattern()
+
+        data = pattern.to_bytes()
+        decoded = Pattern.from_bytes(data)
+
+        self._assert_same(decoded, pattern)
+        self.assertEqual(decoded[2][0].text, "lead")
+        self.assertEqual(decoded[2][1].micros_per_quarter, 400000)
+        self.assertEqual(decoded[2][2].pitch, -200)
+        self.assertEqual(decoded[2][2].channel, 3)
+
+    def test_from_memoryview(self):
+        data = bytearray(b'xx') + self._pattern().to_bytes()
+
+        self._assert_same(pattern_from_bytes(memoryview(data)[2:]), self._pattern())
+
+    def test_track(self):
+        track = Track(mary_test.MARY_MIDI[1])
+
+        self.assertEqual(len(Track.from_bytes(track.to_bytes())), len(track))
+
+    def test_divided_sysex(self):
+        track = Track([SysexEvent(0, b'\x43\x12', terminated=False),
+            SysexEscapeEvent(5, b'\x00\xf7'), SysexEvent(0, b'\x43')])
+
+        self.assertEqual(list(Track.from_bytes(track.to_bytes())), list(track))
+
+    def test_pickle(self):
+        pattern = self._pattern()
+
+        self._assert_same(pickle.loads(pickle.dumps(pattern)), pattern)
+        self.assertEqual(len(pickle.loads(pickle.dumps(pattern[1]))), len(pattern[1]))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, pattern_from_bytes, b'MThd' + bytes(12))
+
+if __name__ == '__main__':
+    unittest.main()
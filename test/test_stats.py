@@ -0,0 +1,76 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+import midiio.fileio
+from midiio.events import *
+from midiio.containers import *
+from midiio.stats import *
+import mary_test
+from midi_buffers import midi_buffer
+
+class TestStatistics(unittest.TestCase):
+    def test_mary(self):
+        data = midi_buffer(mary_test.MARY_MIDI).getvalue()
+        statistics = StatisticsScanner().scan_bytes(data)
+        pattern = midiio.fileio.read_midifile(io.BytesIO(data))
+        events = [ event for track in pattern for event in track ]
+        notes = [ event for event in events
+            if isinstance(event, NoteOnEvent) and event.velocity ]
+
+        self.assertEqual(statistics.files, 1)
+        self.assertEqual(statistics.tracks, 2)
+        self.assertEqual(statistics.events, len(events))
+        self.assertEqual(sum(statistics.event_types.values()), len(events))
+        self.assertEqual(statistics.event_types['Note On'], len([ event
+            for event in events if isinstance(event, NoteOnEvent) ]))
+        self.assertEqual(statistics.event_types['Time Signature'], 1)
+        self.assertEqual(sum(statistics.pitches.values()), len(notes))
+        self.assertEqual(statistics.pitches[64], len([ note for note in notes
+            if note.pitch == 64 ]))
+        self.assertEqual(statistics.controllers, {91: 1, 10: 1, 0: 1, 32: 1})
+        self.assertEqual(statistics.programs, {24: 1})
+        self.assertEqual(list(statistics.channels), [0])
+
+    def test_running_status(self):
+        track_data = b'\x00\x90\x3c\x40\x10\x3c\x00\x00\xb1\x07\x64\x00\x07\x50' \
+            b'\x00\xff\x2f\x00'
+
+        statistics = StatisticsScanner().scan_track(track_data)
+
+        self.assertEqual(statistics.event_types, {'Note On': 2, 'Control Change': 2,
+            'End of Track': 1})
+        self.assertEqual(statistics.pitches, {60: 1})
+        self.assertEqual(statistics.velocities, {64: 1})
+        self.assertEqual(statistics.controllers, {7: 2})
+        self.assertEqual(statistics.channels, {0: 2, 1: 2})
+
+    def test_collect(self):
+        directory = tempfile.mkdtemp()
+        try:
+            paths = []
+            for index in range(4):
+                path = os.path.join(directory, "file%d.mid" % index)
+                with open(path, 'wb') as out:
+                    out.write(midi_buffer(mary_test.MARY_MIDI).getvalue())
+                paths.append(path)
+            paths.append(os.path.join(directory, "missing.mid"))
+            single = scan_statistics(paths[0])
+
+            total = collect_statistics(paths)
+
+            self.assertEqual(total.files, 4)
+            self.assertEqual(total.failures, 1)
+            self.assertEqual(total.events, 4 * single.events)
+            self.assertEqual(total.pitches, { pitch: 4 * count
+                for pitch, count in single.pitches.items() })
+            self.assertEqual(collect_statistics(paths, workers=2), total)
+            self.assertEqual(single + single + single + single,
+                EventStatistics(**{ name: getattr(total, name) for name in
+                    ('tracks', 'events') + HISTOGRAMS }, files=4))
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import io
+from midiio.events import *
+from midiio.stream import *
+
+def describe(events):
+    return [ (type(event).__name__, ) + tuple(getattr(event, name) for name in
+        event._arg_names()[1:]) for _, event in events ]
+
+class TestStream(unittest.TestCase):
+    STREAM = b'\x90\x3c\x40\x3e\x40\xf8\x3c\x00\xb1\x07\x64' \
+        b'\xf0\x7e\x7f\x09\x01\xf7\xc2\x05\xf2\x10\x20\x05\xfa'
+
+    def test_fragments(self):
+        decoder = StreamDecoder()
+        whole = describe(decoder.feed(self.STREAM))
+
+        self.assertEqual(whole, [
+            ('BinaryNoteOnEvent', 60, 64, 0),
+            ('BinaryNoteOnEvent', 62, 64, 0),
+            ('SystemRealtimeEvent', 0xF8),
+            ('BinaryNoteOnEvent', 60, 0, 0),
+            ('BinaryControlChangeEvent', 7, 100, 1),
+            ('BinarySysexEvent', b'\x7e\x7f\x09\x01', True),
+            ('BinaryProgramChangeEvent', 5, 2),
+            ('SystemCommonEvent', 0xF2, (0x10, 0x20)),
+            ('SystemRealtimeEvent', 0xFA)])
+        # the song position pointer cancelled the running status
+        self.assertEqual(decoder.discarded, 1)
+
+        for size in (1, 2, 3, 5):
+            decoder = StreamDecoder()
+            events = []
+            for start in range(0, len(self.STREAM), size):
+                events.extend(decoder.feed(self.STREAM[start:start + size]))
+            self.assertEqual(describe(events), whole)
+
+    def test_realtime_inside_message(self):
+        decoder = StreamDecoder()
+
+        first = decoder.feed(b'\x90\x3c', timestamp=1.0)
+        second = decoder.feed(b'\xf8\x40', timestamp=2.0)
+
+        self.assertEqual(first, [])
+        self.assertEqual([ (timestamp, type(event)) for timestamp, event in second ],
+            [(2.0, SystemRealtimeEvent), (2.0, type(second[1][1]))])
+        self.assertEqual(second[1][1].velocity, 0x40)
+        self.assertEqual(decoder.running_status, 0x90)
+
+    def test_sysex(self):
+        received = []
+        ticks = iter(range(10))
+        decoder = StreamDecoder(callback=lambda timestamp, event:
+            received.append((timestamp, event)), clock=lambda: next(ticks))
+
+        decoder.feed(b'\xf0\x01\x02')
+        decoder.feed(b'\x03\x04')
+        decoder.feed(b'\x05\x80\x3c\x00')
+
+        self.assertEqual(describe(received), [('BinarySysexEvent',
+            b'\x01\x02\x03\x04\x05', True), ('BinaryNoteOffEvent', 60, 0, 0)])
+        self.assertEqual([ timestamp for timestamp, _ in received ], [2, 2])
+
+        decoder = StreamDecoder(max_sysex=2)
+        self.assertEqual(describe(decoder.feed(b'\xf0\x01\x02\x03\xf7\xc0\x01')),
+            [('BinaryProgramChangeEvent', 1, 0)])
+
+    def test_iter_stream(self):
+        events = list(iter_stream(io.BytesIO(self.STREAM * 3), size=7))
+
+        self.assertEqual(len(events), 27)
+        self.assertTrue(all(isinstance(timestamp, float) for timestamp, _ in events))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from midiio.events import *
+from midiio.containers import *
+from midiio.thinning import *
+
+class TestThinning(unittest.TestCase):
+    def _ramp(self, values, channel=0, control=1):
+        return [ ControlChangeEvent(1, control, value, channel) for value in values ]
+
+    def _absolute(self, track):
+        tick = 0
+        result = []
+        for event in track:
+            tick += event.tick
+            result.append((tick, event))
+        return result
+
+    def test_repeated_values(self):
+        track = Track(self._ramp([10, 10, 10, 11, 11, 12]) + [NoteOnEvent(1, 60, 100)])
+
+        thinned, report = thin_track(track)
+
+        self.assertEqual([ e.value for e in thinned[:-1] ], [10, 11, 12])
+        self.assertEqual(report.removed, 3)
+        self.assertEqual(report.removed_by_stream, {(0, 1): 3})
+        # absolute time of the remaining events is unchanged
+        self.assertEqual([ t for t, e in self._absolute(thinned) ], [1, 4, 6, 7])
+
+    def test_streams_are_separate(self):
+        events = []
+        for value in range(10):
+            events.append(ControlChangeEvent(1, 1, value, 0))
+            events.append(ControlChangeEvent(0, 1, value, 1))
+            events.append(ControlChangeEvent(0, 64, 0, 0))
+        track = Track(events)
+
+        thinned, report = thin_track(track, value_delta=5)
+
+        self.assertEqual([ e.value for e in thinned
+            if e.control == 1 and e.channel == 0 ], [0, 5, 9])
+        self.assertEqual(len([ e for e in thinned if e.control == 64 ]), 10)
+        self.assertEqual(report.removed, 14)
+
+    def test_min_interval(self):
+        track = Track(self._ramp(range(20)))
+
+        thinned, report = thin_track(track, min_interval=5)
+
+        self.assertEqual([ e.value for e in thinned ], [0, 5, 10, 15, 19])
+
+    def test_linear_ramp_simplification(self):
+        track = Track(self._ramp(list(range(0, 64)) + list(range(64, 0, -1))) +
+                [PitchWheelEvent(1, pitch) for pitch in range(0, 1000, 10)])
+
+        thinned, report = thin_track(track, epsilon=1, pitch_epsilon=1)
+
+        self.assertEqual([ e.value for e in thinned
+            if isinstance(e, ControlChangeEvent) ], [0, 64, 1])
+        self.assertEqual([ e.pitch for e in thinned
+            if isinstance(e, PitchWheelEvent) ], [0, 990])
+        self.assertEqual(report.total, len(track))
+        self.assertEqual(report.removed, len(track) - len(thinned))
+
+    def test_untouched_track(self):
+        track = Track([NoteOnEvent(0, 60, 100), NoteOnEvent(10, 60, 0)])
+
+        thinned, report = thin_track(track)
+
+        self.assertIs(thinned, track)
+        self.assertEqual(report.removed, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import unittest
+import io
+import midiio.fileio
+import midiio.validate
+from midiio.events import *
+from midiio.containers import *
+from midiio.timing import *
+import mary_test
+
+class TestAbsoluteTicks(unittest.TestCase):
+    def test_absolute_tick_key(self):
+        first = Track([NoteOnEvent(5, 60, 100), NoteOffEvent(10, 60, 0)])
+        second = Track([ControlChangeEvent(0, 7, 100), NoteOnEvent(5, 64, 100)])
+
+        merged = sorted(absolute_events(first) + absolute_events(second),
+            key=absolute_tick_key)
+
+        self.assertEqual([ tick for tick, event in merged ], [0, 5, 5, 15])
+        self.assertIs(merged[1][1], first[0])
+        self.assertIs(merged[2][1], second[1])
+
+
+class TestMeterMap(unittest.TestCase):
+    def test_default(self):
+        meter_map = MeterMap([], 96)
+
+        self.assertEqual(meter_map.time_signatures, [(0, 4, 4)])
+        self.assertEqual(meter_map.tick_to_bar(383), 0)
+        self.assertEqual(meter_map.tick_to_bar(384), 1)
+        self.assertEqual(meter_map.tick_to_bbt(384 + 96 * 2 + 5), (1, 2, 5))
+        self.assertEqual(meter_map.bbt_to_tick(1, 2, 5), 384 + 96 * 2 + 5)
+
+    def test_changes(self):
+        # two bars of 4/4, then four bars of 6/8 and 3/4
+        meter_map = MeterMap([(0, 4, 4), (960, 6, 8), (960 + 4 * 360, 3, 4)], 120)
+
+        self.assertEqual(meter_map.tick_to_bar(959), 1)
+        self.assertEqual(meter_map.tick_to_bar(960), 2)
+        self.assertEqual(meter_map.bar_to_tick(3), 960 + 360)
+        self.assertEqual(meter_map.tick_to_bbt(960 + 360 + 60 * 4 + 7), (3, 4, 7))
+        self.assertEqual(meter_map.time_signature(960 + 360), (6, 8))
+        self.assertEqual(meter_map.bar_to_tick(6), 960 + 4 * 360)
+        self.assertEqual(meter_map.bar_to_tick(7), 960 + 4 * 360 + 360)
+        self.assertEqual(meter_map.time_signature(meter_map.bar_to_tick(6)), (3, 4))
+
+        uneven = MeterMap([(0, 4, 4), (600, 3, 4)], 120)
+        self.assertEqual(uneven.tick_to_bar(599), 1)
+        self.assertEqual(uneven.tick_to_bar(600), 2)
+        self.assertEqual(uneven.bar_to_tick(2), 600)
+
+        for tick in range(0, 4000, 7):
+            self.assertEqual(meter_map.bbt_to_tick(*meter_map.tick_to_bbt(tick)),
+                tick)
+
+    def test_from_pattern(self):
+        meter_map = MeterMap.from_pattern(mary_test.MARY_MIDI)
+
+        self.assertEqual(meter_map.time_signatures, [(0, 4, 2)])
+        self.assertEqual(meter_map.resolution, mary_test.MARY_MIDI.resolution)
+        with self.assertRaises(ValueError):
+            MeterMap([], smpte_resolution(25, 40))
+
+
+class TestBarSlicer(unittest.TestCase):
+    def setUp(self):
+        self.pattern = Pattern([
+            Track([TimeSignatureMetaEvent(0, 4, 4, 24, 8), SetTempoMetaEvent(0, 500000),
+                SetTempoMetaEvent(500, 400000), EndOfTrackMetaEvent(1000)]),
+            Track([ NoteOnEvent(0 if index == 0 else 48, 60 + index, 100)
+                for index in range(30) ])], resolution=96)
+
+    def _absolute(self, track):
+        return [ (tick, event) for tick, event in zip(absolute_ticks(track),
+            [ event.replace(tick=0) for event in track ]) ]
+
+    def test_slice(self):
+        sliced = BarSlicer(self.pattern).slice(1, 3)
+
+        self.assertEqual(self._absolute(sliced[1]), [ (tick - 384,
+            NoteOnEvent(0, 60 + tick // 48, 100)) for tick in range(384, 1152, 48) ] +
+            [(768, EndOfTrackMetaEvent(0))])
+        self.assertEqual(self._absolute(sliced[0]), [
+            (0, TimeSignatureMetaEvent(0, 4, 4, 24, 8)),
+            (0, SetTempoMetaEvent(0, 500000)),
+            (116, SetTempoMetaEvent(0, 400000)),
+            (768, EndOfTrackMetaEvent(0))])
+        # the end of track of the source is replaced by one at the end of the slice
+        self.assertEqual(list(BarSlicer(self.pattern).slice(2, 4)[0]), [
+            TimeSignatureMetaEvent(0, 4, 4, 24, 8), SetTempoMetaEvent(0, 400000),
+            EndOfTrackMetaEvent(768)])
+        self.assertEqual(list(BarSlicer(self.pattern).slice(5, 6)[1]),
+            [EndOfTrackMetaEvent(384)])
+        self.assertEqual(sliced.resolution, 96)
+
+        first = BarSlicer(self.pattern).slice(0, 1)
+        self.assertEqual(list(first[0]), [TimeSignatureMetaEvent(0, 4, 4, 24, 8),
+            SetTempoMetaEvent(0, 500000), EndOfTrackMetaEvent(384)])
+        self.assertEqual(len(first[1]), 9)
+        self.assertEqual(first[1][-1], EndOfTrackMetaEvent(384 - 7 * 48))
+
+    def test_split(self):
+        slicer = BarSlicer(self.pattern)
+        bars = slicer.split()
+
+        self.assertEqual(slicer.bar_count, 4)
+        self.assertEqual(len(bars), 4)
+        self.assertEqual(sum(len(bar[1]) - 1 for bar in bars), 30)
+        self.assertEqual([ len(bar[1]) for bar in split_bars(self.pattern, 2) ],
+            [17, 15])
+        self.assertEqual(slice_bars(self.pattern, 2, 3)[1][0],
+            NoteOnEvent(0, 76, 100))
+
+    def test_write_slices(self):
+        for sliced in BarSlicer(self.pattern).split():
+            buf = io.BytesIO()
+            midiio.fileio.write_midifile(buf, sliced)
+
+            self.assertTrue(midiio.validate.Validator().validate(buf.getvalue()).valid)
+            self.assertEqual(midiio.fileio.read_midifile(io.BytesIO(buf.getvalue())),
+                sliced)
+            self.assertEqual([ sum(event.tick for event in track)
+                for track in sliced ], [384, 384])
+
+if __name__ == '__main__':
+    unittest.main()
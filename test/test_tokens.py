@@ -0,0 +1,118 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+from array import array
+import midiio.fileio
+from midiio.events import *
+from midiio.containers import *
+from midiio.tokens import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestTokenizer(unittest.TestCase):
+    def setUp(self):
+        self.pattern = Pattern([Track([
+            SetTempoMetaEvent(0, 500000),
+            NoteOnEvent(0, 60, 100, 0),
+            NoteOnEvent(0, 64, 100, 0),
+            NoteOnEvent(10, 60, 0, 0),
+            NoteOffEvent(250, 64, 64, 0),
+            NoteOnEvent(5, 67, 20, 0),
+            NoteOffEvent(5, 67, 0, 0),
+            EndOfTrackMetaEvent(0),
+        ])], resolution=96)
+
+    def test_encode(self):
+        vocabulary = Vocabulary(max_shift=100, velocity_bins=32)
+        tokens = Tokenizer(vocabulary).encode(self.pattern)
+
+        shift = vocabulary.time_shift_offset - 1
+        self.assertEqual(list(tokens), [
+            vocabulary.velocity_offset + 25, 60, 64,
+            shift + 10, 128 + 60,
+            shift + 100, shift + 100, shift + 50, 128 + 64,
+            shift + 5, vocabulary.velocity_offset + 5, 67,
+            shift + 5, 128 + 67])
+
+    def test_encode_merges_tracks(self):
+        pattern = Pattern([
+            Track([NoteOnEvent(10, 60, 100, 0), NoteOffEvent(10, 60, 0, 0)]),
+            Track([NoteOnEvent(5, 62, 100, 1), NoteOffEvent(10, 62, 0, 1)])])
+        tokenizer = Tokenizer()
+
+        decoded = tokenizer.decode(tokenizer.encode(pattern))
+
+        self.assertEqual([ (event.tick, event.pitch) for event in decoded[:-1] ],
+            [(5, 62), (5, 60), (5, 62), (5, 60)])
+
+    def test_encode_bytes(self):
+        tokenizer = Tokenizer()
+        midi_file = io.BytesIO()
+        midiio.fileio.write_midifile(midi_file, self.pattern)
+
+        self.assertEqual(tokenizer.encode_bytes(midi_file.getvalue()),
+            tokenizer.encode(self.pattern))
+
+    def test_decode_is_inverse(self):
+        tokenizer = Tokenizer(Vocabulary(shift_step=5, max_shift=8, velocity_bins=16))
+        tokens = tokenizer.encode(self.pattern)
+
+        track = tokenizer.decode(tokens, channel=3)
+
+        self.assertEqual(tokenizer.encode(track), tokens)
+        self.assertTrue(all(event.channel == 3 for event in track[:-1]))
+        self.assertTrue(all(event.tick % 5 == 0 for event in track))
+
+    def test_exact_vocabulary(self):
+        tokenizer = Tokenizer(Vocabulary(velocity_bins=128))
+
+        track = tokenizer.decode(tokenizer.encode(self.pattern))
+
+        self.assertEqual([ (event.tick, event.pitch, event.velocity) for event in track
+            if isinstance(event, NoteOnEvent) ], [(0, 60, 100), (0, 64, 100),
+                (5, 67, 20)])
+
+    def test_encode_into_preallocated(self):
+        tokenizer = Tokenizer()
+        tokens = tokenizer.encode(self.pattern)
+
+        out = array('q', [-1]) * 20
+        self.assertEqual(tokenizer.encode(self.pattern, out), len(tokens))
+        self.assertEqual(list(out[:len(tokens)]), list(tokens))
+        self.assertEqual(out[len(tokens)], -1)
+
+        if numpy is not None:
+            out = numpy.zeros(20, dtype='i2')
+            tokenizer.encode(self.pattern, out)
+            self.assertEqual(out[:len(tokens)].tolist(), list(tokens))
+
+        self.assertRaises(ValueError, tokenizer.encode, self.pattern, array('i', [0]))
+
+    def test_encode_many(self):
+        directory = tempfile.mkdtemp()
+        try:
+            paths = []
+            for index in range(3):
+                path = os.path.join(directory, "file%d.mid" % index)
+                midiio.fileio.write_midifile(path, Pattern([Track([
+                    NoteOnEvent(index, 60 + index, 100, 0),
+                    NoteOffEvent(1, 60 + index, 0, 0)])]))
+                paths.append(path)
+            tokenizer = Tokenizer()
+
+            tokens, offsets = tokenizer.encode_many(paths)
+
+            self.assertEqual(list(offsets), [0, 4, 9, 14])
+            self.assertEqual(tokenizer.encode_many(paths, workers=2), (tokens, offsets))
+            self.assertEqual(tokens[offsets[1]:offsets[2]],
+                tokenizer.encode_file(paths[1]))
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
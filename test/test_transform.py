@@ -0,0 +1,125 @@
+import unittest
+from midiio.events import *
+from midiio.containers import *
+import midiio.transform
+from midiio.transform import *
+from midiio.timing import smpte_resolution
+import mary_test
+
+class TestTransform(unittest.TestCase):
+    def test_containers(self):
+        track = Track([NoteOnEvent(0, 60, 100)]).append(NoteOffEvent(10, 60, 0))
+        pattern = Pattern([], resolution=96, format=0).extend([track])
+
+        self.assertEqual(len(track), 2)
+        self.assertEqual(pattern.resolution, 96)
+        self.assertEqual(pattern.format, 0)
+        self.assertIs(pattern[0], track)
+
+    def test_transpose_and_velocity(self):
+        track = Track([ControlChangeEvent(0, 7, 100),
+            NoteOnEvent(0, 60, 100),
+            NoteOnEvent(0, 126, 100, channel=1),
+            NoteOnEvent(10, 60, 0)])
+
+        result = transform_track(track, Transpose(2), ScaleVelocity(0.5, channels=[0]))
+
+        self.assertIs(result[0], track[0])
+        self.assertEqual([ (e.pitch, e.velocity) for e in result[1:] ],
+            [(62, 50), (127, 100), (62, 0)])
+        self.assertEqual([ e.tick for e in result ], [0, 0, 0, 10])
+
+    def test_quantize_and_stretch(self):
+        track = Track([NoteOnEvent(7, 60, 100),
+            NoteOffEvent(12, 60, 0),
+            NoteOnEvent(11, 62, 100),
+            NoteOffEvent(20, 62, 0)])
+
+        quantized = transform_track(track, Quantize(10))
+        self.assertEqual([ e.tick for e in quantized ], [10, 10, 10, 20])
+
+        stretched = transform_track(track, TimeStretch(2))
+        self.assertEqual([ e.tick for e in stretched ], [14, 24, 22, 40])
+
+        half = transform_track(track, Quantize(10, strength=0.5))
+        self.assertEqual([ e.tick for e in half ], [9, 11, 10, 20])
+
+    def test_unchanged_is_shared(self):
+        pattern = Pattern([ Track(track) for track in mary_test.MARY_MIDI ])
+
+        self.assertIs(transform_pattern(pattern, Transpose(0), TimeStretch(1)), pattern)
+
+    def test_columnar_matches_python(self):
+        track = Track(mary_test.MARY_MIDI[1])
+        pipeline = TransformPipeline([Quantize(100, strength=0.75), TimeStretch(1.5)])
+
+        columnar = pipeline.transform_track(track)
+        threshold = midiio.transform.COLUMNAR_THRESHOLD
+        try:
+            midiio.transform.COLUMNAR_THRESHOLD = len(track) + 1
+            python = pipeline.transform_track(track)
+        finally:
+            midiio.transform.COLUMNAR_THRESHOLD = threshold
+
+        self.assertEqual([ e.tick for e in columnar ], [ e.tick for e in python ])
+
+    def test_columnar_float_factor(self):
+        track = Track([ NoteOnEvent(100, 60, 100) for _ in range(100) ])
+        self.assertGreaterEqual(len(track), midiio.transform.COLUMNAR_THRESHOLD)
+
+        stretched = transform_track(track, TimeStretch(1.1))
+        self.assertEqual([ e.tick for e in stretched ], [110] * 100)
+
+        half = transform_track(track, Quantize(64, strength=0.3))
+        self.assertTrue(all(e.tick >= 0 for e in half))
+        self.assertEqual(sum(e.tick for e in half), 9995)
+
+    def test_resample(self):
+        # 7 ticks at 96 ppq are 4.375 ticks at 60 ppq, rounding each delta would drift
+        # to 400 or 500 ticks instead of 437.5
+        track = Track([ NoteOnEvent(7, 60, 100) for _ in range(100) ])
+        pattern = Pattern([track], resolution=96)
+
+        result = resample_pattern(pattern, 60)
+
+        self.assertEqual(result.resolution, 60)
+        self.assertEqual(sum(event.tick for event in result[0]), 438)
+        self.assertTrue(set(event.tick for event in result[0]) <= {4, 5})
+        self.assertEqual([ event.tick for event in
+            resample_pattern(resample_pattern(pattern, 480), 96)[0] ], [7] * 100)
+
+        threshold = midiio.transform.COLUMNAR_THRESHOLD
+        try:
+            midiio.transform.COLUMNAR_THRESHOLD = len(track) + 1
+            python = resample_pattern(pattern, 60)
+        finally:
+            midiio.transform.COLUMNAR_THRESHOLD = threshold
+        self.assertEqual([ e.tick for e in python[0] ], [ e.tick for e in result[0] ])
+
+    def test_resample_smpte(self):
+        # 25 frames of 40 ticks are 1000 ticks per second
+        smpte = smpte_resolution(25, 40)
+        pattern = Pattern([Track([SetTempoMetaEvent(0, 500000),
+            NoteOnEvent(1000, 60, 100),
+            SetTempoMetaEvent(0, 1000000),
+            NoteOnEvent(2000, 60, 0)])], resolution=smpte)
+
+        result = resample_pattern(pattern, 96)
+
+        # one second at 120 bpm and two seconds at 60 bpm
+        self.assertEqual([ event.tick for event in result[0] ], [0, 192, 0, 192])
+        self.assertEqual([ event.tick for event in
+            resample_pattern(result, smpte)[0] ], [0, 1000, 0, 2000])
+
+    def test_resample_repeated_tempo(self):
+        smpte = smpte_resolution(25, 40)
+        resample = Resample(smpte, 480,
+            [(0, 500000), (1000, 500000), (2000, 400000)])
+
+        # 960 ticks per second at 120 bpm and 1200 at 150 bpm
+        self.assertEqual(resample.map_tick(1000), 960)
+        self.assertEqual(resample.map_tick(2000), 1920)
+        self.assertEqual(resample.map_tick(3000), 3120)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import io
+import midiio.fileio
+from midiio.events import *
+from midiio.containers import *
+from midiio.util import long_to_bytes
+from midiio.validate import *
+import mary_test
+
+def header(tracks, format_version=1, length=6):
+    return b'MThd' + long_to_bytes(length) + bytes((0, format_version, 0, tracks,
+        0, 96)) + bytes(length - 6)
+
+def chunk(data, chunk_id=b'MTrk', length=None):
+    return chunk_id + long_to_bytes(len(data) if length is None else length) + data
+
+NOTES = b'\x00\x90\x3c\x40\x60\x3c\x00'
+END = b'\x00\xff\x2f\x00'
+
+class TestValidate(unittest.TestCase):
+    def _check(self, data, codes):
+        validator = Validator()
+        report = validator.validate(data)
+        self.assertEqual(report.codes, set(codes))
+
+        normalized = validator.normalize(data, report)
+        self.assertTrue(validator.validate(normalized).valid)
+        self.assertEqual(validator.validate(normalized).codes - {UNKNOWN_CHUNK}, set())
+
+        return report, midiio.fileio.read_midifile(io.BytesIO(normalized))
+
+    def test_valid(self):
+        buf = io.BytesIO()
+        midiio.fileio.write_midifile(buf, mary_test.MARY_MIDI)
+        data = buf.getvalue()
+
+        report = validate_midifile(io.BytesIO(data))
+
+        self.assertTrue(report.valid)
+        self.assertEqual(report.findings, ())
+        self.assertEqual(report.tracks, 2)
+        self.assertEqual(Validator().normalize(data), data)
+
+    def test_missing_end_of_track(self):
+        report, pattern = self._check(header(1) + chunk(NOTES),
+            [MISSING_END_OF_TRACK])
+
+        self.assertFalse(report.valid)
+        self.assertTrue(isinstance(pattern[0][-1], EndOfTrackMetaEvent))
+        self.assertEqual(len(pattern[0]), 3)
+
+    def test_track_count(self):
+        report, pattern = self._check(header(3) + chunk(NOTES + END),
+            [TRACK_COUNT])
+
+        self.assertEqual(report.header_tracks, 3)
+        self.assertEqual(len(pattern), 1)
+
+    def test_chunk_length(self):
+        data = header(2) + chunk(NOTES + END, length=1000) + chunk(NOTES + END)
+        report, pattern = self._check(data, [CHUNK_LENGTH])
+
+        self.assertEqual(len(pattern), 2)
+        self.assertEqual(repr(pattern[0]), repr(pattern[1]))
+        self.assertEqual(report.findings[0].track, 0)
+
+        report, pattern = self._check(header(2) + chunk(NOTES + END, length=3) +
+            chunk(NOTES + END), [CHUNK_LENGTH])
+        self.assertEqual(len(pattern), 2)
+
+    def test_varlen_overflow(self):
+        data = header(1) + chunk(b'\x80\x80\x80\x80\x00\x90\x3c\x40' + END)
+        report, pattern = self._check(data, [VARLEN_OVERFLOW])
+
+        self.assertEqual(report.findings[0].offset, 22)
+        self.assertEqual(pattern[0][0].tick, 0)
+
+    def test_unterminated_sysex(self):
+        data = header(1) + chunk(b'\x00\xf0\x03\x7e\x09\x01' + END)
+        report, pattern = self._check(data, [UNTERMINATED_SYSEX])
+
+        self.assertTrue(report.valid)
+        self.assertEqual(report.warnings[0].code, UNTERMINATED_SYSEX)
+        self.assertTrue(pattern[0][0].terminated)
+
+    def test_divided_sysex(self):
+        divided = b'\x00\xf0\x02\x7e\x09\x10\xf7\x02\x01\xf7'
+        data = header(1) + chunk(divided + END)
+        report, pattern = self._check(data, [])
+
+        self.assertFalse(pattern[0][0].terminated)
+        self.assertEqual(Validator().normalize(data), data)
+
+        # a missing end of track rewrites the track, keeping the divided message
+        report, pattern = self._check(header(1) + chunk(divided + NOTES),
+            [MISSING_END_OF_TRACK])
+        self.assertEqual([ event.data for event in pattern[0][:2] ],
+            [b'\x7e\x09', b'\x01\xf7'])
+        self.assertFalse(pattern[0][0].terminated)
+
+    def test_truncated_and_trailing(self):
+        data = header(1) + chunk(NOTES + b'\x00\x90\x3c') + b'\x00\x00'
+        report, pattern = self._check(data, [TRUNCATED_EVENT, MISSING_END_OF_TRACK,
+            TRAILING_DATA])
+
+        self.assertEqual(len(pattern[0]), 3)
+
+    def test_bad_bytes(self):
+        self._check(header(1) + chunk(b'\x00\x3c\x40' + END),
+            [MISSING_STATUS, MISSING_END_OF_TRACK])
+        self._check(header(1) + chunk(b'\x00\x90\x3c\xc0' + END),
+            [INVALID_DATA, MISSING_END_OF_TRACK])
+        self._check(header(1) + chunk(NOTES + END + NOTES),
+            [DATA_AFTER_END_OF_TRACK])
+
+    def test_chunks(self):
+        data = header(1, length=8) + chunk(b'abc', b'XFIH') + chunk(NOTES + END)
+        report, pattern = self._check(data, [HEADER_LENGTH, UNKNOWN_CHUNK])
+        self.assertEqual(len(pattern), 1)
+        self.assertTrue(b'XFIH' in Validator().normalize(data, keep_unknown=True))
+
+        report, pattern = self._check(header(1) + b'\x01\x02\x03\x04' +
+            chunk(NOTES + END), [INVALID_CHUNK])
+        self.assertEqual(len(pattern), 1)
+
+    def test_invalid_header(self):
+        report = Validator().validate(b'RIFF' + bytes(20))
+
+        self.assertFalse(report.repairable)
+        self.assertRaises(ValueError, Validator().normalize, b'RIFF' + bytes(20))
+
+if __name__ == '__main__':
+    unittest.main()